@@ -22,10 +22,74 @@ from agents import (
     create_ollama_qwen14b,
     create_lmstudio_agent,
     get_best_agent_for_task,
+    kickoff_task,
+    coalescing_stats,
+    SingleFlight,
     show_status,
     list_agents
 )
 
+from token_budget import (
+    estimate_tokens,
+    get_context_limit,
+    pack_prompt,
+    PackedPrompt
+)
+
+from model_residency import (
+    ModelResidencyManager,
+    get_residency_manager,
+    print_residency
+)
+
+from router import (
+    classify_task,
+    route_task
+)
+
+from resilience import (
+    ResilienceManager,
+    get_resilience,
+    BackendUnavailable,
+    DeadlineExceeded
+)
+
+from telemetry import (
+    timer,
+    timed,
+    count,
+    observe,
+    print_summary
+)
+
+from usage import (
+    UsageTracker,
+    get_usage_tracker,
+    print_stats
+)
+
+from pipeline import (
+    Pipeline,
+    PipelineTask,
+    PipelineError,
+    PipelineResult,
+    run_pipeline
+)
+
+from context_builder import (
+    start_retrieval,
+    build_context,
+    TaskContext
+)
+
+from async_api import (
+    acheck_services,
+    acreate_agent,
+    akickoff_task,
+    arun_with_agent,
+    aclose
+)
+
 from agent_cli import (
     run_with_agent,
     run_auto
@@ -50,9 +114,64 @@ __all__ = [
     "create_ollama_qwen14b",
     "create_lmstudio_agent",
     "get_best_agent_for_task",
+    "kickoff_task",
+    "coalescing_stats",
+    "SingleFlight",
     "show_status",
     "list_agents",
     
+    # Token budget
+    "estimate_tokens",
+    "get_context_limit",
+    "pack_prompt",
+    "PackedPrompt",
+    
+    # Residencia de modelos
+    "ModelResidencyManager",
+    "get_residency_manager",
+    "print_residency",
+    
+    # Ruteo
+    "classify_task",
+    "route_task",
+    
+    # Resiliencia
+    "ResilienceManager",
+    "get_resilience",
+    "BackendUnavailable",
+    "DeadlineExceeded",
+    
+    # Telemetría
+    "timer",
+    "timed",
+    "count",
+    "observe",
+    "print_summary",
+    
+    # Uso por agente
+    "UsageTracker",
+    "get_usage_tracker",
+    "print_stats",
+    
+    # Pipeline (DAG)
+    "Pipeline",
+    "PipelineTask",
+    "PipelineError",
+    "PipelineResult",
+    "run_pipeline",
+    
+    # Contexto de memoria
+    "start_retrieval",
+    "build_context",
+    "TaskContext",
+    
+    # Async
+    "acheck_services",
+    "acreate_agent",
+    "akickoff_task",
+    "arun_with_agent",
+    "aclose",
+    
     # CLI
     "run_with_agent",
     "run_auto"
@@ -4,14 +4,20 @@
 Usa solo los agentes que ya tienes configurados.
 
 Uso:
-    python3 agent_cli.py --status
+    python3 agent_cli.py --status        # + p50/p95 por etapa con MOLTBOT_TELEMETRY
     python3 agent_cli.py --use minimax --task "Hola"
     python3 agent_cli.py --auto --task "Escribe código"
+    python3 agent_cli.py --auto --task "..." --no-memory
+    python3 agent_cli.py --auto --task "..." --fresh   # ignorar resultados guardados
+    python3 agent_cli.py --auto --task "..." --routing latency
+    python3 agent_cli.py --stats                       # tokens y latencia por agente
+    python3 agent_cli.py --pipeline job.json [--parallel 4] [--dry-run]
 """
 
 import argparse
 import sys
-from crewai import Crew, Task
+import time
+from typing import Optional
 
 sys.path.insert(0, '/Users/molder/moltbot/projects/agents')
 
@@ -22,50 +28,105 @@ from agents import (
     create_ollama_llama,
     create_ollama_qwen14b,
     create_lmstudio_agent,
+    get_agent_model,
     get_best_agent_for_task,
+    kickoff_task,
     show_status
 )
+from context_builder import (
+    build_context,
+    describe,
+    lookup_result,
+    remember_result,
+    start_retrieval
+)
+from resilience import BackendUnavailable, DeadlineExceeded
+from pipeline import Pipeline, PipelineError, print_event, print_plan, print_report, run_pipeline
+from telemetry import print_summary, timer
+from usage import print_stats
+
+def _cached(task: str, agent_id: str = "") -> bool:
+    """Mostrar un resultado memoizado si la tarea ya se resolvió"""
+    hit = lookup_result(task, agent_id)
+    if hit is None:
+        return False
+    print(f"♻️  Resultado reutilizado (~{hit['elapsed']:.1f}s de inferencia ahorrados)")
+    if hit["similarity"] < 1:
+        print(f"   Tarea parecida ({hit['similarity']:.0%}): {hit['task'][:70]}")
+    print(f"\n✅ Resultado:")
+    print(hit["result"])
+    return True
 
-def run_with_agent(agent_id: str, task: str):
+def _run(agent, prompt: str, task: str, agent_id: str = "", memoize: bool = True):
+    """kickoff + memoizar el resultado"""
+    start = time.perf_counter()
+    try:
+        result = kickoff_task(agent, prompt)
+    except (BackendUnavailable, DeadlineExceeded) as e:
+        print(f"❌ {e}")
+        return
+    if memoize:
+        remember_result(task, result, agent_id, time.perf_counter() - start)
+    
+    print(f"\n✅ Resultado:")
+    print(result)
+
+def run_with_agent(agent_id: str, task: str, use_memory: bool = True, fresh: bool = False):
     """Ejecutar tarea con agente específico"""
     
+    if use_memory and not fresh and _cached(task, agent_id):
+        return
+    
+    # La búsqueda en memoria corre mientras se crea el agente
+    retrieval = start_retrieval(task) if use_memory else None
     agent = create_agent(agent_id)
     if not agent:
         print(f"❌ Agente '{agent_id}' no disponible")
         show_status()
         return
     
+    with timer("context.build"):
+        ctx = build_context(task, retrieval, get_agent_model(agent))
+    if use_memory:
+        print(describe(ctx))
     print(f"🚀 Ejecutando con {agent.role}...")
     
-    task_obj = Task(
-        description=task,
-        agent=agent,
-        expected_output="Response"
-    )
-    
-    crew = Crew(agents=[agent], tasks=[task_obj])
-    result = crew.kickoff()
-    
-    print(f"\n✅ Resultado:")
-    print(result)
+    _run(agent, ctx.prompt, task, agent_id, memoize=use_memory)
 
-def run_auto(task: str, task_type: str = "general"):
+def run_auto(task: str, task_type: str = "general", use_memory: bool = True, fresh: bool = False,
+             routing: Optional[str] = None):
     """Auto-seleccionar mejor agente"""
     
-    agent = get_best_agent_for_task(task)
+    if use_memory and not fresh and _cached(task):
+        return
+    
+    retrieval = start_retrieval(task) if use_memory else None
+    agent = get_best_agent_for_task(task, mode=routing)
     print(f"🎯 Usando: {agent.role}")
     
-    task_obj = Task(
-        description=task,
-        agent=agent,
-        expected_output="Response"
-    )
+    with timer("context.build"):
+        ctx = build_context(task, retrieval, get_agent_model(agent))
+    if use_memory:
+        print(describe(ctx))
+    
+    _run(agent, ctx.prompt, task, memoize=use_memory)
+
+def run_pipeline_file(path: str, parallel: int, dry_run: bool = False):
+    """Ejecutar un trabajo de varias tareas (DAG) con ramas en paralelo"""
+    try:
+        pipeline = Pipeline.from_file(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Pipeline inválido: {e}")
+        return
     
-    crew = Crew(agents=[agent], tasks=[task_obj])
-    result = crew.kickoff()
+    print_plan(pipeline)
+    if dry_run:
+        return
     
-    print(f"\n✅ Resultado:")
-    print(result)
+    print(f"\n🚀 Ejecutando {len(pipeline.tasks)} tareas (hasta {parallel} en paralelo)...")
+    with timer("pipeline.run"):
+        result = run_pipeline(pipeline, parallel, on_event=print_event)
+    print_report(result)
 
 def main():
     parser = argparse.ArgumentParser(
@@ -104,20 +165,73 @@ def main():
         help="Tipo de tarea para auto-selección"
     )
     
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Tokens, tokens/s y latencia observados por agente"
+    )
+    
+    parser.add_argument(
+        "--routing",
+        choices=["static", "latency"],
+        help="Modo de auto-selección (por defecto MOLTBOT_ROUTING o static)"
+    )
+    
+    parser.add_argument(
+        "--pipeline",
+        type=str,
+        help="Archivo JSON con tareas y dependencias (DAG)"
+    )
+    
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=4,
+        help="Tareas del pipeline en paralelo"
+    )
+    
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Mostrar el plan del pipeline sin ejecutarlo"
+    )
+    
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="No anteponer memorias relevantes a la tarea"
+    )
+    
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Ejecutar aunque haya un resultado guardado equivalente"
+    )
+    
     args = parser.parse_args()
     
     if args.status:
         show_status()
+        print_summary()
+    elif args.stats:
+        print_stats()
+    elif args.pipeline:
+        run_pipeline_file(args.pipeline, args.parallel, args.dry_run)
     elif args.use and args.task:
-        run_with_agent(args.use, args.task)
+        run_with_agent(args.use, args.task, not args.no_memory, args.fresh)
     elif args.auto and args.task:
-        run_auto(args.task, args.type)
+        run_auto(args.task, args.type, not args.no_memory, args.fresh, args.routing)
     else:
         print("🤖 Configured Agents CLI")
         print("\nOpciones:")
         print("  -s, --status          Ver estado")
         print("  -u AGENTE -t TAREA    Ejecutar con agente")
         print("  -A -t TAREA           Auto-seleccionar")
+        print("  --stats               Uso por agente (tokens, latencia)")
+        print("  --pipeline JOB.json   Tareas con dependencias en paralelo")
+        print("  --routing latency     Auto-selección por latencia observada")
+        print("  --no-memory           Sin contexto de memoria")
+        print("  --fresh               Ignorar resultados memoizados")
         print("\nAgentes disponibles:")
         print("  minimax       - Cloud gratuito (siempre disponible)")
         print("  ollama-llama  - Local general")
@@ -13,17 +13,32 @@ Agentes disponibles:
 - LM Studio Local (offline)
 """
 
-from crewai import Agent
+import hashlib
+import os
+import random
+import time
+from crewai import Agent, Crew, Task
 from langchain_openai import ChatOpenAI
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from registry import (
     CONFIGURED_AGENTS,
     get_cloud_agent,
     get_ollama_agents,
     get_agent_by_task,
+    get_backend,
     check_services
 )
+from coalescing import SingleFlight
+from resilience import get_resilience
+from model_residency import get_residency_manager
+from router import classify_task
+from telemetry import timed, timer
+from usage import get_usage_tracker, usage_from_result
+
+# static: prioridades fijas | latency: menor latencia observada por tipo de tarea
+ROUTING_MODE = os.environ.get("MOLTBOT_ROUTING", "static")
+EXPLORE_RATE = 0.1            # En modo latency, probar a veces un modelo sin datos
 
 # ═══════════════════════════════════════════════════════════════
 #  OPENCODE MINIMAX (CLOUD - GRÁTIS)
@@ -79,6 +94,9 @@ def create_ollama_agent(model: str = None) -> Agent:
     
     role, backstory = role_map.get(model, ("Local AI", "AI running locally on Ollama"))
     
+    # Cargar/fijar el modelo y pre-calentar el siguiente más probable
+    get_residency_manager().record_use(model)
+    
     return Agent(
         role=role,
         goal="Provide helpful assistance",
@@ -144,6 +162,7 @@ def create_lmstudio_agent(model: str = None) -> Optional[Agent]:
 #  AGENT FACTORY
 # ═══════════════════════════════════════════════════════════════
 
+@timed("agent.create")
 def create_agent(agent_id: str) -> Optional[Agent]:
     """Crear agente por ID"""
     
@@ -165,28 +184,66 @@ def create_agent(agent_id: str) -> Optional[Agent]:
         return factory()
     return None
 
-def get_best_agent_for_task(task: str, prefer_cloud: bool = True) -> Agent:
+def _route_by_latency(task: str, status: Dict[str, bool]) -> Optional[Agent]:
+    """Agente disponible con menor latencia esperada para el tipo de tarea (None sin datos)"""
+    task_type = classify_task(task)
+    candidates = []
+    if status["opencode"]:
+        candidates.append((get_cloud_agent().model, None))
+    if status["ollama"]:
+        loaded = get_residency_manager().loaded_models()
+        candidates += [(a.model, a.model in loaded) for a in get_ollama_agents()]
+    
+    tracker = get_usage_tracker()
+    expected = {model: tracker.expected_latency(model, task_type, is_loaded)
+                for model, is_loaded in candidates}
+    known = {m: e for m, e in expected.items() if e is not None}
+    unknown = [m for m, e in expected.items() if e is None]
+    if not known:
+        return None
+    if unknown and random.random() < EXPLORE_RATE:
+        best = random.choice(unknown)
+    else:
+        best = min(known, key=known.get)
+    
+    if best == get_cloud_agent().model:
+        return create_minimax_agent()
+    return create_ollama_agent(best)
+
+@timed("agent.select")
+def get_best_agent_for_task(task: str, prefer_cloud: bool = True, mode: Optional[str] = None) -> Agent:
     """Obtener mejor agente para una tarea"""
     
+    # Un solo chequeo; los backends con breaker abierto salen como no disponibles
+    status = check_services()
+    
+    # Latencia observada; sin datos suficientes se sigue con las prioridades fijas
+    if (mode or ROUTING_MODE) == "latency":
+        agent = _route_by_latency(task, status)
+        if agent is not None:
+            return agent
+    
     # Intentar cloud primero (MiniMax es gratis)
-    if prefer_cloud:
-        status = check_services()
-        if status["opencode"]:
-            return create_minimax_agent()
+    if prefer_cloud and status["opencode"]:
+        return create_minimax_agent()
     
     # Fallback a Ollama local
-    status = check_services()
     if status["ollama"]:
-        task_lower = task.lower()
-        if any(w in task_lower for w in ["code", "python", "debug", "script"]):
+        task_type = classify_task(task)
+        if task_type == "code":
             return create_ollama_coder()
-        elif any(w in task_lower for w in ["reason", "analyze", "math"]):
+        elif task_type == "reasoning":
             return create_ollama_qwen14b()
         else:
+            # Tarea general: reutilizar un modelo ya cargado antes que forzar una recarga
+            loaded = get_residency_manager().loaded_models()
+            for agent_info in get_ollama_agents():
+                if agent_info.model in loaded:
+                    return create_ollama_agent(agent_info.model)
             return create_ollama_llama()
     
     # Último recurso: LM Studio
-    if status["lmstudio"]:
+    if status["lm_studio"]:
         agent = create_lmstudio_agent()
         if agent:
             return agent
@@ -194,6 +251,61 @@ def get_best_agent_for_task(task: str, prefer_cloud: bool = True) -> Agent:
     # Fallback absoluto: MiniMax (siempre debería funcionar)
     return create_minimax_agent()
 
+# ═══════════════════════════════════════════════════════════════
+#  COALESCING DE PETICIONES (SINGLE-FLIGHT)
+# ═══════════════════════════════════════════════════════════════
+
+_request_coalescer = SingleFlight()
+
+def get_agent_model(agent: Agent) -> str:
+    """Modelo del LLM del agente"""
+    llm = agent.llm
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or str(llm)
+
+def prepare_kickoff(agent: Agent, description: str,
+                    expected_output: str = "Response") -> Tuple[str, str, Callable[[], Any]]:
+    """(clave de coalescing, backend, inferencia) de una tarea, sin ejecutarla"""
+    key = hashlib.sha256(
+        "\x00".join([get_agent_model(agent), agent.role, description, expected_output]).encode()
+    ).hexdigest()
+    
+    model = get_agent_model(agent)
+    backend = get_backend(model)
+    
+    def _run():
+        task_obj = Task(
+            description=description,
+            agent=agent,
+            expected_output=expected_output
+        )
+        crew = Crew(agents=[agent], tasks=[task_obj])
+        task_type = classify_task(description)
+        cold = backend == "ollama" and not get_residency_manager().is_loaded(model)
+        start = time.perf_counter()
+        # Solo la inferencia real (los llamadores coalescidos no cuentan)
+        try:
+            with timer("agent.kickoff"):
+                result = crew.kickoff()
+        except Exception:
+            get_usage_tracker().record(model, task_type, 0, 0, time.perf_counter() - start, ok=False)
+            raise
+        tokens_in, tokens_out, estimated = usage_from_result(result, description, model)
+        get_usage_tracker().record(model, task_type, tokens_in, tokens_out,
+                                   time.perf_counter() - start, cold=cold, estimated=estimated)
+        return result
+    
+    return key, backend, _run
+
+def kickoff_task(agent: Agent, description: str, expected_output: str = "Response") -> Any:
+    """Ejecutar una tarea con el agente, compartiendo inferencias idénticas en vuelo"""
+    key, backend, run = prepare_kickoff(agent, description, expected_output)
+    # Breaker, deadline y reintentos del backend; una sola vez por grupo coalescido
+    return _request_coalescer.do(key, lambda: get_resilience().call(backend, run))
+
+def coalescing_stats() -> Dict[str, int]:
+    """Métricas de coalescing: llamadas upstream, compartidas y en vuelo"""
+    return _request_coalescer.stats()
+
 # ═══════════════════════════════════════════════════════════════
 #  STATUS & UTILS
 # ═══════════════════════════════════════════════════════════════
@@ -208,7 +320,7 @@ def show_status():
     services = [
         ("opencode", "☁️ OpenCode (MiniMax)", True),  # Siempre disponible
         ("ollama", "🏠 Ollama Local", status["ollama"]),
-        ("lmstudio", "🏠 LM Studio Local", status["lmstudio"]),
+        ("lmstudio", "🏠 LM Studio Local", status["lm_studio"]),
     ]
     
     for key, name, is_up in services:
@@ -221,8 +333,25 @@ def show_status():
     print("  ✅ ollama-llama        - Local general")
     print("  ✅ ollama-coder        - Local código")
     print("  ✅ ollama-qwen14b      - Local razonamiento")
-    if status["lmstudio"]:
+    if status["lm_studio"]:
         print("  ✅ lmstudio           - Local personalizado")
+    
+    if status["ollama"]:
+        loaded = get_residency_manager().loaded_models()
+        print(f"\n🔥 Modelos cargados: {', '.join(loaded) if loaded else '(ninguno)'}")
+    
+    stats = coalescing_stats()
+    if stats["upstream"]:
+        print(f"\n🔗 Peticiones: {stats['upstream']} upstream, {stats['coalesced']} compartidas")
+    
+    from context_builder import result_stats
+    try:
+        results = result_stats()
+    except Exception:
+        results = {"entries": 0}
+    if results["entries"]:
+        print(f"♻️  Resultados memoizados: {results['entries']}, "
+              f"{results['hit_rate']:.0%} aciertos, {results['saved_seconds']:.0f}s ahorrados")
 
 def list_agents():
     """Listar agentes disponibles"""
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+⚡ Async API - Agentes y memoria sin bloquear el event loop
+Para embeber Moltbot en un servicio asyncio sin un hilo por petición.
+
+- acheck_services: health checks en paralelo con HTTP no bloqueante
+  (async_http: httpx.AsyncClient si está instalado; si no, asyncio.open_connection)
+- acreate_agent: LM Studio descubre su modelo con HTTP asíncrono
+- arun_with_agent: resultado memoizado, memoria con deadline y kickoff
+- akickoff_task: CrewAI es síncrono, así que cada inferencia ocupa un hilo
+  del pool de resilience (deadline y backoff se esperan en el event loop);
+  las peticiones idénticas en vuelo esperan el mismo future
+- aclose: cierra el cliente HTTP del loop (asyncio.run lo cierra al salir)
+- Memoria.asearch / Memoria.aadd: en memory/memoria-wrapper.py
+
+Uso:
+    status = await acheck_services()
+    result = await arun_with_agent("minimax", "Resume este texto...")
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, Hashable, Optional
+
+from agents import create_agent, create_lmstudio_agent, get_agent_model, prepare_kickoff
+from async_http import aclose, http_get
+from context_builder import abuild_context, astart_retrieval, lookup_result, remember_result
+from registry import SERVICE_URLS
+from resilience import get_resilience
+from telemetry import timer
+
+DISCOVERY_TIMEOUT = 2.0
+
+# ═══════════════════════════════════════════════════════════════
+#  SERVICIOS Y AGENTES
+# ═══════════════════════════════════════════════════════════════
+
+async def acheck_services() -> Dict[str, bool]:
+    """check_services() con todos los health checks a la vez"""
+    resilience = get_resilience()
+
+    async def probe(service: str, url: str) -> bool:
+        # Breaker abierto: no esperar otro timeout
+        if not resilience.is_available(service):
+            return False
+        start = time.monotonic()
+        try:
+            status, _ = await http_get(url, resilience.deadline(service, "health"))
+        except Exception:
+            status = None
+        # record() persiste el estado del breaker: fuera del event loop
+        if status == 200:
+            await asyncio.to_thread(resilience.record, service, "health", True,
+                                    time.monotonic() - start, False)
+            return True
+        await asyncio.to_thread(resilience.record, service, "health", False)
+        return False
+
+    with timer("services.check"):
+        results = await asyncio.gather(*(probe(s, url) for s, url in SERVICE_URLS.items()))
+    return dict(zip(SERVICE_URLS, results))
+
+async def _lmstudio_model() -> Optional[str]:
+    """Primer modelo cargado en LM Studio (None si no responde)"""
+    try:
+        status, body = await http_get(SERVICE_URLS["lm_studio"], DISCOVERY_TIMEOUT)
+        if status == 200:
+            models = json.loads(body).get("data", [])
+            if models:
+                return models[0].get("id")
+    except Exception:
+        pass
+    return None
+
+async def acreate_agent(agent_id: str):
+    """create_agent() sin bloquear el event loop"""
+    if agent_id == "lmstudio":
+        model = await _lmstudio_model()
+        return create_lmstudio_agent(model) if model else None
+    # Ollama consulta/precarga la residencia del modelo con HTTP síncrono
+    return await asyncio.to_thread(create_agent, agent_id)
+
+# ═══════════════════════════════════════════════════════════════
+#  EJECUCIÓN
+# ═══════════════════════════════════════════════════════════════
+
+_in_flight: Dict[Hashable, asyncio.Future] = {}
+
+async def akickoff_task(agent, description: str, expected_output: str = "Response") -> Any:
+    """kickoff_task() con un solo hilo por inferencia; las peticiones idénticas en vuelo
+    comparten future"""
+    loop = asyncio.get_running_loop()
+    digest, backend, run = prepare_kickoff(agent, description, expected_output)
+    key = (loop, digest)
+    future = _in_flight.get(key)
+    if future is None:
+        # Breaker, deadline y reintentos sin pasar por el pool de kickoff_task()
+        future = asyncio.ensure_future(get_resilience().acall(backend, run))
+        _in_flight[key] = future
+        future.add_done_callback(lambda _: _in_flight.pop(key, None))
+    # shield: cancelar a un llamador no cancela a los demás
+    return await asyncio.shield(future)
+
+async def arun_with_agent(agent_id: str, task: str, use_memory: bool = True,
+                          fresh: bool = False) -> Optional[str]:
+    """run_with_agent() para servicios: devuelve el resultado en vez de imprimirlo
+
+    None si el agente no está disponible; BackendUnavailable y
+    DeadlineExceeded se propagan al llamador.
+    """
+    if use_memory and not fresh:
+        hit = await asyncio.to_thread(lookup_result, task, agent_id)
+        if hit is not None:
+            return hit["result"]
+
+    # La búsqueda en memoria corre mientras se crea el agente
+    retrieval = astart_retrieval(task) if use_memory else None
+    agent = await acreate_agent(agent_id)
+    if not agent:
+        return None
+
+    with timer("context.build"):
+        ctx = await abuild_context(task, retrieval, get_agent_model(agent))
+
+    start = time.perf_counter()
+    result = str(await akickoff_task(agent, ctx.prompt))
+    if use_memory:
+        await asyncio.to_thread(remember_result, task, result, agent_id, time.perf_counter() - start)
+    return result
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+🌐 Async HTTP - GET sin bloquear el event loop
+httpx.AsyncClient si está instalado (un cliente con pool de conexiones por
+event loop); si no, HTTP/1.0 sobre asyncio.open_connection, sin dependencias.
+
+El cliente de cada loop se cierra solo cuando el loop apaga sus generadores
+(asyncio.run lo hace al salir); con un loop propio, `await aclose()`.
+
+Uso:
+    status, body = await http_get("http://localhost:11434/api/tags", timeout=2)
+"""
+
+import asyncio
+import weakref
+from typing import Any, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# ═══════════════════════════════════════════════════════════════
+#  HTTP NO BLOQUEANTE
+# ═══════════════════════════════════════════════════════════════
+
+# Un AsyncClient (pool de conexiones) por event loop, con su guardián
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[Any, Any]]" = \
+    weakref.WeakKeyDictionary()
+
+async def _client_guard(client):
+    """Generador que cierra el cliente cuando el loop apaga sus generadores
+    (loop.shutdown_asyncgens, que asyncio.run llama al salir)"""
+    try:
+        yield client
+    finally:
+        await client.aclose()
+
+async def _client():
+    loop = asyncio.get_running_loop()
+    if loop not in _clients:
+        guard = _client_guard(httpx.AsyncClient())
+        _clients[loop] = (await guard.__anext__(), guard)
+    return _clients[loop][0]
+
+async def aclose():
+    """Cerrar el cliente HTTP del event loop actual (se recrea si hace falta)"""
+    entry = _clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[1].aclose()
+
+async def _raw_get(url: str) -> Tuple[int, bytes]:
+    """GET HTTP/1.0 sobre asyncio (sin dependencias): el servidor cierra al terminar"""
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    reader, writer = await asyncio.open_connection(
+        parts.hostname, parts.port or (443 if secure else 80), ssl=secure or None)
+    try:
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+        writer.write(f"GET {path} HTTP/1.0\r\nHost: {parts.netloc}\r\n"
+                     f"Accept: application/json\r\nUser-Agent: moltbot\r\n\r\n".encode())
+        await writer.drain()
+        raw = await reader.read()
+    finally:
+        writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    return int(head.split(None, 2)[1]), body
+
+async def http_get(url: str, timeout: float) -> Tuple[int, bytes]:
+    """(status, cuerpo) de un GET sin bloquear el event loop"""
+    if httpx is not None:
+        resp = await (await _client()).get(url, timeout=timeout)
+        return resp.status_code, resp.content
+    return await asyncio.wait_for(_raw_get(url), timeout)
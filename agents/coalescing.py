@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+🔗 Coalescing (single-flight)
+Peticiones idénticas en vuelo comparten una sola llamada upstream: la primera
+(líder) ejecuta, las demás esperan y reciben su resultado o su excepción.
+
+Uso:
+    flight = SingleFlight()
+    flight.do(clave, lambda: llamada_cara())
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class _InFlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Comparte una sola llamada upstream entre peticiones idénticas en vuelo"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+    
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Ejecutar fn() una vez por clave; las llamadas concurrentes esperan su resultado"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced_calls += 1
+                leader = False
+            else:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self.upstream_calls += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "upstream": self.upstream_calls,
+                "coalesced": self.coalesced_calls,
+                "in_flight": len(self._calls),
+            }
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+🧠 Context Builder - Memorias relevantes antes de cada tarea
+La búsqueda en memoria arranca en paralelo con la creación del agente y
+tiene un deadline fijo: si no llega a tiempo, la tarea sale sin contexto.
+
+- Fuente por defecto: memory/memoria-local.py (cargado con importlib)
+- MOLTBOT_MEMORY=wrapper usa la clase Memoria (local + Mem0)
+- Deduplica, rankea (score, uso, recencia) y empaqueta con token_budget
+- Memoiza resultados: una tarea equivalente a otra ya resuelta (misma huella,
+  o embedding con similitud >= MOLTBOT_RESULT_SIMILARITY) no llega al modelo.
+  Las tareas que dependen del momento (estado, informes, "hoy") no se memoizan
+
+Uso:
+    retrieval = start_retrieval(task)        # antes de crear el agente
+    agent = create_agent("minimax")
+    ctx = build_context(task, retrieval, get_agent_model(agent))
+    kickoff_task(agent, ctx.prompt)
+
+    # Dentro de un event loop: astart_retrieval / abuild_context
+"""
+
+import asyncio
+import importlib.util
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+from router import embed
+from token_budget import PackedPrompt, pack_prompt
+
+MEMORY_DIR = os.environ.get(
+    "MOLTBOT_MEMORY_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "memory"),
+)
+MEMORY_BACKEND = os.environ.get("MOLTBOT_MEMORY", "local")  # local | wrapper | off
+
+# Lo máximo que la recuperación puede sumar al tiempo hasta el primer token
+RETRIEVAL_DEADLINE = float(os.environ.get("MOLTBOT_MEMORY_DEADLINE_MS", "150")) / 1000
+RETRIEVAL_LIMIT = 8
+
+# Embedding de la tarea para buscar resultados parecidos: si Ollama tarda,
+# solo vale la huella exacta
+EMBED_TIMEOUT = 0.5
+
+# ═══════════════════════════════════════════════════════════════
+#  FUENTES DE MEMORIA
+# ═══════════════════════════════════════════════════════════════
+
+_modules: Dict[str, object] = {}
+_modules_lock = threading.Lock()
+
+def _load_module(filename: str):
+    """Cargar memoria-*.py (nombre con guión) una sola vez"""
+    with _modules_lock:
+        if filename not in _modules:
+            path = os.path.join(MEMORY_DIR, filename)
+            name = filename.replace("-", "_").removesuffix(".py")
+            spec = importlib.util.spec_from_file_location(name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _modules[filename] = module
+        return _modules[filename]
+
+_memoria = None
+
+def _search_memories(query: str, limit: int) -> List[Dict]:
+    """Buscar en la fuente configurada; siempre devuelve dicts con 'text'"""
+    global _memoria
+    if MEMORY_BACKEND == "wrapper":
+        if _memoria is None:
+            _memoria = _load_module("memoria-wrapper.py").Memoria()
+        return [{"text": text, "_score": 1 - i / (limit + 1)}
+                for i, text in enumerate(_memoria.search(query, limit))]
+    return _load_module("memoria-local.py").search(query, limit=limit)
+
+# ═══════════════════════════════════════════════════════════════
+#  RECUPERACIÓN CON DEADLINE
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class Retrieval:
+    """Búsqueda en curso (lanzada antes de crear el agente)"""
+    query: str
+    future: Union[Future, "asyncio.Future"]
+    started: float = field(default_factory=time.perf_counter)
+
+def start_retrieval(task: str, limit: int = RETRIEVAL_LIMIT) -> Retrieval:
+    """Lanzar la búsqueda en un hilo daemon (no bloquea la salida del proceso)"""
+    future: Future = Future()
+
+    def _run():
+        try:
+            future.set_result(_search_memories(task, limit) if MEMORY_BACKEND != "off" else [])
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=_run, name="memory-retrieval", daemon=True).start()
+    return Retrieval(task, future)
+
+def astart_retrieval(task: str, limit: int = RETRIEVAL_LIMIT) -> Retrieval:
+    """start_retrieval() para un event loop: la búsqueda va al pool de hilos, sin hilo propio"""
+    if MEMORY_BACKEND == "off":
+        future = asyncio.get_running_loop().create_future()
+        future.set_result([])
+    else:
+        future = asyncio.get_running_loop().run_in_executor(None, _search_memories, task, limit)
+    return Retrieval(task, future)
+
+_SPACES = re.compile(r"\s+")
+
+def _normalize(text: str) -> str:
+    return _SPACES.sub(" ", text.strip().lower())
+
+def dedupe_and_rank(memories: List[Dict]) -> List[Dict]:
+    """Quitar duplicados (o contenidos en otra) y ordenar por score, uso y recencia"""
+    # Orden estable: primero recencia, luego score y uso
+    ranked = sorted((m for m in memories if m.get("text")),
+                    key=lambda m: m.get("created") or "", reverse=True)
+    ranked.sort(key=lambda m: (-m.get("_score", 0), -m.get("usage_count", 0)))
+
+    kept: List[Dict] = []
+    seen: List[str] = []
+    for memory in ranked:
+        norm = _normalize(memory["text"])
+        if any(norm in other or other in norm for other in seen):
+            continue
+        seen.append(norm)
+        kept.append(memory)
+    return kept
+
+@dataclass
+class TaskContext:
+    """Prompt final y métricas de la recuperación"""
+    prompt: str
+    memories: int
+    elapsed_ms: float
+    timed_out: bool = False
+    error: Optional[str] = None
+    packed: Optional[PackedPrompt] = None
+
+def build_context(task: str, retrieval: Optional[Retrieval], model: str,
+                  deadline: float = RETRIEVAL_DEADLINE) -> TaskContext:
+    """Esperar lo que quede del deadline y anteponer las memorias a la tarea"""
+    if retrieval is None:
+        return TaskContext(task, 0, 0.0)
+
+    remaining = max(deadline - (time.perf_counter() - retrieval.started), 0)
+    memories, timed_out, error = [], False, None
+    try:
+        memories = retrieval.future.result(timeout=remaining)
+    except FutureTimeout:
+        timed_out = True
+    except Exception as e:
+        error = str(e)
+    elapsed = (time.perf_counter() - retrieval.started) * 1000
+    return _pack(task, memories, model, elapsed, timed_out, error)
+
+async def abuild_context(task: str, retrieval: Optional[Retrieval], model: str,
+                         deadline: float = RETRIEVAL_DEADLINE) -> TaskContext:
+    """build_context() sin bloquear el event loop (retrieval de astart_retrieval)"""
+    if retrieval is None:
+        return TaskContext(task, 0, 0.0)
+
+    remaining = max(deadline - (time.perf_counter() - retrieval.started), 0)
+    memories, timed_out, error = [], False, None
+    try:
+        memories = await asyncio.wait_for(retrieval.future, remaining)
+    except asyncio.TimeoutError:
+        timed_out = True
+    except Exception as e:
+        error = str(e)
+    elapsed = (time.perf_counter() - retrieval.started) * 1000
+    return _pack(task, memories, model, elapsed, timed_out, error)
+
+def _pack(task: str, memories: List[Dict], model: str, elapsed: float,
+          timed_out: bool, error: Optional[str]) -> TaskContext:
+    ranked = dedupe_and_rank(memories)
+    if not ranked:
+        return TaskContext(task, 0, elapsed, timed_out, error)
+
+    packed = pack_prompt(task, ranked, model)
+    return TaskContext(packed.text, packed.included, elapsed, timed_out, error, packed)
+
+def describe(ctx: TaskContext) -> str:
+    """Línea de estado para la CLI"""
+    if ctx.timed_out:
+        return f"🧠 Memoria: sin contexto (deadline {RETRIEVAL_DEADLINE * 1000:.0f} ms)"
+    if ctx.error:
+        return f"🧠 Memoria: no disponible ({ctx.error})"
+    return f"🧠 Memoria: {ctx.memories} recuerdos ({ctx.elapsed_ms:.0f} ms)"
+
+# ═══════════════════════════════════════════════════════════════
+#  RESULTADOS MEMOIZADOS
+# ═══════════════════════════════════════════════════════════════
+
+# Tareas cuya respuesta cambia con el tiempo aunque el texto sea el mismo
+_VOLATILE = re.compile(
+    r"\b(?:estado|status|informes?|reportes?|reports?|hoy|today|ahora|now|ayer|"
+    r"yesterday|actual(?:es)?|current|[uú]ltim[oa]s?|latest|pendientes?|pending)\b",
+    re.IGNORECASE,
+)
+
+def is_volatile(task: str) -> bool:
+    """¿La respuesta depende del momento? (estado del tablero, informes, "hoy"...)"""
+    return _VOLATILE.search(task) is not None
+
+_vectors: Dict[str, List[float]] = {}
+_vectors_lock = threading.Lock()
+
+def _task_vector(task: str, memoria) -> Optional[List[float]]:
+    """Embedding de la tarea (None si la similitud está desactivada u Ollama no responde)
+
+    Se guarda por proceso para que lookup y remember de la misma tarea hagan
+    una sola llamada; los fallos no se guardan.
+    """
+    if memoria.RESULT_SIMILARITY >= 1:
+        return None
+    with _vectors_lock:
+        if task in _vectors:
+            return _vectors[task]
+    vector = embed(task, timeout=EMBED_TIMEOUT)
+    if vector:
+        with _vectors_lock:
+            if len(_vectors) >= 64:
+                _vectors.pop(next(iter(_vectors)))
+            _vectors[task] = vector
+    return vector
+
+def lookup_result(task: str, agent_id: str = "") -> Optional[Dict]:
+    """Resultado guardado de una tarea equivalente (None si no hay, es volátil o memoria off)"""
+    if MEMORY_BACKEND == "off" or is_volatile(task):
+        return None
+    try:
+        memoria = _load_module("memoria-local.py")
+        return memoria.find_result(task, agent_id, _task_vector(task, memoria))
+    except Exception:
+        return None
+
+def remember_result(task: str, result, agent_id: str = "", elapsed: float = 0.0):
+    """Guardar el resultado de la tarea para reutilizarlo (las volátiles no)"""
+    if MEMORY_BACKEND == "off" or is_volatile(task):
+        return
+    try:
+        memoria = _load_module("memoria-local.py")
+        memoria.remember_result(task, str(result), agent_id, elapsed, _task_vector(task, memoria))
+    except Exception as e:
+        print(f"⚠️ No se pudo memoizar el resultado: {e}")
+
+def result_stats() -> Dict:
+    """Tasa de aciertos y segundos de inferencia ahorrados"""
+    return _load_module("memoria-local.py").result_stats()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+🔥 Model Residency Manager
+Mantiene calientes los modelos Ollama que más se usan.
+
+- Consulta qué modelos de CONFIGURED_AGENTS están cargados (/api/ps)
+- Pre-calienta el modelo más probable para la siguiente tarea
+- Fija (keep-alive largo) los modelos frecuentes
+- Agrupa tareas en cola por modelo para evitar recargas
+
+Uso:
+    python3 model_residency.py            → Ver modelos cargados
+    python3 model_residency.py warm MODEL → Pre-cargar modelo
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from registry import get_ollama_agents, LOCAL_CONFIGS
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tracker"))
+from locking import atomic_write_json
+
+# ═══════════════════════════════════════════════════════════════
+#  CONFIGURACIÓN
+# ═══════════════════════════════════════════════════════════════
+
+# API nativa de Ollama (sin el sufijo /v1 de la API OpenAI)
+OLLAMA_API_URL = LOCAL_CONFIGS["ollama"]["url"].rsplit("/v1", 1)[0]
+
+STATE_FILE = os.path.expanduser("~/.moltbot/residency.json")
+
+DEFAULT_KEEP_ALIVE = "5m"     # Default de Ollama
+PINNED_KEEP_ALIVE = "60m"     # Modelos frecuentes
+PIN_MIN_USES = 3              # Usos recientes para fijar un modelo
+RECENT_WINDOW = 20            # Historial considerado "reciente"
+PS_CACHE_TTL = 5.0            # Segundos que se cachea /api/ps
+# Modelos que caben a la vez (igual que OLLAMA_MAX_LOADED_MODELS del servidor)
+MAX_RESIDENT = int(os.environ.get("OLLAMA_MAX_LOADED_MODELS", "2"))
+
+# ═══════════════════════════════════════════════════════════════
+#  MANAGER
+# ═══════════════════════════════════════════════════════════════
+
+class ModelResidencyManager:
+    """Residencia de modelos Ollama (carga, keep-alive y predicción)"""
+
+    def __init__(self, base_url: str = OLLAMA_API_URL, state_file: Optional[str] = STATE_FILE,
+                 models: Optional[List[str]] = None):
+        self.base_url = base_url.rstrip("/")
+        self.state_file = state_file
+        self.models = models or [a.model for a in get_ollama_agents()]
+        self._lock = threading.Lock()
+        self._ps_cache = None
+        self._ps_time = 0.0
+        self._warming = set()
+        self._dirty = False
+        self._writer: Optional[threading.Thread] = None
+        self.history: List[str] = []
+        self.transitions: Dict[str, Dict[str, int]] = {}
+        self._load_state()
+
+    # ── Estado persistente ─────────────────────────────────────
+
+    def _load_state(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            self.history = state.get("history", [])[-RECENT_WINDOW:]
+            self.transitions = state.get("transitions", {})
+        except Exception:
+            pass
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        try:
+            with self._lock:
+                state = {"history": list(self.history),
+                         "transitions": {m: dict(row) for m, row in self.transitions.items()}}
+            # Reemplazo atómico: varios agentes comparten el archivo
+            atomic_write_json(self.state_file, state, fsync=False)
+        except Exception:
+            pass
+
+    def _schedule_save(self):
+        """Guardar en segundo plano; varios usos seguidos se agrupan en una escritura"""
+        with self._lock:
+            self._dirty = True
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._write_pending,
+                                            name="residency-save", daemon=True)
+            self._writer.start()
+
+    def _write_pending(self):
+        while True:
+            with self._lock:
+                if not self._dirty:
+                    self._writer = None
+                    return
+                self._dirty = False
+            self._save_state()
+
+    def flush(self):
+        """Esperar a que se escriba el estado pendiente"""
+        while True:
+            with self._lock:
+                writer = self._writer
+            if writer is None:
+                return
+            writer.join()
+
+    # ── API de Ollama ──────────────────────────────────────────
+
+    def _get(self, path: str, timeout: float = 2):
+        import requests
+        resp = requests.get(f"{self.base_url}{path}", timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def _post(self, path: str, payload: Dict, timeout: float = 120):
+        import requests
+        resp = requests.post(f"{self.base_url}{path}", json=payload, timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def loaded_models(self, refresh: bool = False) -> List[str]:
+        """Modelos cargados actualmente en Ollama"""
+        now = time.monotonic()
+        if not refresh and self._ps_cache is not None and now - self._ps_time < PS_CACHE_TTL:
+            return list(self._ps_cache)
+        try:
+            data = self._get("/api/ps")
+            loaded = [m.get("model") or m.get("name") for m in data.get("models", [])]
+        except Exception:
+            loaded = []
+        self._ps_cache = loaded
+        self._ps_time = now
+        return list(loaded)
+
+    def is_loaded(self, model: str) -> bool:
+        return model in self.loaded_models()
+
+    def warm(self, model: str, keep_alive: Union[str, int] = DEFAULT_KEEP_ALIVE) -> bool:
+        """Cargar modelo (prompt vacío) y fijar su keep-alive"""
+        try:
+            self._post("/api/generate", {"model": model, "prompt": "", "keep_alive": keep_alive})
+            self._ps_cache = None
+            return True
+        except Exception as e:
+            print(f"⚠️ No se pudo pre-cargar {model}: {e}")
+            return False
+
+    def warm_async(self, model: str, keep_alive: str = DEFAULT_KEEP_ALIVE) -> Optional[threading.Thread]:
+        """Pre-cargar en segundo plano (no bloquea la tarea actual)"""
+        with self._lock:
+            if model in self._warming:
+                return None
+            self._warming.add(model)
+
+        def _run():
+            try:
+                self.warm(model, keep_alive)
+            finally:
+                with self._lock:
+                    self._warming.discard(model)
+
+        thread = threading.Thread(target=_run, name=f"warm-{model}", daemon=True)
+        thread.start()
+        return thread
+
+    def unload(self, model: str) -> bool:
+        """Descargar modelo (keep_alive=0)"""
+        return self.warm(model, keep_alive=0)
+
+    # ── Uso y predicción ───────────────────────────────────────
+
+    def use_count(self, model: str) -> int:
+        with self._lock:
+            return self.history.count(model)
+
+    def is_hot(self, model: str) -> bool:
+        """Modelo usado con frecuencia reciente"""
+        return self.use_count(model) >= PIN_MIN_USES
+
+    def keep_alive_for(self, model: str) -> str:
+        return PINNED_KEEP_ALIVE if self.is_hot(model) else DEFAULT_KEEP_ALIVE
+
+    def predict_next(self, model: str) -> Optional[str]:
+        """Modelo más probable después de `model` (según transiciones)"""
+        with self._lock:
+            return self._predict_locked(model)
+
+    def _predict_locked(self, model: str) -> Optional[str]:
+        following = self.transitions.get(model)
+        if not following:
+            return None
+        return max(following.items(), key=lambda kv: kv[1])[0]
+
+    def record_use(self, model: str, prewarm: bool = True) -> Optional[str]:
+        """Registrar uso, fijar si es frecuente y pre-calentar el siguiente
+
+        Solo actualiza el historial en memoria: la escritura del estado, la
+        consulta a /api/ps y las cargas van en segundo plano para no retrasar
+        la creación del agente.
+        """
+        if model not in self.models:
+            return None
+
+        with self._lock:
+            if self.history:
+                prev = self.history[-1]
+                if prev != model:
+                    row = self.transitions.setdefault(prev, {})
+                    row[model] = row.get(model, 0) + 1
+            self.history.append(model)
+            self.history = self.history[-RECENT_WINDOW:]
+            next_model = self._predict_locked(model) if prewarm else None
+        self._schedule_save()
+
+        if not prewarm:
+            return None
+
+        with self._lock:
+            if model in self._warming:
+                return next_model
+            self._warming.add(model)
+        threading.Thread(target=self._prewarm, args=(model, next_model),
+                         name=f"warm-{model}", daemon=True).start()
+        return next_model
+
+    def _prewarm(self, model: str, next_model: Optional[str]):
+        try:
+            # Carga/keep-alive del modelo actual en paralelo a la creación del agente
+            if not self.is_loaded(model) or self.is_hot(model):
+                self.warm(model, self.keep_alive_for(model))
+
+            # Pre-calentar el siguiente solo si hay hueco: no desalojar el actual
+            loaded = set(self.loaded_models()) | {model}
+            if next_model and next_model not in loaded and len(loaded) < MAX_RESIDENT:
+                self.warm(next_model, self.keep_alive_for(next_model))
+        finally:
+            with self._lock:
+                self._warming.discard(model)
+
+    # ── Cola de tareas ─────────────────────────────────────────
+
+    def group_by_model(self, tasks: Iterable[Any], key=None) -> List[Any]:
+        """Reordenar tareas agrupando por modelo (primero los ya cargados)
+
+        `key` extrae el modelo de cada tarea; por defecto task["model"].
+        El orden relativo dentro de cada modelo se conserva.
+        """
+        key = key or (lambda t: t["model"])
+        groups: "OrderedDict[str, List[Any]]" = OrderedDict()
+        for task in tasks:
+            groups.setdefault(key(task), []).append(task)
+
+        loaded = set(self.loaded_models())
+        order = sorted(groups, key=lambda m: 0 if m in loaded else 1)
+
+        ordered = []
+        for model in order:
+            ordered.extend(groups[model])
+        return ordered
+
+    def status(self) -> Dict[str, Dict]:
+        """Estado de cada modelo configurado"""
+        loaded = set(self.loaded_models())
+        return {
+            model: {
+                "loaded": model in loaded,
+                "uses": self.use_count(model),
+                "pinned": self.is_hot(model),
+                "next": self.predict_next(model),
+            }
+            for model in self.models
+        }
+
+# ═══════════════════════════════════════════════════════════════
+#  INSTANCIA COMPARTIDA
+# ═══════════════════════════════════════════════════════════════
+
+_manager: Optional[ModelResidencyManager] = None
+
+def get_residency_manager() -> ModelResidencyManager:
+    """Manager compartido del proceso"""
+    global _manager
+    if _manager is None:
+        _manager = ModelResidencyManager()
+        atexit.register(_manager.flush)
+    return _manager
+
+def print_residency():
+    """Imprimir modelos cargados y fijados"""
+    manager = get_residency_manager()
+    print("\n🔥 RESIDENCIA DE MODELOS (Ollama)")
+    print("=" * 40)
+    for model, info in manager.status().items():
+        icon = "🟢" if info["loaded"] else "⚪"
+        pin = " 📌" if info["pinned"] else ""
+        print(f"  {icon} {model}{pin} (usos: {info['uses']})")
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 2 and sys.argv[1] == "warm":
+        ok = get_residency_manager().warm(sys.argv[2], PINNED_KEEP_ALIVE)
+        print("✅ Cargado" if ok else "❌ Error")
+    else:
+        print_residency()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+🧩 Pipeline - Trabajos de varias tareas con dependencias (DAG)
+Cada tarea va a su agente (coder, reasoner, quick o auto) y recibe los
+resultados de las tareas de las que depende. Las ramas independientes
+corren en paralelo, limitadas por backend (Ollama sirve una inferencia a
+la vez por defecto), así que el tiempo total se acerca al de la rama más
+larga en lugar de a la suma.
+
+Formato (JSON):
+    {
+      "tasks": [
+        {"id": "spec",   "task": "Define la API de ...", "agent": "minimax"},
+        {"id": "code",   "task": "Implementa la API",    "agent": "ollama-coder", "depends": ["spec"]},
+        {"id": "review", "task": "Analiza riesgos",      "agent": "ollama-qwen14b", "depends": ["spec"]},
+        {"id": "final",  "task": "Resume todo",          "depends": ["code", "review"]}
+      ]
+    }
+
+`agent` es un ID de create_agent() o "auto" (por defecto).
+
+Uso:
+    python3 agent_cli.py --pipeline job.json [--parallel 4] [--dry-run]
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# ═══════════════════════════════════════════════════════════════
+#  CONFIGURACIÓN
+# ═══════════════════════════════════════════════════════════════
+
+MAX_PARALLEL = 4
+
+# Inferencias simultáneas por backend (Ollama: OLLAMA_NUM_PARALLEL del servidor)
+BACKEND_CONCURRENCY = {
+    "opencode": 4,
+    "ollama": int(os.environ.get("OLLAMA_NUM_PARALLEL", "1")),
+    "lm_studio": 1,
+}
+
+# ═══════════════════════════════════════════════════════════════
+#  MODELO
+# ═══════════════════════════════════════════════════════════════
+
+@dataclass
+class PipelineTask:
+    id: str
+    task: str
+    agent: str = "auto"
+    depends: List[str] = field(default_factory=list)
+    expected_output: str = "Response"
+
+@dataclass
+class TaskRun:
+    id: str
+    status: str = "pending"        # pending | running | done | failed | skipped
+    result: Any = None
+    error: Optional[str] = None
+    agent: Optional[str] = None    # Rol del agente que la ejecutó
+    start: Optional[float] = None  # Segundos desde el inicio del pipeline (ya con turno en el backend)
+    end: Optional[float] = None
+    queue_wait: float = 0.0        # Segundos esperando turno en el backend
+
+    @property
+    def duration(self) -> float:
+        return (self.end - self.start) if self.start is not None and self.end is not None else 0.0
+
+class PipelineError(ValueError):
+    """Definición de pipeline inválida (IDs repetidos, dependencias o ciclos)"""
+
+class Pipeline:
+    """DAG de tareas validado y en orden topológico"""
+
+    def __init__(self, tasks: List[PipelineTask]):
+        self.tasks = {t.id: t for t in tasks}
+        if len(self.tasks) != len(tasks):
+            raise PipelineError("IDs de tarea repetidos")
+        for t in tasks:
+            missing = [d for d in t.depends if d not in self.tasks]
+            if missing:
+                raise PipelineError(f"'{t.id}' depende de tareas inexistentes: {', '.join(missing)}")
+        self._dependents: Dict[str, List[str]] = {tid: [] for tid in self.tasks}
+        for t in tasks:
+            for dep in t.depends:
+                self._dependents[dep].append(t.id)
+        self.order = self._toposort()
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Pipeline":
+        return cls([PipelineTask(
+            id=str(t["id"]),
+            task=t["task"],
+            agent=t.get("agent", "auto"),
+            depends=[str(d) for d in t.get("depends", [])],
+            expected_output=t.get("expected_output", "Response"),
+        ) for t in data["tasks"]])
+
+    @classmethod
+    def from_file(cls, path: str) -> "Pipeline":
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    def _toposort(self) -> List[str]:
+        pending = {tid: len(t.depends) for tid, t in self.tasks.items()}
+        ready = [tid for tid, n in pending.items() if n == 0]
+        order = []
+        while ready:
+            tid = ready.pop(0)
+            order.append(tid)
+            for other in self.dependents(tid):
+                pending[other] -= 1
+                if pending[other] == 0:
+                    ready.append(other)
+        if len(order) != len(self.tasks):
+            cycle = sorted(tid for tid, n in pending.items() if n > 0)
+            raise PipelineError(f"Ciclo de dependencias entre: {', '.join(cycle)}")
+        return order
+
+    def dependents(self, task_id: str) -> List[str]:
+        return self._dependents[task_id]
+
+    def levels(self) -> List[List[str]]:
+        """Tareas agrupadas por profundidad (las de un nivel pueden ir en paralelo)"""
+        depth: Dict[str, int] = {}
+        for tid in self.order:
+            depth[tid] = 1 + max((depth[d] for d in self.tasks[tid].depends), default=-1)
+        levels: List[List[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for tid in self.order:
+            levels[depth[tid]].append(tid)
+        return levels
+
+# ═══════════════════════════════════════════════════════════════
+#  EJECUCIÓN
+# ═══════════════════════════════════════════════════════════════
+
+def dependency_prompt(spec: PipelineTask, results: Dict[str, Any], model: str) -> str:
+    """Tarea con los resultados de sus dependencias, dentro de la ventana del modelo"""
+    if not spec.depends:
+        return spec.task
+    from token_budget import estimate_tokens, get_prompt_budget, truncate_middle
+
+    header, footer = "Resultados de pasos anteriores:\n\n", "\n\nTarea:\n"
+    available = (get_prompt_budget(model) - estimate_tokens(spec.task + header + footer, model))
+    per_dep = max(available // len(spec.depends), 0)
+    blocks = []
+    for dep in spec.depends:
+        text = str(results.get(dep, ""))
+        if estimate_tokens(text, model) > per_dep:
+            text = truncate_middle(text, per_dep, model)
+        blocks.append(f"### {dep}\n{text}")
+    return header + "\n\n".join(blocks) + footer + spec.task
+
+_slots = {backend: threading.BoundedSemaphore(n) for backend, n in BACKEND_CONCURRENCY.items()}
+
+# Por hilo: cuándo la tarea en curso obtuvo y soltó su turno, y cuánto esperó
+_slot_clock = threading.local()
+
+@contextmanager
+def backend_slot(backend: str):
+    """Esperar turno en el backend (las ramas de otros backends siguen corriendo)"""
+    slot = _slots.get(backend)
+    entered = time.perf_counter()
+    if slot is not None:
+        slot.acquire()
+    acquired = time.perf_counter()
+    _slot_clock.wait = getattr(_slot_clock, "wait", 0.0) + (acquired - entered)
+    if getattr(_slot_clock, "acquired", None) is None:
+        _slot_clock.acquired = acquired
+    try:
+        yield
+    finally:
+        _slot_clock.released = time.perf_counter()
+        if slot is not None:
+            slot.release()
+
+def order_by_residency(pipeline: Pipeline, ready: List[str]) -> List[str]:
+    """Tareas listas agrupadas por modelo Ollama, primero las de modelos ya cargados"""
+    from registry import AGENT_ID_MODELS, get_backend
+
+    models = {tid: AGENT_ID_MODELS.get(pipeline.tasks[tid].agent) for tid in ready}
+    if sum(1 for m in models.values() if m and get_backend(m) == "ollama") < 2:
+        return ready
+    from model_residency import get_residency_manager
+    return get_residency_manager().group_by_model(ready, key=lambda tid: models[tid] or "")
+
+def default_execute(spec: PipelineTask, results: Dict[str, Any]) -> Tuple[Any, str]:
+    """Crear el agente de la tarea y ejecutarla; devuelve (resultado, rol del agente)"""
+    from agents import create_agent, get_agent_model, get_best_agent_for_task, kickoff_task
+    from registry import get_backend
+
+    agent = get_best_agent_for_task(spec.task) if spec.agent == "auto" else create_agent(spec.agent)
+    if agent is None:
+        raise RuntimeError(f"Agente '{spec.agent}' no disponible")
+    model = get_agent_model(agent)
+    prompt = dependency_prompt(spec, results, model)
+    with backend_slot(get_backend(model)):
+        return kickoff_task(agent, prompt, spec.expected_output), agent.role
+
+@dataclass
+class PipelineResult:
+    runs: Dict[str, TaskRun]
+    wall: float
+    pipeline: Pipeline
+
+    @property
+    def ok(self) -> bool:
+        return all(r.status == "done" for r in self.runs.values())
+
+    @property
+    def sequential(self) -> float:
+        """Lo que habría tardado ejecutando una tarea detrás de otra (sin esperas de turno)"""
+        return sum(r.duration for r in self.runs.values())
+
+    @property
+    def queue_wait(self) -> float:
+        return sum(r.queue_wait for r in self.runs.values())
+
+    def critical_path(self) -> List[str]:
+        """Cadena de dependencias que determinó el final (la que más tardó en completarse)"""
+        finished = {tid: r for tid, r in self.runs.items() if r.end is not None}
+        if not finished:
+            return []
+        path = [max(finished, key=lambda tid: finished[tid].end)]
+        while True:
+            deps = [d for d in self.pipeline.tasks[path[-1]].depends if d in finished]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda d: finished[d].end))
+        return list(reversed(path))
+
+def run_pipeline(pipeline: Pipeline, max_parallel: int = MAX_PARALLEL,
+                 execute: Optional[Callable] = None,
+                 on_event: Optional[Callable[[str, TaskRun], None]] = None) -> PipelineResult:
+    """Ejecutar el DAG: cada tarea sale en cuanto sus dependencias terminan
+
+    execute(spec, resultados_previos) -> (resultado, agente); por defecto default_execute.
+    """
+    execute = execute or default_execute
+    runs = {tid: TaskRun(tid) for tid in pipeline.order}
+    results: Dict[str, Any] = {}
+    remaining = {tid: set(t.depends) for tid, t in pipeline.tasks.items()}
+    origin = time.perf_counter()
+
+    def _work(tid: str):
+        spec, run = pipeline.tasks[tid], runs[tid]
+        run.status = "running"
+        if on_event:
+            on_event("start", run)
+        _slot_clock.__dict__.clear()
+        began = time.perf_counter()
+        try:
+            run.result, run.agent = execute(spec, dict(results))
+            run.status = "done"
+        except Exception as e:
+            run.status, run.error = "failed", str(e)
+        finally:
+            # Tiempos dentro del turno del backend: la cola no infla duración ni aceleración
+            finished = time.perf_counter()
+            start = getattr(_slot_clock, "acquired", None) or began
+            end = getattr(_slot_clock, "released", None) or finished
+            run.start, run.end = start - origin, end - origin
+            run.queue_wait = getattr(_slot_clock, "wait", 0.0)
+
+    def _skip(tid: str):
+        """Saltar todo lo que depende (directa o indirectamente) de una tarea fallida"""
+        for dep in pipeline.dependents(tid):
+            if runs[dep].status == "pending":
+                runs[dep].status, runs[dep].error = "skipped", f"falló '{tid}'"
+                if on_event:
+                    on_event("skip", runs[dep])
+                _skip(dep)
+
+    with ThreadPoolExecutor(max_workers=max(max_parallel, 1), thread_name_prefix="pipeline") as pool:
+        futures: Dict[Future, str] = {}
+
+        def _submit_ready():
+            ready = [tid for tid in pipeline.order
+                     if runs[tid].status == "pending" and not remaining[tid] and tid not in futures.values()]
+            # El semáforo de Ollama atiende en orden: mismo modelo seguido, sin recargas
+            for tid in order_by_residency(pipeline, ready):
+                futures[pool.submit(_work, tid)] = tid
+
+        _submit_ready()
+        while futures:
+            done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+            for future in done:
+                tid = futures.pop(future)
+                run = runs[tid]
+                if on_event:
+                    on_event(run.status, run)
+                if run.status == "done":
+                    results[tid] = run.result
+                    for dep in pipeline.dependents(tid):
+                        remaining[dep].discard(tid)
+                else:
+                    _skip(tid)
+            _submit_ready()
+
+    return PipelineResult(runs, time.perf_counter() - origin, pipeline)
+
+# ═══════════════════════════════════════════════════════════════
+#  REPORTE
+# ═══════════════════════════════════════════════════════════════
+
+_ICONS = {"start": "▶️ ", "done": "✅", "failed": "❌", "skip": "⏭️ "}
+
+def print_event(event: str, run: TaskRun):
+    """Progreso en vivo para la CLI"""
+    if event == "start":
+        print(f"  {_ICONS[event]} {run.id}")
+    elif event == "done":
+        waited = f", {run.queue_wait:.1f}s en cola" if run.queue_wait >= 0.05 else ""
+        print(f"  {_ICONS[event]} {run.id} en {run.duration:.1f}s [{run.agent}]{waited}")
+    elif event == "failed":
+        print(f"  {_ICONS[event]} {run.id}: {run.error}")
+    elif event == "skip":
+        print(f"  {_ICONS[event]} {run.id}: {run.error}")
+
+def print_plan(pipeline: Pipeline):
+    print("\n🧩 PLAN")
+    print("=" * 40)
+    for depth, level in enumerate(pipeline.levels()):
+        tasks = ", ".join(f"{tid} [{pipeline.tasks[tid].agent}]" for tid in level)
+        print(f"  {depth + 1}. {tasks}")
+
+def print_report(result: PipelineResult):
+    """Resultados finales (tareas sin dependientes) y tiempos"""
+    pipeline = result.pipeline
+    sinks = [tid for tid in pipeline.order if not pipeline.dependents(tid)]
+    for tid in sinks:
+        run = result.runs[tid]
+        if run.status == "done":
+            print(f"\n✅ {tid}:")
+            print(run.result)
+
+    path = result.critical_path()
+    path_time = sum(result.runs[tid].duration for tid in path)
+    print("\n⏱️  TIEMPOS")
+    print("=" * 40)
+    print(f"  Total (wall):     {result.wall:.1f}s")
+    print(f"  Secuencial:       {result.sequential:.1f}s")
+    if result.wall:
+        print(f"  Aceleración:      ×{result.sequential / result.wall:.1f}")
+    print(f"  Espera de turno:  {result.queue_wait:.1f}s")
+    print(f"  Camino crítico:   {' → '.join(path)} ({path_time:.1f}s)")
+    for tid in pipeline.order:
+        run = result.runs[tid]
+        mark = "★" if tid in path else " "
+        if run.start is None:
+            print(f"   {mark} {tid:16} {run.status}")
+        else:
+            queued = f"  (cola {run.queue_wait:.1f}s)" if run.queue_wait >= 0.05 else ""
+            print(f"   {mark} {tid:16} {run.start:6.1f}s → {run.end:6.1f}s  {run.status}{queued}")
@@ -13,10 +13,14 @@ Modelos disponibles:
 3. LM Studio Local - Offline (ya configurado)
 """
 
+import os
 from enum import Enum
 from dataclasses import dataclass
 from typing import Optional, List
 
+from resilience import get_resilience
+from telemetry import timed
+
 class Priority(Enum):
     """Prioridad de uso"""
     OPENCODE = 1      # Cloud gratuito
@@ -100,7 +104,9 @@ LOCAL_CONFIGS = {
     "ollama": {
         "url": "http://localhost:11434/v1",
         "embeddings_model": "nomic-embed-text:latest",
-        "default_model": "llama3.1:8b-instruct-q4_K_M"
+        "default_model": "llama3.1:8b-instruct-q4_K_M",
+        # Ventana real con la que Ollama carga el modelo (num_ctx)
+        "num_ctx": int(os.environ.get("OLLAMA_NUM_CTX", "4096"))
     },
     "lm_studio": {
         "url": "http://localhost:1234/v1",
@@ -120,55 +126,77 @@ def get_ollama_agents() -> List[AgentInfo]:
     """Lista de agentes Ollama"""
     return [a for a in CONFIGURED_AGENTS if a.provider == "Ollama Local"]
 
-def get_agent_by_task(task_type: str) -> AgentInfo:
-    """Obtener mejor agente según tipo de tarea"""
+def _build_task_map() -> dict:
+    """Mapa tipo de tarea → agente (se construye una sola vez)"""
+    def find(fragment: str) -> AgentInfo:
+        return next(a for a in CONFIGURED_AGENTS if fragment in a.name)
     
-    task_map = {
+    return {
         "quick": CONFIGURED_AGENTS[0],  # MiniMax
-        "code": [a for a in CONFIGURED_AGENTS if "Coder" in a.name][0],
-        "reasoning": [a for a in CONFIGURED_AGENTS if "14B" in a.name][0],
-        "general": [a for a in CONFIGURED_AGENTS if "Llama 3.1 8B" in a.name][0],
+        "code": find("Coder"),
+        "reasoning": find("14B"),
+        "general": find("Llama 3.1 8B"),
     }
-    
-    return task_map.get(task_type, CONFIGURED_AGENTS[0])
+
+TASK_AGENT_MAP = _build_task_map()
+
+# IDs de create_agent() → modelo (LM Studio se detecta al crear el agente)
+AGENT_ID_MODELS = {
+    "minimax": CONFIGURED_AGENTS[0].model,
+    "opencode": CONFIGURED_AGENTS[0].model,
+    "ollama": LOCAL_CONFIGS["ollama"]["default_model"],
+    "ollama-llama": TASK_AGENT_MAP["general"].model,
+    "ollama-coder": TASK_AGENT_MAP["code"].model,
+    "ollama-qwen14b": TASK_AGENT_MAP["reasoning"].model,
+}
+
+def get_agent_by_task(task_type: str) -> AgentInfo:
+    """Obtener mejor agente según tipo de tarea"""
+    return TASK_AGENT_MAP.get(task_type, CONFIGURED_AGENTS[0])
 
 def get_first_available() -> AgentInfo:
     """Obtener primer agente disponible (para fallback)"""
     return CONFIGURED_AGENTS[0]
 
+# Endpoint de health check por backend
+SERVICE_URLS = {
+    "opencode": "https://opencode.ai/zen/v1/models",
+    "ollama": "http://localhost:11434/api/tags",
+    "lm_studio": "http://localhost:1234/v1/models",
+}
+
+def get_backend(model: str) -> str:
+    """Backend (opencode, ollama, lm_studio) que sirve un modelo"""
+    for agent in CONFIGURED_AGENTS:
+        if agent.model == model:
+            return "opencode" if agent.provider == "OpenCode" else "ollama"
+    return "lm_studio"
+
+@timed("services.check")
 def check_services():
     """Verificar servicios disponibles"""
+    import time
     import requests
     
-    status = {
-        "opencode": False,
-        "ollama": False,
-        "lm_studio": False
-    }
+    resilience = get_resilience()
+    status = {}
     
-    # Check OpenCode
-    try:
-        resp = requests.get("https://opencode.ai/zen/v1/models", timeout=5)
-        if resp.status_code == 200:
-            status["opencode"] = True
-    except:
-        pass
-    
-    # Check Ollama
-    try:
-        resp = requests.get("http://localhost:11434/api/tags", timeout=2)
-        if resp.status_code == 200:
-            status["ollama"] = True
-    except:
-        pass
-    
-    # Check LM Studio
-    try:
-        resp = requests.get("http://localhost:1234/v1/models", timeout=2)
-        if resp.status_code == 200:
-            status["lm_studio"] = True
-    except:
-        pass
+    for service, url in SERVICE_URLS.items():
+        status[service] = False
+        # Breaker abierto: no esperar otro timeout
+        if not resilience.is_available(service):
+            continue
+        start = time.monotonic()
+        try:
+            resp = requests.get(url, timeout=resilience.deadline(service, "health"))
+            if resp.status_code == 200:
+                status[service] = True
+                resilience.record(service, "health", ok=True,
+                                  seconds=time.monotonic() - start, close_breaker=False)
+        except:
+            pass
+        if not status[service]:
+            resilience.record(service, "health", ok=False)
     
     return status
 
@@ -188,6 +216,16 @@ def print_status():
         }[service]
         print(f"  {icon} {name}")
     
+    print("\n🛡️ CIRCUIT BREAKERS")
+    print("=" * 50)
+    icons = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}
+    for backend, info in get_resilience().status().items():
+        p50 = f"{info['p50']:.1f}s" if info["p50"] is not None else "-"
+        p95 = f"{info['p95']:.1f}s" if info["p95"] is not None else "-"
+        print(f"  {icons[info['state']]} {backend:<10} {info['state']:<9} "
+              f"fallos: {info['failures']}  p50: {p50}  p95: {p95}  "
+              f"deadline: {info['deadline']:.0f}s")
+    
     print("\n📋 AGENTES CONFIGURADOS")
     print("=" * 50)
     for agent in CONFIGURED_AGENTS:
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+🛡️ Resiliencia por Backend
+Circuit breakers, presupuesto de reintentos y deadlines adaptativos.
+
+- Un circuit breaker por backend (opencode, ollama, lm_studio)
+- Reintentos con backoff exponencial y jitter, limitados por un presupuesto
+- Deadline por operación derivado de los percentiles de latencia observados
+
+Un backend colgado se corta tras su deadline: el llamador se libera, pero
+el hilo del worker sigue ocupado hasta que la llamada termine (Python no
+puede matarlo). Con MAX_HUNG_CALLS llamadas colgadas el backend se trata
+como no disponible, para que los cuelgues repetidos no agoten el pool.
+Solo los errores transitorios (timeouts, conexión, 429/5xx) se reintentan
+y cuentan para el breaker; un 400 o un error de auth se devuelve tal cual.
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Deque, Dict, Optional
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tracker"))
+from locking import atomic_write_json
+
+# ═══════════════════════════════════════════════════════════════
+#  CONFIGURACIÓN
+# ═══════════════════════════════════════════════════════════════
+
+STATE_FILE = os.path.expanduser("~/.moltbot/resilience.json")
+
+BACKENDS = ["opencode", "ollama", "lm_studio"]
+
+FAILURE_THRESHOLD = 3        # Fallos seguidos para abrir el breaker
+COOLDOWN_SECONDS = 60        # Tiempo abierto antes de probar (half-open)
+
+RETRY_RATIO = 0.2            # Reintentos permitidos por petición (20%)
+RETRY_MIN_TOKENS = 3         # Reintentos siempre disponibles
+BACKOFF_BASE = 0.5           # Segundos
+BACKOFF_CAP = 8.0
+
+MAX_WORKERS = 16
+MAX_HUNG_CALLS = 4           # Llamadas colgadas por backend antes de rechazar
+SAVE_INTERVAL = 5.0          # Segundos entre escrituras si el breaker no cambia
+
+LATENCY_WINDOW = 50          # Muestras por operación
+MIN_SAMPLES = 5              # Muestras antes de adaptar el deadline
+DEADLINE_PERCENTILE = 95
+DEADLINE_MULTIPLIER = 3.0
+
+# Deadline por operación: (por defecto, mínimo, máximo) en segundos
+DEADLINES = {
+    "health": (2.0, 0.5, 5.0),
+    "models": (2.0, 0.5, 5.0),
+    "kickoff": (300.0, 30.0, 600.0),
+}
+DEFAULT_DEADLINE = (60.0, 5.0, 300.0)
+
+# ═══════════════════════════════════════════════════════════════
+#  ERRORES
+# ═══════════════════════════════════════════════════════════════
+
+class BackendUnavailable(RuntimeError):
+    """El breaker del backend está abierto"""
+
+class DeadlineExceeded(TimeoutError):
+    """La llamada superó el deadline del backend"""
+
+# Excepciones transitorias de requests, httpx, openai y litellm (por nombre:
+# ninguna de esas librerías es obligatoria aquí)
+TRANSIENT_ERROR_NAMES = {
+    "ConnectionError", "ConnectTimeout", "ReadTimeout", "Timeout", "TimeoutException",
+    "TransportError", "APIConnectionError", "APITimeoutError", "RateLimitError",
+    "InternalServerError", "ServiceUnavailableError",
+}
+
+def is_transient(error: BaseException) -> bool:
+    """Timeout, fallo de conexión o respuesta 429/5xx: vale la pena reintentar"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+# ═══════════════════════════════════════════════════════════════
+#  COMPONENTES
+# ═══════════════════════════════════════════════════════════════
+
+class LatencyTracker:
+    """Ventana de latencias y percentiles"""
+
+    def __init__(self, window: int = LATENCY_WINDOW, samples=None):
+        self.samples: Deque[float] = deque(samples or [], maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+    def deadline(self, operation: str) -> float:
+        default, low, high = DEADLINES.get(operation, DEFAULT_DEADLINE)
+        if len(self.samples) < MIN_SAMPLES:
+            return default
+        observed = self.percentile(DEADLINE_PERCENTILE) * DEADLINE_MULTIPLIER
+        return max(low, min(high, observed))
+
+class CircuitBreaker:
+    """closed → open (tras N fallos) → half_open (tras cooldown) → closed"""
+
+    def __init__(self, failures: int = 0, opened_at: Optional[float] = None):
+        self.failures = failures
+        self.opened_at = opened_at
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= COOLDOWN_SECONDS:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_probe_success(self):
+        """Health check correcto en half_open: cerrar a prueba (un fallo más lo reabre)"""
+        if self.state == "half_open":
+            self.failures = FAILURE_THRESHOLD - 1
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= FAILURE_THRESHOLD:
+            self.opened_at = time.time()
+
+class RetryBudget:
+    """Presupuesto de reintentos: RETRY_RATIO por petición + un mínimo"""
+
+    def __init__(self, tokens: float = RETRY_MIN_TOKENS):
+        self.tokens = tokens
+
+    def on_request(self):
+        self.tokens = min(self.tokens + RETRY_RATIO, RETRY_MIN_TOKENS * 10)
+
+    def try_spend(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+def backoff_delay(attempt: int) -> float:
+    """Backoff exponencial con full jitter"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+# ═══════════════════════════════════════════════════════════════
+#  GESTOR
+# ═══════════════════════════════════════════════════════════════
+
+class ResilienceManager:
+    """Breakers, reintentos y deadlines por backend"""
+
+    def __init__(self, state_file: Optional[str] = STATE_FILE):
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="backend")
+        self.breakers: Dict[str, CircuitBreaker] = {b: CircuitBreaker() for b in BACKENDS}
+        self.budgets: Dict[str, RetryBudget] = {b: RetryBudget() for b in BACKENDS}
+        self.latencies: Dict[str, LatencyTracker] = {}
+        self.hung: Dict[str, int] = {}
+        self._dirty = False
+        self._saved_at = float("-inf")
+        self._load_state()
+        atexit.register(self.flush)
+
+    # ── Estado persistente (para que el CLI recuerde entre ejecuciones) ──
+
+    def _load_state(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            for backend, b in state.get("breakers", {}).items():
+                self.breakers[backend] = CircuitBreaker(b.get("failures", 0), b.get("opened_at"))
+            for key, samples in state.get("latencies", {}).items():
+                self.latencies[key] = LatencyTracker(samples=samples)
+        except Exception:
+            pass
+
+    def _save_state(self, force: bool = False):
+        """Escribir el estado (reemplazo atómico); sin cambios de breaker, como mucho cada SAVE_INTERVAL"""
+        if not self.state_file:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if not self._dirty or (not force and now - self._saved_at < SAVE_INTERVAL):
+                return
+            self._dirty, self._saved_at = False, now
+            state = {
+                "breakers": {
+                    b: {"failures": br.failures, "opened_at": br.opened_at}
+                    for b, br in self.breakers.items()
+                },
+                "latencies": {k: list(t.samples) for k, t in self.latencies.items()},
+            }
+        try:
+            atomic_write_json(self.state_file, state, fsync=False)
+        except Exception:
+            pass
+
+    def flush(self):
+        """Escribir lo pendiente (al salir del proceso)"""
+        self._save_state(force=True)
+
+    # ── Consultas ───────────────────────────────────────────────
+
+    def _breaker(self, backend: str) -> CircuitBreaker:
+        return self.breakers.setdefault(backend, CircuitBreaker())
+
+    def _tracker(self, backend: str, operation: str) -> LatencyTracker:
+        return self.latencies.setdefault(f"{backend}:{operation}", LatencyTracker())
+
+    def is_available(self, backend: str) -> bool:
+        """False si el breaker está abierto (half_open cuenta como disponible)"""
+        return self._breaker(backend).state != "open"
+
+    def deadline(self, backend: str, operation: str) -> float:
+        return self._tracker(backend, operation).deadline(operation)
+
+    def record(self, backend: str, operation: str, ok: bool, seconds: Optional[float] = None,
+               close_breaker: bool = True):
+        """Registrar resultado de una llamada hecha fuera de call()
+
+        Con close_breaker=False un éxito solo aporta latencia (p. ej. health
+        checks: responder /models no prueba que la inferencia funcione).
+        """
+        with self._lock:
+            breaker = self._breaker(backend)
+            state = breaker.state
+            if ok:
+                if close_breaker:
+                    breaker.record_success()
+                else:
+                    breaker.record_probe_success()
+                if seconds is not None:
+                    self._tracker(backend, operation).record(seconds)
+            else:
+                breaker.record_failure()
+            self._dirty = True
+        # Los cambios de estado del breaker se ven enseguida desde otros procesos
+        self._save_state(force=breaker.state != state)
+
+    # ── Ejecución ───────────────────────────────────────────────
+
+    def _admit(self, backend: str):
+        """BackendUnavailable si el breaker está abierto o hay demasiadas colgadas"""
+        with self._lock:
+            allowed = self._breaker(backend).allow()
+            hung = self.hung.get(backend, 0)
+        if not allowed:
+            raise BackendUnavailable(f"{backend}: circuit breaker abierto")
+        if hung >= MAX_HUNG_CALLS:
+            raise BackendUnavailable(f"{backend}: {hung} llamadas colgadas sin terminar")
+
+    def _hung_up(self, backend: str, future: Future, timeout: float) -> DeadlineExceeded:
+        """Backend colgado: no se reintenta, se libera al llamador. El worker
+        sigue ocupado hasta que fn() vuelva"""
+        with self._lock:
+            self.hung[backend] = self.hung.get(backend, 0) + 1
+        future.add_done_callback(lambda _: self._release_hung(backend))
+        return DeadlineExceeded(f"{backend}: sin respuesta en {timeout:.1f}s")
+
+    def _may_retry(self, budget: RetryBudget, attempt: int, retries: int) -> bool:
+        with self._lock:
+            return attempt < retries and budget.try_spend()
+
+    def call(self, backend: str, fn: Callable[[], Any], operation: str = "kickoff",
+             retries: int = 2) -> Any:
+        """Ejecutar fn() con breaker, deadline adaptativo y reintentos con jitter"""
+        budget = self.budgets.setdefault(backend, RetryBudget())
+        with self._lock:
+            budget.on_request()
+
+        attempt = 0
+        while True:
+            self._admit(backend)
+            timeout = self.deadline(backend, operation)
+            start = time.monotonic()
+            future = self._executor.submit(fn)
+            try:
+                result = future.result(timeout=timeout)
+            except FutureTimeout:
+                error = self._hung_up(backend, future, timeout)
+                self.record(backend, operation, ok=False)
+                raise error
+            except Exception as e:
+                # Un error no transitorio es una respuesta del backend
+                # (petición inválida, auth...): ni reintento ni fallo para el breaker
+                transient = is_transient(e)
+                self.record(backend, operation, ok=not transient)
+                if not transient or not self._may_retry(budget, attempt, retries):
+                    raise
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            self.record(backend, operation, ok=True, seconds=time.monotonic() - start)
+            return result
+
+    async def acall(self, backend: str, fn: Callable[[], Any], operation: str = "kickoff",
+                    retries: int = 2) -> Any:
+        """call() para asyncio: fn() ocupa un solo hilo del pool y el llamador
+        espera el deadline y el backoff en el event loop"""
+        budget = self.budgets.setdefault(backend, RetryBudget())
+        with self._lock:
+            budget.on_request()
+
+        attempt = 0
+        while True:
+            self._admit(backend)
+            timeout = self.deadline(backend, operation)
+            start = time.monotonic()
+            future = self._executor.submit(fn)
+            # wait() no cancela el future al vencer el deadline ni si cancelan al llamador
+            waiter = asyncio.wrap_future(future)
+            done, _ = await asyncio.wait({waiter}, timeout=timeout)
+            # record() persiste el estado del breaker: fuera del event loop
+            if not done:
+                error = self._hung_up(backend, future, timeout)
+                await asyncio.to_thread(self.record, backend, operation, False)
+                raise error
+            try:
+                result = waiter.result()
+            except Exception as e:
+                transient = is_transient(e)
+                await asyncio.to_thread(self.record, backend, operation, not transient)
+                if not transient or not self._may_retry(budget, attempt, retries):
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            await asyncio.to_thread(self.record, backend, operation, True,
+                                    time.monotonic() - start)
+            return result
+
+    def _release_hung(self, backend: str):
+        with self._lock:
+            self.hung[backend] = max(self.hung.get(backend, 0) - 1, 0)
+
+    def status(self) -> Dict[str, Dict]:
+        """Estado por backend: breaker, fallos, p50/p95 y deadline de kickoff"""
+        result = {}
+        for backend in BACKENDS:
+            breaker = self._breaker(backend)
+            tracker = self._tracker(backend, "kickoff")
+            result[backend] = {
+                "state": breaker.state,
+                "failures": breaker.failures,
+                "p50": tracker.percentile(50),
+                "p95": tracker.percentile(95),
+                "deadline": tracker.deadline("kickoff"),
+            }
+        return result
+
+# ═══════════════════════════════════════════════════════════════
+#  INSTANCIA COMPARTIDA
+# ═══════════════════════════════════════════════════════════════
+
+_manager: Optional[ResilienceManager] = None
+
+def get_resilience() -> ResilienceManager:
+    """Gestor compartido del proceso"""
+    global _manager
+    if _manager is None:
+        _manager = ResilienceManager()
+    return _manager
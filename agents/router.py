@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+🧭 Task Router
+Clasifica tareas (quick / code / reasoning / general) para elegir agente.
+
+- Palabras clave (completas, sin raíces abiertas) compiladas en un único regex
+- Clasificador opcional por embeddings (Ollama) contra los `best_for`
+  de cada agente, solo cuando las palabras clave no deciden
+- Benchmark de precisión (conjunto reservado o historial real) y latencia
+
+Uso:
+    python3 router.py "Escribe un script en Python"
+    python3 router.py --bench
+    python3 router.py --bench --labels historial.jsonl   # {"task": ..., "label": ...}
+"""
+
+import math
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from registry import CONFIGURED_AGENTS, LOCAL_CONFIGS, get_agent_by_task
+
+# ═══════════════════════════════════════════════════════════════
+#  PALABRAS CLAVE
+# ═══════════════════════════════════════════════════════════════
+
+# Palabras completas: las variantes (plural, conjugación) van explícitas.
+# Nada de raíces abiertas: "prove" no debe casar con "proveedor" ni
+# "planifica" con "planificación" (una reunión no es razonamiento)
+ROUTING_KEYWORDS = {
+    "code": [
+        "code", "codes", "coding", "c[oó]digos?", "python", "debug(?:s|ging|ger)?",
+        "depura", "depurar", "depurando", "depuraci[oó]n", "scripts?", "funci[oó]n",
+        "funciones", "functions?", "bugs?", "errors?", "errores", "stack ?traces?",
+        "tracebacks?", "refactor(?:s|ed|ing)?", "refactoriza", "refactorizar", "compila",
+        "compilar", "compiles?", "compil(?:ing|ation|aci[oó]n)", "tests?", "testing",
+        "regex(?:es)?", "sql", "bash", "javascript", "typescript", "programa", "programar",
+        "programaci[oó]n", "class(?:es)?", "m[eé]todos?", "methods?", "endpoints?",
+    ],
+    "reasoning": [
+        "reason", "reasoning", "razona", "razonar", "razonamiento", "analy[sz]e", "analysis",
+        "anali[sz]a", "anali[sz]ar", "an[aá]lisis", "math", "maths", "mathematics",
+        "matem[aá]tic(?:a|as|o|os)", "calcula", "calcular", "demuestra", "demostrar",
+        "prove", "proof", "l[oó]gic(?:a|as|o|os)", "logic", "logical", "investiga",
+        "investigar", "research", "compara", "comparar", "compare", "comparison",
+        "eval[uú]a", "evaluar", "evaluate", "estrategias?", "strateg(?:y|ies)", "por qu[eé]",
+        "why", "explica", "explicar", "explain", "planifica", "planificar",
+    ],
+    "quick": [
+        "hola", "hello", "gracias", "thanks", "resume", "resumir", "summari[sz]e", "summary",
+        "traduce", "traducir", "translate", "define", "qu[eé] es", "what is", "breve",
+        "brief(?:ly)?", "r[aá]pid(?:o|a|os|as|amente)", "quick(?:ly)?", "tl;?dr",
+        "s[ií] o no", "yes or no",
+    ],
+}
+
+# Orden de desempate (más específico primero)
+TYPE_PRIORITY = ["code", "reasoning", "quick", "general"]
+DEFAULT_TYPE = "general"
+
+def _compile_router(keywords: Dict[str, List[str]]) -> re.Pattern:
+    """Un solo regex con un grupo nombrado por tipo de tarea
+
+    Sin IGNORECASE: la tarea se pasa a minúsculas una vez (unas 3 veces más
+    rápido que la comparación sin mayúsculas en cada posición).
+    """
+    groups = []
+    for task_type, words in keywords.items():
+        alternatives = "|".join(sorted(words, key=len, reverse=True))
+        groups.append(rf"(?P<{task_type}>{alternatives})")
+    return re.compile(rf"\b(?:{'|'.join(groups)})\b")
+
+_ROUTER_RE = _compile_router(ROUTING_KEYWORDS)
+
+# ═══════════════════════════════════════════════════════════════
+#  CLASIFICADOR POR EMBEDDINGS (OPCIONAL)
+# ═══════════════════════════════════════════════════════════════
+
+# Prototipos: `best_for` del agente que atiende cada tipo
+_PROTOTYPE_TYPES = ["quick", "code", "reasoning", "general"]
+_prototype_vectors: Optional[Dict[str, List[float]]] = None
+# Si Ollama no responde, no se reintenta en cada tarea sino tras este plazo
+PROTOTYPE_RETRY = 60.0
+_prototype_retry_at = 0.0
+
+def embed(text: str, timeout: float = 2) -> Optional[List[float]]:
+    """Embedding vía Ollama (nomic-embed-text); None si no está disponible"""
+    try:
+        import requests
+        base = LOCAL_CONFIGS["ollama"]["url"].rsplit("/v1", 1)[0]
+        resp = requests.post(
+            f"{base}/api/embeddings",
+            json={"model": LOCAL_CONFIGS["ollama"]["embeddings_model"], "prompt": text},
+            timeout=timeout,
+        )
+        if resp.status_code == 200:
+            return resp.json().get("embedding")
+    except:
+        pass
+    return None
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+def _get_prototypes() -> Dict[str, List[float]]:
+    """Vectores prototipo por tipo.
+
+    Solo se guardan si se obtienen todos; si falta alguno (Ollama caído o
+    arrancando) se devuelve vacío y se reintenta pasado `PROTOTYPE_RETRY`.
+    """
+    global _prototype_vectors, _prototype_retry_at
+    if _prototype_vectors is not None:
+        return _prototype_vectors
+    if time.monotonic() < _prototype_retry_at:
+        return {}
+    vectors = {}
+    for task_type in _PROTOTYPE_TYPES:
+        agent = get_agent_by_task(task_type)
+        vector = embed(", ".join(agent.best_for))
+        if not vector:
+            _prototype_retry_at = time.monotonic() + PROTOTYPE_RETRY
+            return {}
+        vectors[task_type] = vector
+    _prototype_vectors = vectors
+    return vectors
+
+def classify_by_embedding(task: str) -> Optional[Tuple[str, float]]:
+    """Tipo más cercano por similitud coseno (None si no hay embeddings)"""
+    prototypes = _get_prototypes()
+    if not prototypes:
+        return None
+    vector = embed(task)
+    if not vector:
+        return None
+    scored = [(_cosine(vector, proto), task_type) for task_type, proto in prototypes.items()]
+    score, task_type = max(scored)
+    return task_type, score
+
+# ═══════════════════════════════════════════════════════════════
+#  CLASIFICACIÓN
+# ═══════════════════════════════════════════════════════════════
+
+def keyword_scores(task: str) -> Dict[str, int]:
+    """Coincidencias de palabras clave por tipo"""
+    scores: Dict[str, int] = {}
+    for match in _ROUTER_RE.finditer(task.lower()):
+        task_type = match.lastgroup
+        scores[task_type] = scores.get(task_type, 0) + 1
+    return scores
+
+def classify_task(task: str, use_embeddings: bool = False) -> str:
+    """Tipo de tarea: quick, code, reasoning o general"""
+    scores = keyword_scores(task)
+    if scores:
+        best = max(scores.values())
+        for task_type in TYPE_PRIORITY:
+            if scores.get(task_type) == best:
+                return task_type
+
+    if use_embeddings:
+        result = classify_by_embedding(task)
+        if result:
+            return result[0]
+
+    return DEFAULT_TYPE
+
+def route_task(task: str, use_embeddings: bool = False):
+    """AgentInfo recomendado para la tarea"""
+    return get_agent_by_task(classify_task(task, use_embeddings))
+
+# ═══════════════════════════════════════════════════════════════
+#  BENCHMARK ETIQUETADO
+# ═══════════════════════════════════════════════════════════════
+
+# Conjunto de desarrollo: las palabras clave se ajustaron mirándolo, así que
+# su precisión solo sirve para detectar regresiones, no mide el router
+TUNING_TASKS = [
+    ("Escribe un script en Python que lea un CSV", "code"),
+    ("Debug this stack trace from the API server", "code"),
+    ("Refactoriza la clase Memoria para usar dataclasses", "code"),
+    ("Write a bash function to rotate logs", "code"),
+    ("¿Por qué falla esta función con un TypeError?", "code"),
+    ("Crea un endpoint REST para crear tarjetas", "code"),
+    ("Añade tests para kanban_move", "code"),
+    ("Convierte esta consulta SQL a un ORM", "code"),
+    ("Genera un regex para validar emails", "code"),
+    ("Corrige el bug en el parser de fechas", "code"),
+    ("Analiza los pros y contras de migrar a Postgres", "reasoning"),
+    ("Explain why the sky is blue using physics", "reasoning"),
+    ("Calcula la probabilidad de sacar dos ases", "reasoning"),
+    ("Prove that the square root of 2 is irrational", "reasoning"),
+    ("Compara tres estrategias de caché para el tracker", "reasoning"),
+    ("Investiga las causas de la caída del servidor ayer", "reasoning"),
+    ("Evalúa el riesgo de usar modelos cuantizados", "reasoning"),
+    ("Planifica la semana priorizando las tareas urgentes", "reasoning"),
+    ("Resolve this math problem: integrate x^2", "reasoning"),
+    ("Razona paso a paso cuál opción es mejor", "reasoning"),
+    ("Hola, ¿cómo estás?", "quick"),
+    ("Traduce 'buenos días' al inglés", "quick"),
+    ("Resume este párrafo en una línea", "quick"),
+    ("What is a kanban board?", "quick"),
+    ("Gracias por la ayuda", "quick"),
+    ("Define latencia", "quick"),
+    ("Dame una respuesta rápida: ¿capital de Francia?", "quick"),
+    ("tl;dr de la reunión", "quick"),
+    ("Sí o no: ¿Ollama corre en local?", "quick"),
+    ("Summarize the release notes briefly", "quick"),
+    ("Redacta un correo para el equipo", "general"),
+    ("Escribe un poema sobre el otoño", "general"),
+    ("Sugiere nombres para el proyecto", "general"),
+    ("Write a short story about a robot", "general"),
+    ("Prepara la agenda de la reunión del lunes", "general"),
+    ("Dame ideas para el blog", "general"),
+    ("Redacta la descripción del producto", "general"),
+    ("Organiza mis notas de la semana", "general"),
+    ("Crea una lista de la compra", "general"),
+    ("Brainstorm marketing slogans", "general"),
+]
+
+# Conjunto reservado: títulos de tarjetas del tracker y peticiones reales,
+# etiquetados sin mirar ROUTING_KEYWORDS. Incluye tareas sin ninguna palabra
+# clave y ambiguas (varios tipos a la vez). No ajustar el regex contra él.
+HELD_OUT_TASKS = [
+    ("Arreglar el hook de Fizzy que no marca las tarjetas", "code"),
+    ("El tracker tarda 3 segundos en mostrar el tablero", "code"),
+    ("Migrar memoria-local a SQLite", "code"),
+    ("Que kanban-local.sh acepte prioridades", "code"),
+    ("Por qué el CLI imprime dos veces el resultado", "code"),
+    ("Añadir --json a fizzy-report.sh", "code"),
+    ("Crash al mover una tarjeta archivada", "code"),
+    ("Review del PR del outbox", "code"),
+    ("Revisa si el cálculo de la latencia p95 está bien implementado", "code"),
+    ("¿Conviene Qwen 14B o Llama 8B para revisar contratos?", "reasoning"),
+    ("Decide qué backlog atacar primero este sprint", "reasoning"),
+    ("Estima cuántos tokens gastamos al mes con MiniMax", "reasoning"),
+    ("¿Merece la pena pasar a un modelo de 32B en el portátil?", "reasoning"),
+    ("Pros y contras de sincronizar con Fizzy cada minuto", "reasoning"),
+    ("Encuentra el fallo lógico en este argumento", "reasoning"),
+    ("Compara el coste de Ollama local con la API de pago", "reasoning"),
+    ("Ok", "quick"),
+    ("¿Qué hora es en Tokio?", "quick"),
+    ("Pasa esto a inglés: reunión aplazada", "quick"),
+    ("Una frase que resuma el informe", "quick"),
+    ("¿Cuántos días tiene febrero en 2028?", "quick"),
+    ("Buenos días", "quick"),
+    ("Sinónimo de rápido", "quick"),
+    ("Redacta el informe semanal para el equipo", "general"),
+    ("Felicitación de cumpleaños para Ana", "general"),
+    ("Notas de la reunión de planificación", "general"),
+    ("Propón un nombre para el nuevo agente", "general"),
+    ("Reescribe este texto con un tono más cercano", "general"),
+    ("Ideas para la charla sobre productividad", "general"),
+    ("Escribe la documentación de usuario del tracker", "general"),
+]
+
+def load_labelled(path: str) -> List[Tuple[str, str]]:
+    """Tareas etiquetadas de un JSONL ({"task": ..., "label": ...}), p. ej. del historial"""
+    import json
+    with open(path, 'r') as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(row["task"], row["label"]) for row in rows]
+
+def _legacy_classify(task: str) -> str:
+    """Ruteo anterior (subcadenas) para comparar"""
+    task_lower = task.lower()
+    if any(w in task_lower for w in ["code", "python", "debug", "script"]):
+        return "code"
+    elif any(w in task_lower for w in ["reason", "analyze", "math"]):
+        return "reasoning"
+    return "general"
+
+def benchmark(iterations: int = 2000, use_embeddings: bool = False,
+              datasets: Optional[List[Tuple[str, List[Tuple[str, str]]]]] = None):
+    """Precisión por conjunto (el reservado es el que cuenta) y latencia"""
+    classifiers = [
+        ("legacy (subcadenas)", _legacy_classify),
+        ("router (regex)", lambda t: classify_task(t, use_embeddings)),
+    ]
+    datasets = datasets or [
+        ("desarrollo (ajustado)", TUNING_TASKS),
+        ("reservado", HELD_OUT_TASKS),
+    ]
+
+    print("🧭 Benchmark de ruteo")
+    print("=" * 60)
+
+    for dataset, tasks in datasets:
+        print(f"\n  📋 {dataset}: {len(tasks)} tareas")
+        for name, classify in classifiers:
+            correct = sum(1 for task, label in tasks if classify(task) == label)
+            print(f"     {name:<22} precisión: {correct / len(tasks) * 100:5.1f}%")
+
+    all_tasks = [task for _, tasks in datasets for task, _ in tasks]
+    print(f"\n  ⏱️  Latencia ({len(all_tasks)} tareas × {iterations})")
+    for name, classify in classifiers:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for task in all_tasks:
+                classify(task)
+        per_call_us = (time.perf_counter() - start) / (iterations * len(all_tasks)) * 1e6
+        print(f"     {name:<22} {per_call_us:6.2f} µs/tarea")
+
+    for dataset, tasks in datasets[1:]:
+        misses = [(t, l, classify_task(t, use_embeddings)) for t, l in tasks
+                  if classify_task(t, use_embeddings) != l]
+        if misses:
+            print(f"\n  ❌ Fallos del router ({dataset}):")
+            for task, label, got in misses:
+                print(f"     [{label} → {got}] {task}")
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        datasets = None
+        if "--labels" in sys.argv:
+            path = sys.argv[sys.argv.index("--labels") + 1]
+            datasets = [("desarrollo (ajustado)", TUNING_TASKS), (os.path.basename(path), load_labelled(path))]
+        benchmark(use_embeddings="--embeddings" in sys.argv, datasets=datasets)
+    elif len(sys.argv) > 1:
+        task = " ".join(sys.argv[1:])
+        task_type = classify_task(task)
+        print(f"🧭 {task_type} → {get_agent_by_task(task_type).name}")
+    else:
+        print(__doc__)
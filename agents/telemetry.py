@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+📈 Telemetría - Tiempos por etapa, histogramas y contadores
+Instrumentación ligera para agents, memoria y tracker. Desactivada por
+defecto: `timer()` devuelve un contexto vacío y `@timed` deja la función
+intacta, así que el coste sin telemetría es una comprobación de un bool.
+
+Activación (MOLTBOT_TELEMETRY, lista separada por comas):
+- jsonl → una línea por medición en ~/.moltbot/telemetry/events.jsonl
+- prom  → texto Prometheus en ~/.moltbot/telemetry/metrics.prom
+          (para el textfile collector de node_exporter)
+
+Con cualquiera de los dos, los agregados se acumulan entre procesos en
+metrics.json y `agent_cli.py --status` muestra p50/p95 por etapa.
+
+Uso:
+    with timer("memory.search"):
+        ...
+
+    @timed("agent.create")
+    def create_agent(...): ...
+
+    count("results.hit")
+"""
+
+import atexit
+import bisect
+import fcntl
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tracker"))
+from locking import atomic_write
+
+TELEMETRY_DIR = os.path.expanduser(os.environ.get("MOLTBOT_TELEMETRY_DIR", "~/.moltbot/telemetry"))
+_raw_sinks = os.environ.get("MOLTBOT_TELEMETRY", "").lower()
+SINKS = {"jsonl"} if _raw_sinks in ("1", "on", "true") else \
+    {s.strip() for s in _raw_sinks.split(",") if s.strip() in ("jsonl", "prom")}
+ENABLED = bool(SINKS)
+
+STATE_FILE = os.path.join(TELEMETRY_DIR, "metrics.json")
+EVENTS_FILE = os.path.join(TELEMETRY_DIR, "events.jsonl")
+PROM_FILE = os.path.join(TELEMETRY_DIR, "metrics.prom")
+
+# Límites superiores (segundos), crecimiento ×1.5 de 0.1 ms a ~10 min
+BUCKETS = tuple(round(0.0001 * 1.5 ** i, 6) for i in range(39))
+
+# ═══════════════════════════════════════════════════════════════
+#  HISTOGRAMA
+# ═══════════════════════════════════════════════════════════════
+
+class Histogram:
+    """Buckets acumulables entre procesos (el último es +Inf)"""
+
+    def __init__(self, counts: Optional[List[int]] = None, total: float = 0.0):
+        self.counts = list(counts) if counts else [0] * (len(BUCKETS) + 1)
+        self.total = total
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+
+    def merge(self, other: "Histogram"):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Interpolación lineal dentro del bucket (como histogram_quantile)"""
+        n = self.count
+        if not n:
+            return None
+        rank, seen = q * n, 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return lower + (upper - lower) * (rank - seen) / c
+            seen += c
+        return BUCKETS[-1]
+
+    def to_dict(self) -> Dict:
+        return {"counts": self.counts, "total": self.total}
+
+# ═══════════════════════════════════════════════════════════════
+#  REGISTRO
+# ═══════════════════════════════════════════════════════════════
+
+class Telemetry:
+    """Mediciones pendientes del proceso; se vuelcan al salir"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+        self.events: List[str] = []
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            self.histograms.setdefault(stage, Histogram()).observe(seconds)
+            if "jsonl" in SINKS:
+                self.events.append(json.dumps({"ts": round(time.time(), 3), "stage": stage,
+                                               "ms": round(seconds * 1000, 3), "pid": os.getpid()}))
+
+    def count(self, name: str, n: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def _take(self):
+        with self._lock:
+            pending = (self.histograms, self.counters, self.events)
+            self.histograms, self.counters, self.events = {}, {}, []
+        return pending
+
+    def flush(self):
+        """Acumular en metrics.json y escribir los sinks activos"""
+        histograms, counters, events = self._take()
+        if not (histograms or counters):
+            return
+        os.makedirs(TELEMETRY_DIR, exist_ok=True)
+        if events:
+            # Una sola escritura O_APPEND por proceso
+            with open(EVENTS_FILE, 'a') as f:
+                f.write("\n".join(events) + "\n")
+
+        fd = os.open(f"{STATE_FILE}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            state = load_state()
+            for stage, hist in histograms.items():
+                state["histograms"].setdefault(stage, Histogram()).merge(hist)
+            for name, n in counters.items():
+                state["counters"][name] = state["counters"].get(name, 0) + n
+            atomic_write(STATE_FILE, json.dumps({
+                "histograms": {s: h.to_dict() for s, h in state["histograms"].items()},
+                "counters": state["counters"],
+            }), fsync=False)
+            if "prom" in SINKS:
+                atomic_write(PROM_FILE, render_prometheus(state), fsync=False)
+        finally:
+            os.close(fd)
+
+_telemetry = Telemetry()
+if ENABLED:
+    atexit.register(_telemetry.flush)
+
+# ═══════════════════════════════════════════════════════════════
+#  API
+# ═══════════════════════════════════════════════════════════════
+
+@contextmanager
+def _timer(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        _telemetry.count(f"{stage}.errors")
+        raise
+    finally:
+        _telemetry.observe(stage, time.perf_counter() - start)
+
+_NULL = nullcontext()
+
+def timer(stage: str):
+    """Medir un bloque `with`; sin telemetría es un contexto vacío compartido"""
+    return _timer(stage) if ENABLED else _NULL
+
+def timed(stage: str) -> Callable:
+    """Decorador; sin telemetría devuelve la función sin envolver"""
+    def decorator(fn: Callable) -> Callable:
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def observe(stage: str, seconds: float):
+    """Registrar una duración medida por el llamador"""
+    if ENABLED:
+        _telemetry.observe(stage, seconds)
+
+def count(name: str, n: float = 1):
+    if ENABLED:
+        _telemetry.count(name, n)
+
+def flush():
+    if ENABLED:
+        _telemetry.flush()
+
+# ═══════════════════════════════════════════════════════════════
+#  LECTURA / EXPORT
+# ═══════════════════════════════════════════════════════════════
+
+def load_state() -> Dict:
+    """Agregados acumulados (todos los procesos que ya volcaron)"""
+    state = {"histograms": {}, "counters": {}}
+    try:
+        with open(STATE_FILE, 'r') as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return state
+    state["counters"] = raw.get("counters", {})
+    for stage, h in raw.get("histograms", {}).items():
+        if len(h["counts"]) == len(BUCKETS) + 1:
+            state["histograms"][stage] = Histogram(h["counts"], h["total"])
+    return state
+
+def _metric_name(stage: str) -> str:
+    return "moltbot_" + "".join(c if c.isalnum() else "_" for c in stage)
+
+def render_prometheus(state: Dict) -> str:
+    lines = []
+    for stage, hist in sorted(state["histograms"].items()):
+        name = f"{_metric_name(stage)}_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, c in zip(BUCKETS, hist.counts):
+            cumulative += c
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {hist.count}')
+        lines.append(f"{name}_sum {hist.total:.6f}")
+        lines.append(f"{name}_count {hist.count}")
+    for counter, value in sorted(state["counters"].items()):
+        name = f"{_metric_name(counter)}_total"
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {value:g}")
+    return "\n".join(lines) + "\n"
+
+def summary() -> Dict[str, Dict]:
+    """p50/p95 por etapa: lo acumulado más lo pendiente de este proceso"""
+    state = load_state()
+    with _telemetry._lock:
+        for stage, hist in _telemetry.histograms.items():
+            state["histograms"].setdefault(stage, Histogram()).merge(hist)
+    return {
+        stage: {"count": h.count, "p50": h.quantile(0.5), "p95": h.quantile(0.95), "total": h.total}
+        for stage, h in sorted(state["histograms"].items())
+    }
+
+def print_summary():
+    """Tabla para --status"""
+    stages = summary()
+    if not stages:
+        if ENABLED:
+            print("\n📈 Telemetría: sin mediciones todavía")
+        return
+    print("\n📈 TELEMETRÍA (p50 / p95)")
+    print("=" * 40)
+    for stage, s in stages.items():
+        print(f"  {stage:22} {s['p50'] * 1000:9.1f} ms {s['p95'] * 1000:9.1f} ms  ×{s['count']}")
+    counters = load_state()["counters"]
+    if counters:
+        print("  " + ", ".join(f"{k}={v:g}" for k, v in sorted(counters.items())))
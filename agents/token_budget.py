@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+📏 Token Budget
+Empaqueta memorias y tarea dentro de la ventana de contexto de cada modelo.
+
+- Estima tokens por modelo (heurística de caracteres por token)
+- Usa AgentInfo.context_limit, acotado por num_ctx en modelos Ollama
+- Prioriza las memorias mejor rankeadas, trunca o resume el resto
+
+Uso:
+    python3 token_budget.py --bench
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+from registry import CONFIGURED_AGENTS, LOCAL_CONFIGS
+
+# ═══════════════════════════════════════════════════════════════
+#  CONFIGURACIÓN
+# ═══════════════════════════════════════════════════════════════
+
+# Caracteres promedio por token según familia de tokenizer
+CHARS_PER_TOKEN = {
+    "qwen": 3.5,
+    "llama": 3.8,
+    "ministral": 3.8,
+    "minimax": 3.8,
+}
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+# Tokens reservados para la respuesta (igual que max_tokens en agents.py)
+OUTPUT_RESERVE = {
+    "minimax/minimax-m2.1-free": 2048,
+}
+DEFAULT_OUTPUT_RESERVE = 4096
+
+# Tope de tokens para memorias aunque la ventana sea mayor
+DEFAULT_MEMORY_TOKENS = 1024
+
+# Overhead del prompt del agente (rol, backstory, instrucciones de CrewAI)
+PROMPT_OVERHEAD = 256
+
+# Por debajo de este espacio no vale la pena truncar una memoria
+MIN_TRUNCATE_TOKENS = 24
+
+# Espacio guardado para resumir las memorias que no caben enteras
+SUMMARY_TOKENS = 128
+
+MemoryItem = Union[str, Dict]
+
+@dataclass
+class PackedPrompt:
+    text: str
+    tokens: int
+    context_limit: int
+    included: int = 0
+    truncated: int = 0
+    summarized: int = 0
+    dropped: int = 0
+    memory_tokens: int = 0
+    notes: List[str] = field(default_factory=list)
+
+# ═══════════════════════════════════════════════════════════════
+#  ESTIMACIÓN
+# ═══════════════════════════════════════════════════════════════
+
+def _chars_per_token(model: Optional[str]) -> float:
+    """Ratio caracteres/token para el modelo"""
+    if model:
+        model_lower = model.lower()
+        for family, ratio in CHARS_PER_TOKEN.items():
+            if family in model_lower:
+                return ratio
+    return DEFAULT_CHARS_PER_TOKEN
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """Estimar tokens de un texto para un modelo"""
+    if not text:
+        return 0
+    return int(math.ceil(len(text) / _chars_per_token(model)))
+
+def get_context_limit(model: str) -> int:
+    """Ventana de contexto efectiva del modelo"""
+    limit = None
+    provider = None
+    for agent in CONFIGURED_AGENTS:
+        if agent.model == model:
+            limit = agent.context_limit
+            provider = agent.provider
+            break
+
+    if limit is None:
+        limit = CONFIGURED_AGENTS[0].context_limit
+
+    # Ollama carga el modelo con num_ctx, no con la ventana nominal
+    if provider == "Ollama Local":
+        limit = min(limit, LOCAL_CONFIGS["ollama"]["num_ctx"])
+
+    return limit
+
+def get_prompt_budget(model: str, max_output_tokens: Optional[int] = None) -> int:
+    """Tokens disponibles para el prompt (ventana - respuesta - overhead)"""
+    reserve = max_output_tokens
+    if reserve is None:
+        reserve = OUTPUT_RESERVE.get(model, DEFAULT_OUTPUT_RESERVE)
+    limit = get_context_limit(model)
+    # Nunca reservar más de la mitad de la ventana para la respuesta
+    reserve = min(reserve, limit // 2)
+    return max(limit - reserve - PROMPT_OVERHEAD, 0)
+
+# ═══════════════════════════════════════════════════════════════
+#  TRUNCADO Y RESUMEN
+# ═══════════════════════════════════════════════════════════════
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Truncar texto a un máximo de tokens (corte en palabra)"""
+    if estimate_tokens(text, model) <= max_tokens:
+        return text
+    max_chars = max(int(max_tokens * _chars_per_token(model)) - 1, 0)
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+def truncate_middle(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Truncar conservando inicio y final (útil para la tarea)"""
+    if estimate_tokens(text, model) <= max_tokens:
+        return text
+    max_chars = max(int(max_tokens * _chars_per_token(model)) - 5, 0)
+    head = max_chars * 2 // 3
+    tail = max_chars - head
+    return text[:head].rstrip() + " […] " + text[len(text) - tail:].lstrip()
+
+def summarize_memories(texts: List[str], max_tokens: int, model: Optional[str] = None,
+                       words_per_item: int = 8) -> Tuple[str, int]:
+    """Resumen extractivo: primeras palabras de cada memoria omitida"""
+    if not texts or max_tokens <= 0:
+        return "", 0
+    header = f"(+{len(texts)} memorias resumidas: "
+    parts = []
+    used = estimate_tokens(header + ")", model)
+    for text in texts:
+        words = text.split()
+        snippet = " ".join(words[:words_per_item])
+        if len(words) > words_per_item:
+            snippet += "…"
+        cost = estimate_tokens(snippet + "; ", model)
+        if used + cost > max_tokens:
+            break
+        parts.append(snippet)
+        used += cost
+    if not parts:
+        return "", 0
+    return header + "; ".join(parts) + ")", len(parts)
+
+# ═══════════════════════════════════════════════════════════════
+#  EMPAQUETADO
+# ═══════════════════════════════════════════════════════════════
+
+def _memory_text(memory: MemoryItem) -> str:
+    if isinstance(memory, dict):
+        return memory.get("text", "")
+    return memory or ""
+
+def _rank_memories(memories: List[MemoryItem]) -> List[str]:
+    """Ordenar por _score si existe (orden estable para listas de str)"""
+    scored = [
+        (-(m.get("_score", 0) if isinstance(m, dict) else 0), i, _memory_text(m))
+        for i, m in enumerate(memories)
+    ]
+    scored.sort()
+    return [text for _, _, text in scored if text]
+
+def pack_prompt(task: str, memories: Optional[List[MemoryItem]], model: str,
+                max_output_tokens: Optional[int] = None,
+                memory_budget: Optional[int] = DEFAULT_MEMORY_TOKENS) -> PackedPrompt:
+    """Construir prompt con tarea + memorias dentro del presupuesto del modelo"""
+    limit = get_context_limit(model)
+    budget = get_prompt_budget(model, max_output_tokens)
+    notes = []
+
+    task_tokens = estimate_tokens(task, model)
+    if task_tokens > budget:
+        task = truncate_middle(task, budget, model)
+        task_tokens = estimate_tokens(task, model)
+        notes.append("tarea truncada")
+
+    ranked = _rank_memories(memories or [])
+    header = "Contexto relevante (memoria):\n"
+    footer = "\n\nTarea:\n"
+
+    available = budget - task_tokens - estimate_tokens(header + footer, model)
+    if memory_budget is not None:
+        available = min(available, memory_budget)
+
+    # Si no caben todas, las últimas van al resumen en vez de perderse
+    costs = [estimate_tokens(f"- {text}\n", model) for text in ranked]
+    reserve = min(SUMMARY_TOKENS, available // 4) if sum(costs) > available else 0
+    full_budget = available - reserve
+
+    lines = []
+    used = 0
+    truncated = 0
+    rest = []
+    for i, text in enumerate(ranked):
+        line = f"- {text}"
+        cost = costs[i]
+        if used + cost <= full_budget:
+            lines.append(line)
+            used += cost
+            continue
+        remaining = full_budget - used
+        if remaining >= MIN_TRUNCATE_TOKENS:
+            line = truncate_to_tokens(line, remaining - 1, model)
+            lines.append(line)
+            used += estimate_tokens(line + "\n", model)
+            truncated += 1
+            rest = ranked[i + 1:]
+        else:
+            rest = ranked[i:]
+        break
+
+    summarized = 0
+    if rest:
+        summary, summarized = summarize_memories(rest, available - used, model)
+        if summary:
+            lines.append(summary)
+            used += estimate_tokens(summary + "\n", model)
+
+    if lines:
+        text = header + "\n".join(lines) + footer + task
+    else:
+        text = task
+
+    return PackedPrompt(
+        text=text,
+        tokens=estimate_tokens(text, model),
+        context_limit=limit,
+        included=len(lines) - (1 if summarized else 0),
+        truncated=truncated,
+        summarized=summarized,
+        dropped=len(rest) - summarized,
+        memory_tokens=used,
+        notes=notes,
+    )
+
+# ═══════════════════════════════════════════════════════════════
+#  BENCHMARK
+# ═══════════════════════════════════════════════════════════════
+
+# Velocidad de prefill SUPUESTA (tokens/s), no medida: los tiempos del
+# benchmark son estimaciones a partir de los tokens
+ASSUMED_PREFILL_TOKENS_PER_SEC = {
+    "OpenCode": 2000,
+    "Ollama Local": 250,
+}
+
+# (nombre, memorias recuperadas, palabras por memoria); 8 = RETRIEVAL_LIMIT
+BENCH_SCENARIOS = [
+    ("recuperación típica", 8, 40),
+    ("memorias largas", 8, 300),
+    ("muchas memorias", 40, 60),
+]
+
+def _synthetic_memories(count: int, words: int) -> List[Dict]:
+    import random
+    rnd = random.Random(42)
+    vocab = ("usuario prefiere respuestas breves ollama modelo python tarea "
+             "kanban reporte semanal memoria contexto agente código servidor "
+             "error configuración tablero fizzy qwen llama local nube").split()
+    return [
+        {
+            "text": " ".join(rnd.choice(vocab) for _ in range(words)),
+            "_score": rnd.random(),
+        }
+        for _ in range(count)
+    ]
+
+def benchmark(scenarios: List[Tuple[str, int, int]] = BENCH_SCENARIOS):
+    """Comparar las memorias recuperadas sin presupuesto vs empaquetadas"""
+    task = "Resume el estado del tablero y propone las tareas de la semana."
+
+    for name, count, words in scenarios:
+        memories = _synthetic_memories(count, words)
+        print(f"\n📏 {name}: {count} memorias × {words} palabras")
+        print("=" * 60)
+
+        for agent in CONFIGURED_AGENTS:
+            # Referencia: lo que llegaría al modelo sin presupuesto
+            raw = "Contexto relevante (memoria):\n" + "\n".join(
+                f"- {m['text']}" for m in memories) + "\n\nTarea:\n" + task
+            raw_tokens = estimate_tokens(raw, agent.model)
+
+            start = time.perf_counter()
+            packed = pack_prompt(task, memories, agent.model)
+            pack_ms = (time.perf_counter() - start) * 1000
+
+            rate = ASSUMED_PREFILL_TOKENS_PER_SEC.get(agent.provider, 250)
+            overflow = " ⚠️ excede la ventana" if raw_tokens > packed.context_limit else ""
+            print(f"  {agent.name}")
+            print(f"      Ventana: {packed.context_limit} | Sin presupuesto: {raw_tokens} tokens{overflow}")
+            print(f"      Empaquetado: {packed.tokens} tokens "
+                  f"({packed.included} incluidas, de ellas {packed.truncated} truncadas; "
+                  f"{packed.summarized} resumidas, {packed.dropped} omitidas) en {pack_ms:.1f} ms")
+            print(f"      Prefill estimado (supuesto {rate} tok/s): "
+                  f"{raw_tokens / rate:.1f}s → {packed.tokens / rate:.1f}s")
+
+if __name__ == "__main__":
+    import sys
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        print(__doc__)
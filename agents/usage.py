@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+🧾 Usage Accounting - Tokens y latencia por agente
+Cada inferencia real (kickoff) deja un registro compacto y actualiza un
+resumen por modelo y tipo de tarea que usa el ruteo por latencia observada.
+
+- ~/.moltbot/usage/calls.jsonl   → una línea por llamada (claves cortas)
+- ~/.moltbot/usage/summary.json  → EWMA de latencia, tokens/s y TTFT por
+                                   modelo × tipo de tarea; penalización en frío
+
+Uso:
+    python3 usage.py              → Mismo informe que agent_cli.py --stats
+"""
+
+import fcntl
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tracker"))
+from locking import atomic_write, atomic_write_json
+
+# ═══════════════════════════════════════════════════════════════
+#  CONFIGURACIÓN
+# ═══════════════════════════════════════════════════════════════
+
+USAGE_DIR = os.path.expanduser("~/.moltbot/usage")
+
+EWMA_ALPHA = 0.3              # Peso de la última muestra
+MIN_SAMPLES = 3               # Muestras antes de fiarse de un modelo
+MAX_LOG_BYTES = 4 * 1024 * 1024  # Al superarlo se conserva la mitad más reciente
+
+# ═══════════════════════════════════════════════════════════════
+#  EXTRACCIÓN DE TOKENS
+# ═══════════════════════════════════════════════════════════════
+
+def usage_from_result(result: Any, prompt: str, model: str) -> Tuple[int, int, bool]:
+    """(tokens_in, tokens_out, estimados) desde CrewOutput.token_usage o por estimación"""
+    metrics = getattr(result, "token_usage", None)
+    tokens_in = getattr(metrics, "prompt_tokens", 0) or 0
+    tokens_out = getattr(metrics, "completion_tokens", 0) or 0
+    if tokens_in or tokens_out:
+        return tokens_in, tokens_out, False
+
+    from token_budget import estimate_tokens
+    return estimate_tokens(prompt, model), estimate_tokens(str(result), model), True
+
+def _ewma(old: Optional[float], value: Optional[float]) -> Optional[float]:
+    if value is None:
+        return old
+    return value if old is None else old + EWMA_ALPHA * (value - old)
+
+# ═══════════════════════════════════════════════════════════════
+#  TRACKER
+# ═══════════════════════════════════════════════════════════════
+
+class UsageTracker:
+    """Registros por llamada y resumen para el ruteo"""
+
+    def __init__(self, usage_dir: Optional[str] = USAGE_DIR):
+        self.usage_dir = usage_dir
+        self._lock = threading.Lock()
+        self.summary: Dict[str, Dict[str, Dict]] = {}
+        self._mtime = 0.0
+
+    @property
+    def log_file(self) -> str:
+        return os.path.join(self.usage_dir, "calls.jsonl")
+
+    @property
+    def summary_file(self) -> str:
+        return os.path.join(self.usage_dir, "summary.json")
+
+    # ── Estado persistente ─────────────────────────────────────
+
+    def _read_summary(self) -> Dict:
+        try:
+            with open(self.summary_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _refresh(self):
+        """Releer el resumen solo si otro proceso lo cambió"""
+        if not self.usage_dir:
+            return
+        try:
+            mtime = os.path.getmtime(self.summary_file)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.summary, self._mtime = self._read_summary(), mtime
+
+    # ── Escritura ──────────────────────────────────────────────
+
+    def record(self, model: str, task_type: str, tokens_in: int, tokens_out: int,
+               seconds: float, ok: bool = True, ttft: Optional[float] = None,
+               cold: bool = False, estimated: bool = False):
+        """Registrar una llamada y actualizar el resumen (bajo lock entre procesos)"""
+        entry = {"t": round(time.time(), 3), "m": model, "k": task_type, "in": tokens_in,
+                 "out": tokens_out, "s": round(seconds, 3), "ok": int(ok)}
+        if ttft is not None:
+            entry["ttft"] = round(ttft, 3)
+        if cold:
+            entry["cold"] = 1
+        if estimated:
+            entry["est"] = 1
+
+        with self._lock:
+            if not self.usage_dir:
+                self._update(self.summary, entry)
+                return
+            os.makedirs(self.usage_dir, exist_ok=True)
+            fd = os.open(f"{self.summary_file}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                with open(self.log_file, 'a') as f:
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                summary = self._read_summary()
+                self._update(summary, entry)
+                atomic_write_json(self.summary_file, summary, fsync=False)
+                self.summary, self._mtime = summary, os.path.getmtime(self.summary_file)
+                self._trim_log()
+            finally:
+                os.close(fd)
+
+    @staticmethod
+    def _update(summary: Dict, entry: Dict):
+        model = summary.setdefault(entry["m"], {"types": {}, "cold_s": None, "warm_s": None})
+        stats = model["types"].setdefault(entry["k"], {
+            "n": 0, "errors": 0, "tokens_in": 0, "tokens_out": 0, "seconds": 0.0,
+            "latency": None, "tps": None, "ttft": None,
+        })
+        if not entry["ok"]:
+            stats["errors"] += 1
+            return
+        stats["n"] += 1
+        stats["tokens_in"] += entry["in"]
+        stats["tokens_out"] += entry["out"]
+        stats["seconds"] += entry["s"]
+        if entry.get("cold"):
+            # La carga del modelo va aparte: no contamina la latencia por tipo
+            model["cold_s"] = _ewma(model["cold_s"], entry["s"])
+            return
+        model["warm_s"] = _ewma(model["warm_s"], entry["s"])
+        stats["latency"] = _ewma(stats["latency"], entry["s"])
+        stats["tps"] = _ewma(stats["tps"], entry["out"] / entry["s"] if entry["s"] else None)
+        stats["ttft"] = _ewma(stats["ttft"], entry.get("ttft"))
+
+    def _trim_log(self):
+        """Conservar la mitad más reciente cuando el log crece demasiado"""
+        if os.path.getsize(self.log_file) <= MAX_LOG_BYTES:
+            return
+        with open(self.log_file, 'rb') as f:
+            f.seek(-MAX_LOG_BYTES // 2, os.SEEK_END)
+            f.readline()  # descartar la línea cortada
+            tail = f.read()
+        atomic_write(self.log_file, tail, fsync=False)
+
+    # ── Lectura ────────────────────────────────────────────────
+
+    def expected_latency(self, model: str, task_type: str, loaded: Optional[bool] = None) -> Optional[float]:
+        """Latencia esperada en segundos (None si no hay muestras suficientes)"""
+        self._refresh()
+        info = self.summary.get(model)
+        if not info:
+            return None
+        stats = info["types"].get(task_type)
+        if stats and stats["n"] >= MIN_SAMPLES and stats["latency"] is not None:
+            latency = stats["latency"]
+        elif sum(s["n"] for s in info["types"].values()) >= MIN_SAMPLES and info["warm_s"] is not None:
+            # Sin datos del tipo: latencia en caliente del modelo en general
+            latency = info["warm_s"]
+        elif info["cold_s"] is not None and stats and stats["n"] >= MIN_SAMPLES:
+            return info["cold_s"]  # solo hay llamadas en frío
+        else:
+            return None
+        # Modelo descargado: sumar lo que cuesta observadamente cargarlo
+        if loaded is False and info["cold_s"] is not None:
+            latency += max(info["cold_s"] - info["warm_s"], 0) if info["warm_s"] else 0
+        return latency
+
+    def records(self) -> List[Dict]:
+        if not self.usage_dir or not os.path.exists(self.log_file):
+            return []
+        with open(self.log_file, 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def stats(self) -> Dict[str, Dict[str, Dict]]:
+        """Agregados por modelo y tipo desde el log (percentiles incluidos)"""
+        groups: Dict[Tuple[str, str], List[Dict]] = {}
+        for r in self.records():
+            groups.setdefault((r["m"], r["k"]), []).append(r)
+
+        result: Dict[str, Dict[str, Dict]] = {}
+        for (model, task_type), calls in sorted(groups.items()):
+            ok = [c for c in calls if c["ok"]]
+            latencies = sorted(c["s"] for c in ok)
+            ttfts = sorted(c["ttft"] for c in ok if "ttft" in c)
+            seconds = sum(latencies)
+            result.setdefault(model, {})[task_type] = {
+                "calls": len(calls),
+                "errors": len(calls) - len(ok),
+                "tokens_in": sum(c["in"] for c in ok),
+                "tokens_out": sum(c["out"] for c in ok),
+                "tokens_per_s": sum(c["out"] for c in ok) / seconds if seconds else None,
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+                "ttft_p50": _percentile(ttfts, 50),
+                "estimated": any(c.get("est") for c in ok),
+            }
+        return result
+
+def _percentile(ordered: List[float], p: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+# ═══════════════════════════════════════════════════════════════
+#  INSTANCIA COMPARTIDA
+# ═══════════════════════════════════════════════════════════════
+
+_tracker: Optional[UsageTracker] = None
+
+def get_usage_tracker() -> UsageTracker:
+    """Tracker compartido del proceso"""
+    global _tracker
+    if _tracker is None:
+        _tracker = UsageTracker()
+    return _tracker
+
+def print_stats():
+    """Informe para agent_cli.py --stats"""
+    stats = get_usage_tracker().stats()
+    print("\n🧾 USO POR AGENTE")
+    print("=" * 40)
+    if not stats:
+        print("  (sin llamadas registradas)")
+        return
+    for model, types in stats.items():
+        calls = sum(t["calls"] for t in types.values())
+        tokens = sum(t["tokens_in"] + t["tokens_out"] for t in types.values())
+        print(f"\n  🤖 {model}  ({calls} llamadas, {tokens:,} tokens)")
+        for task_type, s in types.items():
+            tps = f"{s['tokens_per_s']:.1f} tok/s" if s["tokens_per_s"] else "-"
+            p50 = f"{s['p50']:.1f}s" if s["p50"] is not None else "-"
+            p95 = f"{s['p95']:.1f}s" if s["p95"] is not None else "-"
+            ttft = f"  ttft {s['ttft_p50']:.2f}s" if s["ttft_p50"] is not None else ""
+            est = " ~" if s["estimated"] else ""
+            errors = f"  ❌ {s['errors']}" if s["errors"] else ""
+            print(f"     {task_type:10} ×{s['calls']:<4} in {s['tokens_in']:>8,}{est}  "
+                  f"out {s['tokens_out']:>8,}{est}  {tps:>12}  p50 {p50:>6}  p95 {p95:>6}{ttft}{errors}")
+    if any(s["estimated"] for types in stats.values() for s in types.values()):
+        print("\n  ~ = tokens estimados (el backend no devolvió usage)")
+
+if __name__ == "__main__":
+    print_stats()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+🧪 Fake LLM Server - OpenAI compatible + API de Ollama
+Responde al instante (o con latencia fija) para medir el coste propio de
+los caminos de agentes sin depender de un modelo real.
+
+Endpoints:
+    GET  /v1/models                 POST /v1/chat/completions
+    GET  /api/tags  /api/ps         POST /api/generate  /api/chat  /api/embeddings
+
+Uso:
+    python3 fake_llm.py [--port 11434] [--latency-ms 0]
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+MODELS = [
+    "llama3.1:8b",
+    "qwen2.5:14b",
+    "qwen2.5-coder:7b",
+    "ministral-3:8b",
+    "nomic-embed-text",
+    "minimax/minimax-m2.1-free",
+]
+
+EMBEDDING_DIM = 64
+
+def fake_embedding(text: str) -> List[float]:
+    """Vector determinista a partir del texto"""
+    digest = hashlib.sha256(text.encode()).digest() * (EMBEDDING_DIM // 32 + 1)
+    return [(b - 128) / 128 for b in digest[:EMBEDDING_DIM]]
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True   # cabeceras y cuerpo van en writes separados
+    latency = 0.0
+    requests = 0
+    loaded: Dict[str, object] = {}     # modelo → keep_alive (lo que devuelve /api/ps)
+    generates: List[Dict] = []         # cuerpos recibidos en /api/generate
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, payload: Dict, status: int = 200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def _count(self):
+        type(self).requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def do_GET(self):
+        self._count()
+        if self.path.startswith("/v1/models"):
+            self._reply({"object": "list", "data": [{"id": m, "object": "model"} for m in MODELS]})
+        elif self.path.startswith("/api/tags"):
+            self._reply({"models": [{"name": m, "model": m} for m in MODELS]})
+        elif self.path.startswith("/api/ps"):
+            self._reply({"models": [{"name": m, "model": m, "keep_alive": k}
+                                    for m, k in self.loaded.items()]})
+        else:
+            self._reply({"error": "not found"}, 404)
+
+    def do_POST(self):
+        self._count()
+        body = self._body()
+        model = body.get("model", MODELS[0])
+        if self.path.startswith("/v1/chat/completions"):
+            prompt = (body.get("messages") or [{}])[-1].get("content", "")
+            answer = f"ok: {prompt[:40]}"
+            self._reply({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": answer}}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(answer) // 4,
+                          "total_tokens": (len(prompt) + len(answer)) // 4},
+            })
+        elif self.path.startswith("/api/generate"):
+            # Como Ollama: prompt vacío carga el modelo; keep_alive=0 lo descarga
+            self.generates.append(body)
+            if body.get("keep_alive") in (0, "0"):
+                self.loaded.pop(model, None)
+            else:
+                self.loaded[model] = body.get("keep_alive", "5m")
+            self._reply({"model": model, "response": "ok", "done": True})
+        elif self.path.startswith("/api/chat"):
+            self._reply({"model": model, "message": {"role": "assistant", "content": "ok"}, "done": True})
+        elif self.path.startswith("/api/embed"):
+            self._reply({"embedding": fake_embedding(body.get("prompt", ""))})
+        else:
+            self._reply({"error": "not found"}, 404)
+
+def start_server(port: int = 0, latency_ms: float = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Arrancar en un hilo; devuelve (servidor, base_url)
+
+    El estado (server.RequestHandlerClass.loaded / generates) es propio de
+    cada servidor, así que los tests pueden inspeccionarlo.
+    """
+    handler = type("Handler", (FakeLLMHandler,), {"latency": latency_ms / 1000, "requests": 0,
+                                                  "loaded": {MODELS[0]: "5m"}, "generates": []})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Servidor LLM falso para benchmarks")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args(argv)
+
+    handler = type("Handler", (FakeLLMHandler,), {"latency": args.latency_ms / 1000,
+                                                  "loaded": {MODELS[0]: "5m"}, "generates": []})
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"🧪 Fake LLM en http://127.0.0.1:{args.port} (latencia {args.latency_ms:.0f} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+🏭 Generadores de datos sintéticos (deterministas por semilla)
+- Memoria: ~/.moltbot/memory/memory.json y results.json con N entradas
+- Tablero: kanban.json con N tarjetas repartidas por columnas
+
+Los textos salen de un vocabulario fijo, así que dos ejecuciones con la
+misma semilla producen exactamente los mismos archivos.
+"""
+
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+VOCABULARY = (
+    "python script error servidor ollama modelo memoria tarea kanban fizzy "
+    "usuario prefiere respuestas breves proyecto agente código revisar test "
+    "api endpoint json bash docker deploy latencia cache índice búsqueda "
+    "reporte semana sprint bug refactor documentación backlog progreso "
+    "análisis estrategia resumen traducir explicar comparar calcular datos"
+).split()
+
+CATEGORIES = ["general", "preferencia", "hecho", "tarea", "contexto"]
+COLUMNS = ["backlog", "thisweek", "progress", "done", "archived"]
+EPOCH = datetime(2026, 1, 1)
+
+def sentence(rng: random.Random, low: int = 4, high: int = 12) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(low, high)))
+
+def queries(n: int, seed: int = 7) -> List[str]:
+    """Consultas de 2-4 palabras del mismo vocabulario"""
+    rng = random.Random(seed)
+    return [sentence(rng, 2, 4) for _ in range(n)]
+
+def _iso(rng: random.Random, days: int = 290) -> str:
+    return (EPOCH + timedelta(seconds=rng.randint(0, days * 86400))).isoformat(timespec="seconds")
+
+# ═══════════════════════════════════════════════════════════════
+#  MEMORIA
+# ═══════════════════════════════════════════════════════════════
+
+def memory_store(n: int, seed: int = 42) -> Dict:
+    rng = random.Random(seed)
+    memories = [{
+        "id": str(1_700_000_000_000 + i),
+        "text": sentence(rng),
+        "category": rng.choice(CATEGORIES),
+        "created": _iso(rng),
+        "usage_count": rng.randint(0, 20),
+    } for i in range(n)]
+    return {"memories": memories, "last_updated": None}
+
+def write_memory_store(memory_dir: str, n: int, seed: int = 42):
+    os.makedirs(memory_dir, exist_ok=True)
+    with open(os.path.join(memory_dir, "memory.json"), 'w') as f:
+        json.dump(memory_store(n, seed), f, ensure_ascii=False)
+
+def write_results_store(memory_dir: str, n: int, seed: int = 42):
+    """results.json con N resultados memoizados (mismo formato que memoria-local)"""
+    import base64
+    import zlib
+
+    rng = random.Random(seed)
+    results = {}
+    for i in range(n):
+        task = sentence(rng, 5, 15)
+        results[f"{i:016x}"] = {
+            "task": task, "agent": "",
+            "result": base64.b64encode(zlib.compress(sentence(rng, 20, 60).encode())).decode(),
+            "elapsed": round(rng.uniform(1, 30), 3), "created": _iso(rng), "last_used": _iso(rng),
+            "hits": 0,
+        }
+    os.makedirs(memory_dir, exist_ok=True)
+    with open(os.path.join(memory_dir, "results.json"), 'w') as f:
+        json.dump({"results": results, "stats": {"hits": 0, "misses": 0, "saved_seconds": 0.0}}, f,
+                  ensure_ascii=False)
+
+# ═══════════════════════════════════════════════════════════════
+#  TABLERO
+# ═══════════════════════════════════════════════════════════════
+
+def board(n: int, seed: int = 42) -> Dict:
+    rng = random.Random(seed)
+    columns = {col: {"title": col, "cards": []} for col in COLUMNS}
+    for i in range(n):
+        column = rng.choices(COLUMNS, weights=(3, 1, 1, 4, 1))[0]
+        created = _iso(rng)
+        card = {"id": f"{1_700_000_000_000 + i}{rng.randint(1000, 9999)}",
+                "title": sentence(rng, 3, 8), "description": sentence(rng, 0, 15),
+                "created": created, "version": 1, "updated": created, "seq": i + 1}
+        if column in ("progress", "done", "archived"):
+            card["started"] = created
+        if column in ("done", "archived"):
+            card["done"] = created
+        columns[column]["cards"].append(card)
+    # last_archive = hoy: el benchmark no debe disparar el archivado automático
+    return {"columns": columns, "last_updated": "", "seq": n,
+            "last_archive": datetime.now().strftime("%Y-%m-%d")}
+
+def write_board(path: str, n: int, seed: int = 42):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(board(n, seed), f, ensure_ascii=False)
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmarks - Caminos calientes de memoria, ruteo, agentes y tracker
+Cada caso corre en su propio proceso (RSS pico aislado) sobre datos
+sintéticos deterministas y mide percentiles de latencia y throughput.
+Los resultados se guardan en JSON y se comparan con un baseline.
+
+Uso:
+    python3 run.py                              → Todos los casos, tamaños 1k,10k,100k
+    python3 run.py --sizes 1k,1m --cases memory.search,kanban.search
+    python3 run.py --save-baseline              → Guardar como baseline.json
+    python3 run.py --compare [archivo]          → Comparar con el baseline (exit 1 si hay regresión)
+    python3 run.py --list
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+
+DEFAULT_SIZES = "1k,10k,100k"
+DEFAULT_ITERATIONS = 200
+DEFAULT_BUDGET = 5.0          # Segundos máximos por caso
+MIN_ITERATIONS = 5
+TOLERANCE = 0.20              # Regresión si empeora más de un 20%
+NOISE_FLOOR_MS = 0.05         # Diferencias menores no cuentan
+
+# ═══════════════════════════════════════════════════════════════
+#  CASOS (se ejecutan en el proceso hijo)
+# ═══════════════════════════════════════════════════════════════
+
+class Skip(Exception):
+    """El caso no puede correr aquí (dependencia ausente)"""
+
+def _load_memoria():
+    path = os.path.join(ROOT, "memory", "memoria-local.py")
+    spec = importlib.util.spec_from_file_location("memoria_local", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _require(*modules: str):
+    for name in modules:
+        if importlib.util.find_spec(name) is None:
+            raise Skip(f"falta {name}")
+
+def _queries():
+    from generators import queries
+    return iter(queries(100_000))
+
+def case_memory_search(size: int, env: Dict) -> Callable:
+    memoria, q = _load_memoria(), _queries()
+    return lambda: memoria.search(next(q))
+
+def case_memory_load(size: int, env: Dict) -> Callable:
+    memoria = _load_memoria()
+    return memoria.load_memory
+
+def case_memory_save(size: int, env: Dict) -> Callable:
+    memoria = _load_memoria()
+    data = memoria.load_memory()
+    return lambda: memoria.save_memory(data)
+
+def case_results_find(size: int, env: Dict) -> Callable:
+    memoria, q = _load_memoria(), _queries()
+    return lambda: memoria.find_result(next(q))
+
+def case_kanban_transaction(size: int, env: Dict) -> Callable:
+    from kanban import KanbanBoard
+    board = KanbanBoard(env["KANBAN_FILE"], auto_archive=False)
+    counter = iter(range(10**9))
+
+    def op():
+        with board.transaction():
+            card = board.create(f"bench {next(counter)}")
+            board.move(card["id"], "progress")
+    return op
+
+def case_kanban_search(size: int, env: Dict) -> Callable:
+    from kanban_search import open_index
+    index, q = open_index(env["KANBAN_FILE"]), _queries()  # construir el índice no cuenta
+    return lambda: index.search(next(q), limit=20)
+
+def case_router_classify(size: int, env: Dict) -> Callable:
+    from router import classify_task
+    q = _queries()
+    return lambda: classify_task(next(q))
+
+def _point_agents_at_fake_server(url: str):
+    import registry
+    registry.SERVICE_URLS.update({
+        "opencode": f"{url}/v1/models",
+        "ollama": f"{url}/api/tags",
+        "lm_studio": f"{url}/v1/models",
+    })
+    from model_residency import get_residency_manager
+    get_residency_manager().base_url = url
+
+def case_agents_check_services(size: int, env: Dict) -> Callable:
+    _require("requests")
+    _point_agents_at_fake_server(env["FAKE_LLM_URL"])
+    from registry import check_services
+    return check_services
+
+def case_agents_best_agent(size: int, env: Dict) -> Callable:
+    _require("requests", "crewai", "langchain_openai")
+    _point_agents_at_fake_server(env["FAKE_LLM_URL"])
+    from agents import get_best_agent_for_task
+    q = _queries()
+    return lambda: get_best_agent_for_task(next(q))
+
+def case_llm_roundtrip(size: int, env: Dict) -> Callable:
+    """Ida y vuelta HTTP keep-alive al servidor falso (suelo de los caminos de agentes)"""
+    import http.client
+    from urllib.parse import urlparse
+    url = urlparse(env["FAKE_LLM_URL"])
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=5)
+    body = json.dumps({"model": "llama3.1:8b", "messages": [{"role": "user", "content": "hola"}]})
+
+    def op():
+        conn.request("POST", "/v1/chat/completions", body, {"Content-Type": "application/json"})
+        json.loads(conn.getresponse().read())
+    return op
+
+# nombre → (función, usa tamaños)
+CASES = {
+    "memory.search": (case_memory_search, True),
+    "memory.load": (case_memory_load, True),
+    "memory.save": (case_memory_save, True),
+    "results.find": (case_results_find, True),
+    "kanban.transaction": (case_kanban_transaction, True),
+    "kanban.search": (case_kanban_search, True),
+    "router.classify": (case_router_classify, False),
+    "agents.check_services": (case_agents_check_services, False),
+    "agents.best_agent": (case_agents_best_agent, False),
+    "llm.roundtrip": (case_llm_roundtrip, False),
+}
+
+# ═══════════════════════════════════════════════════════════════
+#  MEDICIÓN
+# ═══════════════════════════════════════════════════════════════
+
+def percentile(ordered: List[float], p: float) -> float:
+    index = min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+def peak_rss_mb() -> float:
+    # Linux: VmHWM (ru_maxrss hereda el pico del padre a través de exec)
+    try:
+        with open("/proc/self/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS: bytes; otros: KB
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def measure(op: Callable, iterations: int, budget: float) -> Dict:
+    op()  # calentamiento (imports perezosos, cachés)
+    samples = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < iterations and (len(samples) < MIN_ITERATIONS or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        op()
+        samples.append(time.perf_counter() - start)
+    ordered = sorted(samples)
+    total = sum(samples)
+    return {
+        "iterations": len(samples),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+        "mean_ms": round(total / len(samples) * 1000, 4),
+        "ops_per_s": round(len(samples) / total, 1) if total else None,
+    }
+
+def run_child(case: str, size: int, iterations: int, budget: float) -> Dict:
+    """Proceso hijo: preparar el caso, medir e imprimir una línea JSON"""
+    for path in (BENCH_DIR, os.path.join(ROOT, "agents"), os.path.join(ROOT, "tracker")):
+        sys.path.insert(0, path)
+    random.seed(0)
+    func, _ = CASES[case]
+    result = {"case": case, "size": size}
+    try:
+        op = func(size, dict(os.environ))
+        result.update(measure(op, iterations, budget))
+    except Skip as e:
+        result["skipped"] = str(e)
+    result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return result
+
+# ═══════════════════════════════════════════════════════════════
+#  ORQUESTACIÓN
+# ═══════════════════════════════════════════════════════════════
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    factor = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * factor)
+
+def _prepare(workdir: str, size: int, seed: int) -> Dict[str, str]:
+    """Datos prístinos por tamaño (se generan una vez y se copian por caso)"""
+    from generators import write_board, write_memory_store, write_results_store
+
+    pristine = os.path.join(workdir, f"pristine-{size}")
+    if not os.path.exists(os.path.join(pristine, "done")):
+        memory_dir = os.path.join(pristine, "home", ".moltbot", "memory")
+        write_memory_store(memory_dir, size, seed)
+        write_results_store(memory_dir, size, seed)
+        write_board(os.path.join(pristine, "kanban.json"), size, seed)
+        open(os.path.join(pristine, "done"), 'w').close()
+    return {"pristine": pristine}
+
+def _case_env(workdir: str, case: str, size: int, pristine: Optional[str], fake_url: str) -> Dict[str, str]:
+    case_dir = os.path.join(workdir, "run", f"{case}-{size}")
+    shutil.rmtree(case_dir, ignore_errors=True)
+    if pristine:
+        shutil.copytree(pristine, case_dir)
+    else:
+        os.makedirs(os.path.join(case_dir, "home"), exist_ok=True)
+    env = dict(os.environ)
+    for name in ("MOLTBOT_TELEMETRY", "MOLTBOT_MEMORY"):
+        env.pop(name, None)
+    env.update({
+        "HOME": os.path.join(case_dir, "home"),
+        "KANBAN_FILE": os.path.join(case_dir, "kanban.json"),
+        "FIZZY_EVENTS_DIR": os.path.join(case_dir, "events"),
+        "FIZZY_OUTBOX_DIR": os.path.join(case_dir, "outbox"),
+        "FIZZY_OUTBOX_SYNC": "0",
+        "FAKE_LLM_URL": fake_url,
+    })
+    return env
+
+def run_all(cases: List[str], sizes: List[int], iterations: int, budget: float,
+            seed: int, workdir: str) -> Dict:
+    sys.path.insert(0, BENCH_DIR)
+    from fake_llm import start_server
+
+    server, fake_url = start_server()
+    results = []
+    try:
+        for case in cases:
+            _, sized = CASES[case]
+            for size in (sizes if sized else [0]):
+                pristine = _prepare(workdir, size, seed)["pristine"] if sized else None
+                env = _case_env(workdir, case, size, pristine, fake_url)
+                proc = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--child", case, str(size),
+                     "--iterations", str(iterations), "--budget", str(budget)],
+                    env=env, capture_output=True, text=True,
+                )
+                if proc.returncode != 0:
+                    result = {"case": case, "size": size, "error": proc.stderr.strip().splitlines()[-1:]}
+                else:
+                    result = json.loads(proc.stdout.strip().splitlines()[-1])
+                results.append(result)
+                _print_result(result)
+    finally:
+        server.shutdown()
+
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "iterations": iterations,
+            "budget_s": budget,
+        },
+        "results": results,
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except OSError:
+        return None
+
+# ═══════════════════════════════════════════════════════════════
+#  REPORTE / BASELINE
+# ═══════════════════════════════════════════════════════════════
+
+def _label(result: Dict) -> str:
+    size = result["size"]
+    return f"{result['case']}" + (f" [{size:,}]" if size else "")
+
+def _print_result(result: Dict):
+    label = _label(result)
+    if "skipped" in result:
+        print(f"  ⏭️  {label:34} omitido ({result['skipped']})")
+    elif "error" in result:
+        print(f"  ❌ {label:34} {' '.join(result['error'])}")
+    else:
+        print(f"  ⏱️  {label:34} p50 {result['p50_ms']:9.3f} ms  p95 {result['p95_ms']:9.3f} ms  "
+              f"{result['ops_per_s'] or 0:9.0f} ops/s  {result['peak_rss_mb']:7.1f} MB")
+
+def compare(current: Dict, baseline: Dict, tolerance: float = TOLERANCE) -> int:
+    """Imprimir diferencias y devolver el número de regresiones"""
+    base = {(r["case"], r["size"]): r for r in baseline["results"] if "p50_ms" in r}
+    regressions = 0
+    print(f"\n📊 Comparación con baseline ({baseline['meta'].get('commit')}, "
+          f"{baseline['meta'].get('date')}), tolerancia {tolerance:.0%}")
+    for result in current["results"]:
+        old = base.get((result["case"], result["size"]))
+        if old is None or "p50_ms" not in result:
+            continue
+        worse = []
+        for metric in ("p50_ms", "p95_ms"):
+            if (result[metric] > old[metric] * (1 + tolerance)
+                    and result[metric] - old[metric] > NOISE_FLOOR_MS):
+                worse.append(metric)
+        if result["peak_rss_mb"] > old["peak_rss_mb"] * (1 + tolerance):
+            worse.append("peak_rss_mb")
+        delta = (result["p95_ms"] - old["p95_ms"]) / old["p95_ms"] if old["p95_ms"] else 0.0
+        mark = "❌" if worse else ("🚀" if delta < -tolerance else "✅")
+        print(f"  {mark} {_label(result):34} p95 {old['p95_ms']:9.3f} → {result['p95_ms']:9.3f} ms "
+              f"({delta:+.0%})" + (f"  regresión: {', '.join(worse)}" if worse else ""))
+        regressions += bool(worse)
+    return regressions
+
+def _write_json(path: str, data: Dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de Moltbot")
+    parser.add_argument("--cases", help="Lista separada por comas (por defecto todos)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="p. ej. 1k,10k,100k,1m")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="Segundos máximos por caso")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", help="Reutilizar datos generados entre ejecuciones")
+    parser.add_argument("--output", help="Archivo de resultados (por defecto results/<fecha>.json)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_FILE, help="Baseline con el que comparar")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--list", action="store_true")
+    parser.add_argument("--child", nargs=2, metavar=("CASO", "TAMAÑO"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(args.child[0], int(args.child[1]), args.iterations, args.budget)))
+        return 0
+
+    if args.list:
+        for name, (func, sized) in CASES.items():
+            print(f"  {name:24} {'por tamaño' if sized else '-':10}")
+        return 0
+
+    cases = args.cases.split(",") if args.cases else list(CASES)
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        print(f"❌ Casos desconocidos: {', '.join(unknown)}")
+        return 1
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="moltbot-bench-")
+    print(f"\n⏱️  BENCHMARKS: {len(cases)} casos, tamaños {', '.join(f'{s:,}' for s in sizes)}")
+    try:
+        report = run_all(cases, sizes, args.iterations, args.budget, args.seed, workdir)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    _write_json(output, report)
+    print(f"\n💾 Resultados: {output}")
+    if args.save_baseline:
+        _write_json(BASELINE_FILE, report)
+        print(f"📌 Baseline actualizado: {BASELINE_FILE}")
+
+    if args.compare:
+        if not os.path.exists(args.compare):
+            print(f"❌ No existe el baseline: {args.compare}")
+            return 1
+        with open(args.compare, 'r') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ {regressions} regresiones")
+            return 1
+        print("\n✅ Sin regresiones")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
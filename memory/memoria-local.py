@@ -4,13 +4,37 @@ Memoria Local Simple para Moltbot
 Sin dependencias externas - usa archivo JSON local
 """
 
+import base64
+import fcntl
+import hashlib
 import json
+import math
 import os
-from datetime import datetime
-from typing import List, Dict, Optional
+import re
+import sys
+import threading
+import zlib
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Sequence, Tuple
 
 MEMORY_DIR = os.path.expanduser("~/.moltbot/memory")
 MEMORY_FILE = os.path.join(MEMORY_DIR, "memory.json")
+RESULTS_FILE = os.path.join(MEMORY_DIR, "results.json")
+USAGE_FILE = os.path.join(MEMORY_DIR, "usage.json")
+VECTORS_FILE = os.path.join(MEMORY_DIR, "result_vectors.json")
+RESULT_MAX_ENTRIES = 500
+
+# Un resultado caduca: la respuesta de ayer a una tarea puede no valer hoy
+RESULT_TTL = float(os.environ.get("MOLTBOT_RESULT_TTL", str(24 * 3600)))
+# Similitud coseno mínima (embeddings del router) para reutilizar el resultado
+# de una tarea redactada de otra forma; >= 1 deja solo la huella exacta
+RESULT_SIMILARITY = float(os.environ.get("MOLTBOT_RESULT_SIMILARITY", "0.95"))
+
+# Telemetría opcional: tracker/telemetry_shim.py (o junto a este archivo)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tracker"))
+from telemetry_shim import count, timer
 
 # ═══════════════════════════════════════════════════════════════
 #  GESTIÓN DE MEMORIA
@@ -20,20 +44,52 @@ def init_memory():
     """Inicializar archivo de memoria si no existe"""
     os.makedirs(MEMORY_DIR, exist_ok=True)
     if not os.path.exists(MEMORY_FILE):
-        with open(MEMORY_FILE, 'w') as f:
-            json.dump({"memories": [], "last_updated": None}, f, indent=2, ensure_ascii=False)
+        # Bajo lock: otro escritor pudo crearlo con su primera memoria
+        with memory_lock():
+            if not os.path.exists(MEMORY_FILE):
+                save_memory({"memories": [], "last_updated": None})
 
 def load_memory() -> Dict:
-    """Cargar memoria desde archivo"""
-    init_memory()
-    with open(MEMORY_FILE, 'r') as f:
+    """Cargar memoria desde archivo (vacía si aún no existe: no toma el lock)"""
+    if not os.path.exists(MEMORY_FILE):
+        return {"memories": [], "last_updated": None}
+    with timer("memory.load"), open(MEMORY_FILE, 'r') as f:
         return json.load(f)
 
+def _tmp_path(path: str) -> str:
+    # Único por proceso e hilo: la API async guarda desde varios hilos a la vez
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
 def save_memory(data: Dict):
-    """Guardar memoria a archivo"""
+    """Guardar memoria a archivo (reemplazo atómico: nunca se lee a medio escribir)
+
+    Quien lea-modifique-escriba memory.json debe hacerlo dentro de memory_lock().
+    """
     data["last_updated"] = datetime.now().isoformat()
-    with open(MEMORY_FILE, 'w') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    tmp = _tmp_path(MEMORY_FILE)
+    with timer("memory.save"):
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, MEMORY_FILE)
+
+@contextmanager
+def _file_lock(path: str):
+    """Lock exclusivo entre procesos sobre <path>.lock
+
+    Cada llamada abre su propio descriptor, así que también excluye a los
+    hilos del mismo proceso (flock es por descriptor abierto).
+    """
+    os.makedirs(MEMORY_DIR, exist_ok=True)
+    fd = os.open(f"{path}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+def memory_lock():
+    """Lock de memory.json: add, delete, clear y memoria-wrapper.py lo comparten"""
+    return _file_lock(MEMORY_FILE)
 
 # ═══════════════════════════════════════════════════════════════
 #  OPERACIONES BÁSICAS
@@ -41,8 +97,6 @@ def save_memory(data: Dict):
 
 def add(text: str, category: str = "general") -> str:
     """Agregar memoria"""
-    data = load_memory()
-    
     memory = {
         "id": f"{int(datetime.now().timestamp() * 1000)}",
         "text": text,
@@ -51,8 +105,10 @@ def add(text: str, category: str = "general") -> str:
         "usage_count": 0
     }
     
-    data["memories"].append(memory)
-    save_memory(data)
+    with memory_lock():
+        data = load_memory()
+        data["memories"].append(memory)
+        save_memory(data)
     
     return f"✅ Memoria guardada: {text[:50]}..."
 
@@ -66,23 +122,43 @@ def get(category: Optional[str] = None) -> List[Dict]:
 
 def delete(memory_id: str) -> bool:
     """Eliminar memoria"""
-    data = load_memory()
-    original_len = len(data["memories"])
-    data["memories"] = [m for m in data["memories"] if m["id"] != memory_id]
-    
-    if len(data["memories"]) < original_len:
-        save_memory(data)
-        return True
+    with memory_lock():
+        data = load_memory()
+        original_len = len(data["memories"])
+        data["memories"] = [m for m in data["memories"] if m["id"] != memory_id]
+        
+        if len(data["memories"]) < original_len:
+            save_memory(data)
+            return True
     return False
 
-def update_usage(memory_id: str):
-    """Actualizar contador de uso"""
-    data = load_memory()
-    for m in data["memories"]:
-        if m["id"] == memory_id:
-            m["usage_count"] = m.get("usage_count", 0) + 1
-            break
-    save_memory(data)
+# ── Contadores de uso ──────────────────────────────────────────
+# En usage.json, no en memory.json: la recuperación de cada tarea los
+# incrementa y no debe reescribir (ni pisar) las memorias
+
+def load_usage() -> Dict[str, int]:
+    """Usos por id de memoria"""
+    if not os.path.exists(USAGE_FILE):
+        return {}
+    with open(USAGE_FILE, 'r') as f:
+        return json.load(f)
+
+def update_usage(*memory_ids: str):
+    """Incrementar el contador de uso de una o varias memorias (una escritura)"""
+    if not memory_ids:
+        return
+    with _file_lock(USAGE_FILE):
+        usage = load_usage()
+        for memory_id in memory_ids:
+            usage[memory_id] = usage.get(memory_id, 0) + 1
+        tmp = _tmp_path(USAGE_FILE)
+        with open(tmp, 'w') as f:
+            json.dump(usage, f)
+        os.replace(tmp, USAGE_FILE)
+
+def usage_count(memory: Dict, usage: Dict[str, int]) -> int:
+    # usage_count en memory.json: contadores guardados antes de usage.json
+    return memory.get("usage_count", 0) + usage.get(memory["id"], 0)
 
 # ═══════════════════════════════════════════════════════════════
 #  BÚSQUEDA SEMÁNTICA SIMPLE
@@ -90,7 +166,12 @@ def update_usage(memory_id: str):
 
 def search(query: str, category: Optional[str] = None, limit: int = 5) -> List[Dict]:
     """Buscar memorias - coincidencia simple de palabras"""
+    with timer("memory.search"):
+        return _search(query, category, limit)
+
+def _search(query: str, category: Optional[str], limit: int) -> List[Dict]:
     data = load_memory()
+    usage = load_usage()
     query_lower = query.lower()
     query_words = set(query_lower.split())
     
@@ -108,16 +189,15 @@ def search(query: str, category: Optional[str] = None, limit: int = 5) -> List[D
         matches = len(query_words & text_words)
         
         if matches > 0:
-            # Añadir score de relevancia
-            memory["_score"] = matches / max(len(query_words), 1)
-            results.append(memory)
+            # Añadir score de relevancia (en una copia: no se persiste)
+            results.append(dict(memory, _score=matches / max(len(query_words), 1),
+                                usage_count=usage_count(memory, usage)))
     
     # Ordenar por score y uso
     results.sort(key=lambda x: (-x.get("_score", 0), -x.get("usage_count", 0)))
     
-    # Actualizar contadores de uso
-    for m in results[:limit]:
-        update_usage(m["id"])
+    # Actualizar contadores de uso (usage.json: memory.json no se toca)
+    update_usage(*(m["id"] for m in results[:limit]))
     
     return results[:limit]
 
@@ -126,6 +206,165 @@ def search_by_text(search_text: str, limit: int = 10) -> List[str]:
     results = search(search_text, limit=limit)
     return [r["text"] for r in results]
 
+# ═══════════════════════════════════════════════════════════════
+#  RESULTADOS DE TAREAS (MEMOIZACIÓN)
+# ═══════════════════════════════════════════════════════════════
+
+_WORD = re.compile(r"\w+")
+
+def task_fingerprint(task: str, agent: str = "") -> str:
+    """Huella de la tarea normalizada (minúsculas, sin puntuación ni espacios extra)"""
+    normalized = " ".join(_WORD.findall(task.lower()))
+    return hashlib.sha256(f"{agent}\x00{normalized}".encode()).hexdigest()[:16]
+
+def load_results() -> Dict:
+    """Cargar resultados memoizados (archivo aparte: no entran en search)"""
+    if not os.path.exists(RESULTS_FILE):
+        return {"results": {}, "stats": {"hits": 0, "misses": 0, "saved_seconds": 0.0}}
+    with open(RESULTS_FILE, 'r') as f:
+        return json.load(f)
+
+def save_results(data: Dict):
+    _save_json(RESULTS_FILE, data)
+
+def _save_json(path: str, data):
+    os.makedirs(MEMORY_DIR, exist_ok=True)
+    tmp = _tmp_path(path)
+    with open(tmp, 'w') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def _expired(entry: Dict, now: Optional[datetime] = None) -> bool:
+    age = (now or datetime.now()) - datetime.fromisoformat(entry["created"])
+    return age > timedelta(seconds=RESULT_TTL)
+
+# ── Embeddings de las tareas ───────────────────────────────────
+# Aparte de results.json (3 KB por tarea): solo se leen cuando la huella
+# exacta falla. Normalizados, así que la similitud coseno es un producto escalar
+
+def load_vectors() -> Dict[str, Dict]:
+    if not os.path.exists(VECTORS_FILE):
+        return {}
+    with open(VECTORS_FILE, 'r') as f:
+        return json.load(f)
+
+def _pack_vector(vector: Sequence[float]) -> str:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return base64.b64encode(array("f", (x / norm for x in vector)).tobytes()).decode()
+
+def _unpack_vector(packed: str) -> array:
+    vector = array("f")
+    vector.frombytes(base64.b64decode(packed))
+    return vector
+
+def _nearest(vector: Sequence[float], agent: str, threshold: float) -> Tuple[Optional[str], float]:
+    """Huella de la tarea guardada más parecida (None si ninguna llega al umbral)"""
+    query = _unpack_vector(_pack_vector(vector))
+    best, similarity = None, threshold
+    for key, stored in load_vectors().items():
+        if stored["agent"] != agent:
+            continue
+        score = sum(a * b for a, b in zip(query, _unpack_vector(stored["vector"])))
+        if score >= similarity:
+            best, similarity = key, score
+    return best, similarity
+
+def _results_lock():
+    """Lock exclusivo entre procesos para leer-modificar-escribir results.json"""
+    return _file_lock(RESULTS_FILE)
+
+def remember_result(task: str, result: str, agent: str = "", elapsed: float = 0.0,
+                    vector: Optional[Sequence[float]] = None) -> str:
+    """Guardar el resultado comprimido con la huella (y el embedding, si lo hay) de la tarea"""
+    key = task_fingerprint(task, agent)
+    with _results_lock():
+        data = load_results()
+        before = set(data["results"])
+        data["results"][key] = {
+            "task": task,
+            "agent": agent,
+            "result": base64.b64encode(zlib.compress(result.encode(), 9)).decode(),
+            "elapsed": round(elapsed, 3),
+            "created": datetime.now().isoformat(),
+            "last_used": datetime.now().isoformat(),
+            "hits": 0,
+        }
+        # Cada resultado guardado es una tarea que no estaba: cuenta como fallo
+        data["stats"]["misses"] += 1
+        # Descartar los caducados y los menos usados recientemente
+        now = datetime.now()
+        for old in [k for k, e in data["results"].items() if _expired(e, now)]:
+            del data["results"][old]
+        if len(data["results"]) > RESULT_MAX_ENTRIES:
+            oldest = sorted(data["results"], key=lambda k: data["results"][k]["last_used"])
+            for old in oldest[:len(data["results"]) - RESULT_MAX_ENTRIES]:
+                del data["results"][old]
+        save_results(data)
+
+        removed = before - set(data["results"])
+        if vector or removed:
+            vectors = load_vectors()
+            for old in removed:
+                vectors.pop(old, None)
+            if vector:
+                vectors[key] = {"agent": agent, "vector": _pack_vector(vector)}
+            else:
+                vectors.pop(key, None)
+            _save_json(VECTORS_FILE, vectors)
+    return key
+
+def find_result(task: str, agent: str = "", vector: Optional[Sequence[float]] = None,
+                threshold: Optional[float] = None) -> Optional[Dict]:
+    """Resultado de la misma tarea, o de una equivalente si se pasa su embedding
+
+    Primero la huella exacta (texto normalizado y agente); si falla y hay
+    embedding, la tarea guardada más parecida con similitud coseno >= umbral
+    (RESULT_SIMILARITY). Nada de solapamiento de palabras: "borra" y "crea la
+    tabla" comparten casi todas. Los resultados de más de RESULT_TTL no valen.
+    Un fallo no escribe nada.
+    """
+    threshold = RESULT_SIMILARITY if threshold is None else threshold
+    key, similarity = task_fingerprint(task, agent), 1.0
+    entry = load_results()["results"].get(key)
+    if entry is None or _expired(entry):
+        key, similarity = None, 0.0
+        if vector and threshold < 1:
+            key, similarity = _nearest(vector, agent, threshold)
+    if key is None:
+        count("results.miss")
+        return None
+
+    with _results_lock():
+        # Releer bajo lock: otro proceso pudo escribir desde la lectura anterior
+        data = load_results()
+        entry = data["results"].get(key)
+        if entry is None or _expired(entry):
+            count("results.miss")
+            return None
+        count("results.hit")
+        entry["hits"] += 1
+        entry["last_used"] = datetime.now().isoformat()
+        data["stats"]["hits"] += 1
+        data["stats"]["saved_seconds"] += entry["elapsed"]
+        save_results(data)
+    return {
+        "task": entry["task"],
+        "agent": entry["agent"],
+        "result": zlib.decompress(base64.b64decode(entry["result"])).decode(),
+        "elapsed": entry["elapsed"],
+        # Truncada: una tarea parecida nunca aparece como 1.0 (idéntica)
+        "similarity": math.floor(similarity * 1000) / 1000,
+    }
+
+def result_stats() -> Dict:
+    """Tasa de aciertos y tiempo de inferencia ahorrado"""
+    data = load_results()
+    stats = dict(data["stats"])
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    stats["entries"] = len(data["results"])
+    return stats
+
 # ═══════════════════════════════════════════════════════════════
 #  CATEGORÍAS
 # ═══════════════════════════════════════════════════════════════
@@ -164,6 +403,11 @@ def stats():
     print(f"   Total: {len(memories)} memorias")
     for cat, count in categories.items():
         print(f"   • {cat}: {count}")
+    
+    results = result_stats()
+    if results["entries"]:
+        print(f"   ♻️  Resultados: {results['entries']} guardados, "
+              f"{results['hit_rate']:.0%} aciertos, {results['saved_seconds']:.0f}s ahorrados")
     print()
 
 def list_memories(category: Optional[str] = None):
@@ -183,7 +427,8 @@ def clear_all():
     """Limpiar todas las memorias (peligroso)"""
     confirm = input("⚠️ ¿Eliminar todas las memorias? (escribe 'sí'): ")
     if confirm.lower() == "sí":
-        save_memory({"memories": [], "last_updated": None})
+        with memory_lock():
+            save_memory({"memories": [], "last_updated": None})
         print("✅ Memoria limpiada")
     else:
         print("❌ Cancelado")
@@ -208,6 +453,7 @@ def main():
         print("  memoria.py pref \"texto\"          → Preferencia")
         print("  memoria.py fact \"texto\"          → Hecho")
         print("  memoria.py context \"texto\"       → Contexto")
+        print("  memoria.py results               → Resultados memoizados")
         print()
         stats()
         return
@@ -255,6 +501,16 @@ def main():
         else:
             print("❌ Falta texto")
     
+    elif command == "results":
+        data = load_results()
+        print(f"\n♻️  Resultados memoizados")
+        print("-" * 50)
+        for entry in sorted(data["results"].values(), key=lambda e: -e["hits"]):
+            print(f"  [{entry['hits']:3}×] {entry['elapsed']:6.1f}s  {entry['task'][:50]}")
+        stats = result_stats()
+        print(f"\n  Aciertos: {stats['hits']}/{stats['hits'] + stats['misses']} "
+              f"({stats['hit_rate']:.0%}), {stats['saved_seconds']:.0f}s de inferencia ahorrados\n")
+    
     elif command == "clear":
         clear_all()
     
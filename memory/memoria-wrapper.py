@@ -4,38 +4,43 @@ Wrapper de Memoria para Moltbot
 Combina: Memoria Local Simple + Mem0 Cloud (si hay API key)
 """
 
+import asyncio
+import importlib.util
 import os
 import sys
-import json
 from typing import List, Dict, Optional
 
 # ═══════════════════════════════════════════════════════════════
 #  CONFIGURACIÓN
 # ═══════════════════════════════════════════════════════════════
 
-MEMORY_DIR = os.path.expanduser("~/.moltbot/memory")
-MEMORY_FILE = os.path.join(MEMORY_DIR, "memory.json")
-
 # Mem0 Cloud
 MEM0_API_KEY = os.environ.get("MEM0_API_KEY", "m0-BaJE0pOCCpJujBbLZCZRFxykr9yzUpylQNj5wQWN")
 
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tracker"))
+from telemetry_shim import timed
+
 # ═══════════════════════════════════════════════════════════════
 #  MEMORIA LOCAL (PRIMARIA)
 # ═══════════════════════════════════════════════════════════════
 
+def _load_memoria_local():
+    """memoria-local.py (nombre con guión), dueño de las escrituras de memory.json"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memoria-local.py")
+    spec = importlib.util.spec_from_file_location("memoria_local", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+_memoria_local = _load_memoria_local()
+
 def load_local_memory() -> Dict:
     """Cargar memoria local"""
-    os.makedirs(MEMORY_DIR, exist_ok=True)
-    if not os.path.exists(MEMORY_FILE):
-        with open(MEMORY_FILE, 'w') as f:
-            json.dump({"memories": [], "last_updated": None}, f, indent=2)
-    with open(MEMORY_FILE, 'r') as f:
-        return json.load(f)
-
-def save_local_memory(data: Dict):
-    """Guardar memoria local"""
-    with open(MEMORY_FILE, 'w') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    return _memoria_local.load_memory()
+
+def local_add(text: str, category: str = "general"):
+    """Agregar a memoria local (bajo el flock de memory.json, entre hilos y procesos)"""
+    _memoria_local.add(text, category)
 
 def local_search(query: str, limit: int = 5) -> List[str]:
     """Búsqueda local simple"""
@@ -50,17 +55,6 @@ def local_search(query: str, limit: int = 5) -> List[str]:
     
     return results[:limit]
 
-def local_add(text: str, category: str = "general"):
-    """Agregar a memoria local"""
-    data = load_local_memory()
-    data["memories"].append({
-        "id": str(int(__import__('time').time() * 1000)),
-        "text": text,
-        "category": category,
-        "created": __import__('datetime').datetime.now().isoformat()
-    })
-    save_local_memory(data)
-
 # ═══════════════════════════════════════════════════════════════
 #  MEM0 CLOUD (BÚSQUEDA SEMÁNTICA)
 # ═══════════════════════════════════════════════════════════════
@@ -121,6 +115,7 @@ class Memoria:
         self.mem0_enabled = init_mem0()
         print(f"🧠 Memoria: Local={'✅'} Mem0 Cloud={'✅' if self.mem0_enabled else '❌'}")
     
+    @timed("memory.wrapper.add")
     def add(self, text: str, category: str = "general") -> str:
         """Agregar memoria (Mem0 Cloud + local)"""
         # Mem0 Cloud
@@ -134,6 +129,7 @@ class Memoria:
         local_add(text, category)
         return f"✅ Guardado: {text[:40]}..."
     
+    @timed("memory.wrapper.search")
     def search(self, query: str, limit: int = 5) -> List[str]:
         """Buscar memorias"""
         results = []
@@ -158,6 +154,16 @@ class Memoria:
         
         return unique[:limit]
     
+    # ── Async (servicios con event loop) ──────────────────────
+    
+    async def aadd(self, text: str, category: str = "general") -> str:
+        """add() sin bloquear el event loop (Mem0 y archivo en el pool de hilos)"""
+        return await asyncio.to_thread(self.add, text, category)
+    
+    async def asearch(self, query: str, limit: int = 5) -> List[str]:
+        """search() sin bloquear el event loop"""
+        return await asyncio.to_thread(self.search, query, limit)
+    
     def get_all(self, category: Optional[str] = None) -> List[Dict]:
         """Obtener todas las memorias"""
         data = load_local_memory()
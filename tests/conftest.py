@@ -0,0 +1,50 @@
+"""
+Configuración común de pytest
+Los módulos se importan planos (como en agents/ y tracker/), así que sus
+directorios van a sys.path. Nada de lo que se prueba aquí toca ~/.moltbot:
+cada test recibe un HOME temporal.
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for sub in ("agents", "tracker", "benchmarks"):
+    sys.path.insert(0, os.path.join(ROOT, sub))
+
+os.environ.pop("MOLTBOT_TELEMETRY", None)
+
+def load_memory_module(filename: str):
+    """Cargar memory/memoria-*.py (nombre con guión) como módulo nuevo"""
+    path = os.path.join(ROOT, "memory", filename)
+    spec = importlib.util.spec_from_file_location(filename.replace("-", "_")[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture(autouse=True)
+def home(tmp_path, monkeypatch):
+    """HOME temporal: los módulos que resuelven ~ al importarse se cargan dentro del test"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return tmp_path
+
+@pytest.fixture
+def fake_llm():
+    """Servidor OpenAI/Ollama falso (benchmarks/fake_llm.py); devuelve (handler, url)"""
+    from fake_llm import start_server
+    server, url = start_server()
+    yield server.RequestHandlerClass, url
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def fake_fizzy():
+    """API de Fizzy en memoria (tests/fake_fizzy.py) con fallos inyectables"""
+    from fake_fizzy import start_server
+    server = start_server()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+🧪 Fake Fizzy - Servidor en memoria con la API que usa fizzy_api.FizzyClient
+Keep-alive (HTTP/1.1) y fallos inyectables para probar reintentos:
+
+    server.faults.append("drop")        → cerrar sin procesar ni responder
+    server.faults.append("drop_after")  → procesar y cerrar sin responder
+    server.faults.append(("hang", 1.0)) → procesar y tardar en responder
+    server.faults.append(503)           → responder con ese estado
+    server.close_idle = True            → cerrar tras cada respuesta sin avisar
+
+Los fallos se consumen uno por petición, en orden.
+"""
+
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PREFIX = "/api/v1"
+
+class FakeFizzy(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0)):
+        super().__init__(address, Handler)
+        self.cards = {}
+        self.faults = []
+        self.calls = []
+        self.close_idle = False
+        self.lock = threading.Lock()
+        self._next_id = 1
+        self._clock = datetime.now(timezone.utc)
+
+    def handle_error(self, request, client_address):
+        # El cliente cortó a propósito (timeout/drop): no ensuciar la salida de pytest
+        pass
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def stamp(self) -> str:
+        """updated_at estrictamente creciente (dos cambios nunca comparten marca)"""
+        self._clock = max(datetime.now(timezone.utc), self._clock + timedelta(microseconds=1))
+        return self._clock.isoformat(timespec="microseconds")
+
+    def add_card(self, title, description="", column_id=1) -> dict:
+        with self.lock:
+            card = {"id": self._next_id, "title": title, "description": description,
+                    "column_id": int(column_id), "updated_at": self.stamp()}
+            self.cards[card["id"]] = card
+            self._next_id += 1
+            return dict(card)
+
+    def live(self) -> list:
+        return [c for c in self.cards.values() if not c.get("deleted")]
+
+    # ── Rutas ──────────────────────────────────────────────────
+
+    def dispatch(self, method, path, query, body):
+        """(status, cuerpo) de una petición ya sin el prefijo /api/v1"""
+        if method == "POST" and re.fullmatch(r"/boards/\w+/cards", path):
+            fields = body["card"]
+            return 201, self.add_card(fields.get("title", ""), fields.get("description", ""),
+                                      fields.get("column_id") or 1)
+
+        listing = re.fullmatch(r"/boards/\w+(?:/columns/(\w+))?/cards", path)
+        if method == "GET" and listing:
+            since = query.get("updated_since", [None])[0]
+            cards = list(self.cards.values())
+            if since:
+                cutoff = datetime.fromisoformat(since)
+                cards = [c for c in cards if datetime.fromisoformat(c["updated_at"]) > cutoff]
+            else:
+                cards = [c for c in cards if not c.get("deleted")]
+            if listing.group(1):
+                cards = [c for c in cards if str(c["column_id"]) == listing.group(1)]
+            return 200, cards
+
+        match = re.fullmatch(r"/cards/(\d+)(/move)?", path)
+        card = self.cards.get(int(match.group(1))) if match else None
+        if card is None or card.get("deleted"):
+            return 404, {"error": "not found"}
+        with self.lock:
+            if method == "PATCH" and match.group(2):
+                card["column_id"] = int(body["card"]["column_id"])
+            elif method == "PATCH":
+                card.update(body["card"])
+            elif method == "DELETE":
+                card["deleted"] = True
+            elif method != "GET":
+                return 405, {"error": method}
+            if method != "GET":
+                card["updated_at"] = self.stamp()
+            return 200, dict(card)
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        parts = urlsplit(self.path)
+        with server.lock:
+            fault = server.faults.pop(0) if server.faults else None
+            server.calls.append((self.command, parts.path, dict(self.headers)))
+        if fault == "drop":
+            self.close_connection = True
+            return
+        if isinstance(fault, int):
+            status, data = fault, {"error": "fault"}
+        else:
+            status, data = server.dispatch(self.command, parts.path[len(PREFIX):],
+                                           parse_qs(parts.query), body)
+        if fault == "drop_after":
+            self.close_connection = True
+            return
+        if isinstance(fault, tuple) and fault[0] == "hang":
+            time.sleep(fault[1])
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        # Cierre "silencioso": el cliente se entera al reutilizar la conexión
+        if server.close_idle:
+            self.close_connection = True
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+def start_server() -> FakeFizzy:
+    server = FakeFizzy()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
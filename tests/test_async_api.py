@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+import pytest
+
+import async_http
+
+# ── HTTP (async_http) ──────────────────────────────────────────
+
+def test_raw_fallback_without_httpx(fake_llm, monkeypatch):
+    handler, url = fake_llm
+    monkeypatch.setattr(async_http, "httpx", None)
+
+    async def main():
+        return await asyncio.gather(async_http.http_get(f"{url}/v1/models", 2),
+                                    async_http.http_get(f"{url}/nada", 2))
+
+    (status, body), (missing, _) = asyncio.run(main())
+    assert status == 200 and json.loads(body)["data"]
+    assert missing == 404
+    assert not async_http._clients
+
+def test_raw_fallback_honours_the_timeout(fake_llm, monkeypatch):
+    handler, url = fake_llm
+    handler.latency = 1.0
+    monkeypatch.setattr(async_http, "httpx", None)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(async_http.http_get(f"{url}/v1/models", 0.1))
+
+def test_client_is_reused_within_a_loop_and_closed_with_it(fake_llm):
+    pytest.importorskip("httpx")
+    handler, url = fake_llm
+
+    async def main():
+        await async_http.http_get(f"{url}/api/tags", 2)
+        first = await async_http._client()
+        await async_http.http_get(f"{url}/api/tags", 2)
+        assert await async_http._client() is first
+        return first
+
+    clients = [asyncio.run(main()), asyncio.run(main())]
+    assert clients[0] is not clients[1]
+    assert all(client.is_closed for client in clients)
+
+def test_aclose_closes_the_current_loop_client(fake_llm):
+    pytest.importorskip("httpx")
+    handler, url = fake_llm
+
+    async def main():
+        await async_http.http_get(f"{url}/api/tags", 2)
+        client = await async_http._client()
+        await async_http.aclose()
+        assert client.is_closed
+        # Una petición posterior abre un cliente nuevo
+        status, _ = await async_http.http_get(f"{url}/api/tags", 2)
+        return status, client, await async_http._client()
+
+    status, closed, reopened = asyncio.run(main())
+    assert status == 200 and reopened is not closed
+
+# ── Agentes (async_api, necesita crewai) ───────────────────────
+
+@pytest.fixture
+def async_api(home):
+    pytest.importorskip("crewai")
+    import async_api
+    return async_api
+
+def test_identical_akickoff_calls_share_one_inference(async_api, monkeypatch):
+    runs = []
+
+    class Resilience:
+        async def acall(self, backend, fn):
+            runs.append(backend)
+            await asyncio.sleep(0.05)
+            return fn()
+
+    monkeypatch.setattr(async_api, "prepare_kickoff",
+                        lambda agent, description, expected: (description, "ollama", lambda: description.upper()))
+    monkeypatch.setattr(async_api, "get_resilience", lambda: Resilience())
+
+    async def main():
+        return await asyncio.gather(*(async_api.akickoff_task(None, "hola") for _ in range(5)),
+                                    async_api.akickoff_task(None, "adiós"))
+
+    assert asyncio.run(main()) == ["HOLA"] * 5 + ["ADIÓS"]
+    assert sorted(runs) == ["ollama", "ollama"]
+    assert not async_api._in_flight
+
+def test_acheck_services_against_a_fake_server(async_api, fake_llm, monkeypatch, home):
+    from resilience import ResilienceManager
+
+    handler, url = fake_llm
+    manager = ResilienceManager(str(home / "resilience.json"))
+    monkeypatch.setattr(async_api, "get_resilience", lambda: manager)
+    monkeypatch.setattr(async_api, "SERVICE_URLS",
+                        {"ollama": f"{url}/api/tags", "lm_studio": f"{url}/nada"})
+
+    assert asyncio.run(async_api.acheck_services()) == {"ollama": True, "lm_studio": False}
+    assert manager.breakers["lm_studio"].failures == 1
+
+def test_arun_with_agent_returns_memoized_result_without_an_agent(async_api, monkeypatch):
+    monkeypatch.setattr(async_api, "lookup_result", lambda task, agent_id: {"result": "guardado"})
+
+    async def no_agent(agent_id):
+        pytest.fail("no debería crear el agente")
+
+    monkeypatch.setattr(async_api, "acreate_agent", no_agent)
+    assert asyncio.run(async_api.arun_with_agent("minimax", "tarea")) == "guardado"
@@ -0,0 +1,23 @@
+import copy
+import json
+
+import run
+
+def _baseline():
+    with open(run.BASELINE_FILE) as f:
+        return json.load(f)
+
+def test_committed_baseline_covers_every_case():
+    baseline = _baseline()
+    cases = {r["case"] for r in baseline["results"]}
+    assert cases == set(run.CASES)
+    assert baseline["meta"]["seed"] == 42
+
+def test_compare_flags_only_real_regressions():
+    baseline = _baseline()
+    assert run.compare(baseline, baseline) == 0
+
+    slower = copy.deepcopy(baseline)
+    measured = [r for r in slower["results"] if r.get("p95_ms", 0) > 1]
+    measured[0]["p95_ms"] *= 2
+    assert run.compare(slower, baseline) == 1
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from coalescing import SingleFlight
+
+def _burst(flight, n, execute, key="k"):
+    """n llamadas a la vez con la misma clave; devuelve [(resultado | excepción)]"""
+    outcomes = [None] * n
+
+    def call(i):
+        try:
+            outcomes[i] = flight.do(key, execute)
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads, outcomes
+
+def _wait_for_waiters(flight, n, key="k"):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with flight._lock:
+            call = flight._calls.get(key)
+            if call is not None and call.waiters == n:
+                return
+        time.sleep(0.001)
+    pytest.fail(f"no llegaron {n} llamadas a esperar")
+
+def test_concurrent_identical_calls_execute_once():
+    flight, release, runs = SingleFlight(), threading.Event(), []
+
+    def execute():
+        runs.append(1)
+        release.wait()
+        return {"answer": 42}
+
+    threads, outcomes = _burst(flight, 8, execute)
+    _wait_for_waiters(flight, 7)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(runs) == 1
+    assert all(o is outcomes[0] for o in outcomes) and outcomes[0] == {"answer": 42}
+    assert flight.stats() == {"upstream": 1, "coalesced": 7, "in_flight": 0}
+
+def test_leader_exception_reaches_every_waiter_and_clears_the_key():
+    flight, release = SingleFlight(), threading.Event()
+
+    def execute():
+        release.wait()
+        raise ConnectionError("backend caído")
+
+    threads, outcomes = _burst(flight, 5, execute)
+    _wait_for_waiters(flight, 4)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert all(isinstance(o, ConnectionError) for o in outcomes)
+    assert flight.stats()["in_flight"] == 0
+    # La clave quedó libre: la siguiente llamada vuelve a ejecutar
+    assert flight.do("k", lambda: "de nuevo") == "de nuevo"
+    assert flight.stats() == {"upstream": 2, "coalesced": 4, "in_flight": 0}
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+    assert [flight.do(k, lambda k=k: k * 2) for k in (1, 2, 3)] == [2, 4, 6]
+    assert flight.stats() == {"upstream": 3, "coalesced": 0, "in_flight": 0}
+
+def test_kickoff_task_coalesces_identical_prompts(monkeypatch):
+    pytest.importorskip("crewai")
+    import agents
+
+    release, runs = threading.Event(), []
+
+    def run():
+        runs.append(1)
+        release.wait()
+        return "resultado"
+
+    class Resilience:
+        def call(self, backend, fn):
+            return fn()
+
+    monkeypatch.setattr(agents, "_request_coalescer", SingleFlight())
+    monkeypatch.setattr(agents, "prepare_kickoff", lambda *args: ("clave", "ollama", run))
+    monkeypatch.setattr(agents, "get_resilience", lambda: Resilience())
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(agents.kickoff_task(None, "tarea")))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    _wait_for_waiters(agents._request_coalescer, 3, key="clave")
+    release.set()
+    for t in threads:
+        t.join()
+    assert runs == [1] and results == ["resultado"] * 4
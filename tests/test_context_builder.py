@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+
+import context_builder
+
+def test_time_dependent_tasks_are_not_memoized(home, monkeypatch):
+    monkeypatch.setattr(context_builder, "embed", lambda text, timeout: None)
+    context_builder.remember_result("Resume el estado del tablero", "3 en curso")
+    assert context_builder.lookup_result("Resume el estado del tablero") is None
+
+    context_builder.remember_result("Traduce 'hola' al inglés", "hello")
+    assert context_builder.lookup_result("Traduce 'hola' al inglés")["result"] == "hello"
+
+def test_is_volatile():
+    assert context_builder.is_volatile("Informe de hoy")
+    assert context_builder.is_volatile("Últimos cambios en el repo")
+    assert not context_builder.is_volatile("Explica qué es un estadio")
+
+OLLAMA = "llama3.1:8b-instruct-q4_K_M"
+
+def _slow_search(release):
+    def search(query, limit):
+        release.wait(5)
+        return [{"text": "llegó tarde"}]
+    return search
+
+def test_slow_search_returns_context_without_memories(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(context_builder, "_search_memories", _slow_search(release))
+    start = time.perf_counter()
+    retrieval = context_builder.start_retrieval("Corrige el bug")
+    ctx = context_builder.build_context("Corrige el bug", retrieval, OLLAMA, deadline=0.05)
+    release.set()
+    assert time.perf_counter() - start < 1
+    assert ctx.timed_out and ctx.memories == 0 and ctx.prompt == "Corrige el bug"
+    assert "sin contexto" in context_builder.describe(ctx)
+
+def test_async_slow_search_does_not_block(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(context_builder, "_search_memories", _slow_search(release))
+
+    async def main():
+        retrieval = context_builder.astart_retrieval("Corrige el bug")
+        start = time.perf_counter()
+        ctx = await context_builder.abuild_context("Corrige el bug", retrieval, OLLAMA, deadline=0.05)
+        release.set()
+        return ctx, time.perf_counter() - start
+
+    ctx, elapsed = asyncio.run(main())
+    assert elapsed < 1 and ctx.timed_out and ctx.prompt == "Corrige el bug"
+
+def test_failed_search_is_reported_not_raised(monkeypatch):
+    def broken(query, limit):
+        raise OSError("memory.json ilegible")
+    monkeypatch.setattr(context_builder, "_search_memories", broken)
+    retrieval = context_builder.start_retrieval("tarea")
+    ctx = context_builder.build_context("tarea", retrieval, OLLAMA, deadline=1)
+    assert ctx.error == "memory.json ilegible" and ctx.prompt == "tarea"
+
+def test_dedupe_and_rank():
+    memories = [
+        {"text": "Usa Postgres", "_score": 0.5, "usage_count": 0, "created": "2026-01-01"},
+        {"text": "usa   postgres", "_score": 0.5, "usage_count": 0, "created": "2026-02-01"},
+        {"text": "Usa Postgres 16 en producción", "_score": 0.4},
+        {"text": "Prefiere respuestas breves", "_score": 0.9},
+        {"text": "Despliega los viernes", "_score": 0.5, "usage_count": 3},
+        {"text": ""},
+    ]
+    ranked = [m["text"] for m in context_builder.dedupe_and_rank(memories)]
+    # Score, luego uso, luego la más reciente; la contenida en otra ya vista cae
+    assert ranked == ["Prefiere respuestas breves", "Despliega los viernes", "usa   postgres"]
+
+def test_memories_are_packed_within_the_token_budget(monkeypatch):
+    from token_budget import DEFAULT_MEMORY_TOKENS, get_prompt_budget
+
+    memories = [{"text": f"memoria {i} " + "detalle " * 200, "_score": 1 - i / 100}
+                for i in range(30)]
+    monkeypatch.setattr(context_builder, "_search_memories", lambda query, limit: memories)
+    retrieval = context_builder.start_retrieval("tarea")
+    ctx = context_builder.build_context("tarea", retrieval, OLLAMA, deadline=1)
+
+    assert ctx.packed.memory_tokens <= DEFAULT_MEMORY_TOKENS
+    assert ctx.packed.tokens <= get_prompt_budget(OLLAMA)
+    assert ctx.memories == ctx.packed.included and ctx.memories < 30
+    assert ctx.prompt.startswith("Contexto relevante") and ctx.prompt.endswith("tarea")
@@ -0,0 +1,59 @@
+import os
+import threading
+
+from event_log import EventLog
+
+def _completed(log: EventLog) -> int:
+    return sum(d["completed"] for d in log.rollups.data["days"].values())
+
+def test_threads_share_one_log_without_lost_updates(home):
+    log = EventLog(str(home / "events"))
+    per_thread, threads = 25, 8
+
+    def worker(n):
+        for i in range(per_thread):
+            card = f"{n}-{i}"
+            log.task_started(card, f"tarea {card}")
+            log.task_completed(card_id=card)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    assert sum(d["events"] for d in log.load_index().values()) == 2 * per_thread * threads
+    assert log.load_active() == {}
+    assert _completed(EventLog(str(home / "events"))) == per_thread * threads
+
+def test_missing_rollups_are_rebuilt_under_the_lock(home, monkeypatch):
+    base = str(home / "events")
+    log = EventLog(base)
+    log.task_started("1", "A", ts=1_700_000_000)
+    log.task_completed(card_id="1", ts=1_700_000_600)
+    os.remove(log.rollups.path)
+
+    depths = []
+    original = EventLog.completed_between
+
+    def spy(self, *args):
+        depths.append(self._lock_depth)
+        return original(self, *args)
+
+    monkeypatch.setattr(EventLog, "completed_between", spy)
+    rebuilt = EventLog(base)
+    assert depths and all(depths)
+    assert _completed(rebuilt) == 1
+
+def test_migrate_legacy_twice_does_not_duplicate_events(home):
+    legacy = home / "active_tasks.log"
+    legacy.write_text("1 Escribir informe (done: 1700000600)\n2 Revisar PR (started 1700000000)\n")
+    log = EventLog(str(home / "events"))
+
+    assert log.migrate_legacy(str(legacy)) == 2
+    assert log.migrate_legacy(str(legacy)) == 0
+    assert not legacy.exists()
+    assert (home / "active_tasks.log.migrated").exists()
+    assert sum(d["events"] for d in log.load_index().values()) == 3
+    assert _completed(log) == 1
+    assert list(log.load_active()) == ["2"]
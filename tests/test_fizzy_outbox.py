@@ -0,0 +1,125 @@
+import time
+
+import pytest
+
+import fizzy_outbox
+from fizzy_api import FizzyClient, FizzyError
+from fizzy_outbox import Outbox
+
+@pytest.fixture
+def outbox(home, monkeypatch):
+    monkeypatch.setattr(fizzy_outbox, "backoff_delay", lambda attempt: 0)
+    return Outbox(str(home / "outbox"))
+
+@pytest.fixture
+def client(fake_fizzy):
+    client = FizzyClient(fake_fizzy.url, timeout=0.5)
+    yield client
+    client.close()
+
+def _posts(server):
+    return [c for c in server.calls if c[0] == "POST"]
+
+# ── Cliente ────────────────────────────────────────────────────
+
+def test_post_is_not_retried_after_it_was_sent(fake_fizzy, client):
+    fake_fizzy.faults.append("drop_after")
+    with pytest.raises(FizzyError) as err:
+        client.create_card("A", column_id=2)
+    assert err.value.ambiguous
+    assert len(_posts(fake_fizzy)) == 1 and len(fake_fizzy.live()) == 1
+
+def test_post_timeout_is_ambiguous_and_not_retried(fake_fizzy, client):
+    fake_fizzy.faults.append(("hang", 1.0))
+    with pytest.raises(FizzyError) as err:
+        client.create_card("A")
+    assert err.value.ambiguous
+    assert len(_posts(fake_fizzy)) == 1
+
+def test_idempotent_request_is_retried(fake_fizzy, client):
+    card = fake_fizzy.add_card("A")
+    fake_fizzy.faults.append("drop_after")
+    assert client.move_card(card["id"], 3)["column_id"] == 3
+    assert client.connections == 2
+
+def test_stale_keepalive_is_replaced_before_a_post(fake_fizzy, client):
+    fake_fizzy.close_idle = True
+    client.create_card("A")
+    time.sleep(0.1)  # ociosa: el FIN del servidor ya llegó
+    client.create_card("B")
+    assert [c["title"] for c in fake_fizzy.live()] == ["A", "B"]
+    assert client.connections == 2
+
+def test_create_sends_idempotency_key(fake_fizzy, client):
+    client.create_card("A", idempotency_key="local-1")
+    assert _posts(fake_fizzy)[0][2]["Idempotency-Key"] == "local-1"
+
+# ── Outbox ─────────────────────────────────────────────────────
+
+def test_create_and_moves_merge_into_one_post(fake_fizzy, client, outbox):
+    key = outbox.create("A", "", "2")
+    outbox.move(key, "3")
+    stats = outbox.sync_once(client)
+    assert stats["sent"] == 1 and stats["merged"] == 1
+    assert [(c["title"], c["column_id"]) for c in fake_fizzy.live()] == [("A", 3)]
+    assert outbox.resolve(key) == str(fake_fizzy.live()[0]["id"])
+
+def test_lost_create_response_does_not_duplicate_the_card(fake_fizzy, client, outbox):
+    key = outbox.create("A", "ctx", "2")
+    fake_fizzy.faults.append("drop_after")
+    stats = outbox.sync_once(client)
+    assert stats["failed"] == 1 and outbox.load_state()["cards"][key]["uncertain"]
+
+    outbox.move(key, "3")
+    outbox.sync_once(client)
+    assert len(_posts(fake_fizzy)) == 1
+    assert [(c["title"], c["column_id"]) for c in fake_fizzy.live()] == [("A", 3)]
+    card = outbox.load_state()["cards"][key]
+    assert "uncertain" not in card and card["remote_id"] == str(fake_fizzy.live()[0]["id"])
+
+def test_uncertain_create_is_repeated_if_it_never_landed(fake_fizzy, client, outbox):
+    key = outbox.create("A", "", "2")
+    fake_fizzy.faults.append(503)
+    outbox.sync_once(client)
+    state = outbox.load_state()
+    state["cards"][key]["uncertain"] = fizzy_outbox._now()
+    outbox.save_state(state)
+    outbox.sync_once(client)
+    assert [c["title"] for c in fake_fizzy.live()] == ["A"]
+    assert outbox.status()["dirty"] == 0
+
+def test_open_card_survives_prune_and_gets_its_done_move(fake_fizzy, client, outbox, monkeypatch):
+    key = outbox.create("Larga", "", "2")
+    outbox.sync_once(client)
+    later = fizzy_outbox._now() + (fizzy_outbox.KEEP_SYNCED_DAYS + 3) * 86400
+    monkeypatch.setattr(fizzy_outbox, "_now", lambda: later)
+    outbox.sync_once(client)
+    assert key in outbox.load_state()["cards"]
+
+    outbox.move(key, "3")
+    assert outbox.sync_once(client)["sent"] == 1
+    assert fake_fizzy.live()[0]["column_id"] == 3
+
+def test_closed_card_is_pruned_after_retention(fake_fizzy, client, outbox, monkeypatch):
+    key = outbox.create("A", "", "3")
+    outbox.sync_once(client)
+    later = fizzy_outbox._now() + (fizzy_outbox.KEEP_SYNCED_DAYS + 1) * 86400
+    monkeypatch.setattr(fizzy_outbox, "_now", lambda: later)
+    outbox.sync_once(client)
+    assert key not in outbox.load_state()["cards"]
+
+def test_move_for_unknown_key_is_kept_and_reported(fake_fizzy, client, outbox, capsys):
+    outbox.move("local-perdida", "3")
+    stats = outbox.sync_once(client)
+    assert stats["sent"] == 0 and fake_fizzy.calls == []
+    assert outbox.status()["orphans"] == {"local-perdida": "3"}
+    assert "local-perdida" in capsys.readouterr().err
+
+def test_non_retryable_error_marks_the_card(fake_fizzy, client, outbox):
+    key = outbox.create("A", "", "2")
+    fake_fizzy.faults.append(422)
+    outbox.sync_once(client)
+    assert key in outbox.status()["failed"]
+    assert outbox.clear_errors() == 1
+    outbox.sync_once(client)
+    assert outbox.status()["failed"] == {} and len(fake_fizzy.live()) == 1
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+import kanban
+from kanban import KanbanBoard
+
+@pytest.fixture
+def board_path(home):
+    return str(home / "kanban.json")
+
+def _board(path, **kw):
+    kw.setdefault("auto_archive", False)
+    return KanbanBoard(path, **kw)
+
+def test_move_keeps_column_order_and_index(board_path):
+    board = _board(board_path)
+    ids = [board.create(f"t{i}")["id"] for i in range(5)]
+    assert board.move(ids[1], "progress")
+    assert [c["id"] for c in board.cards("backlog")] == [ids[0], ids[2], ids[3], ids[4]]
+    assert board.locate(ids[1]) == "progress"
+    assert all(board.locate(i) == "backlog" for i in ids[2:])
+    assert board.move(ids[1], "backlog")
+    assert [c["id"] for c in board.cards("backlog")][-1] == ids[1]
+
+def test_move_does_not_scan_the_column(board_path, monkeypatch):
+    board = _board(board_path)
+    ids = [board.create(f"t{i}")["id"] for i in range(2000)]
+    calls = []
+    monkeypatch.setattr(board, "cards", lambda col: calls.append(col) or [])
+    board.move(ids[0], "done")
+    board.delete(ids[1])
+    assert calls == []
+
+def test_round_trip_preserves_order_and_marks(board_path):
+    board = _board(board_path)
+    a = board.create("A")["id"]
+    b = board.create("B")["id"]
+    board.move(a, "thisweek")
+    board.move(a, "backlog")
+    board.save()
+
+    again = _board(board_path)
+    assert [c["title"] for c in again.cards("backlog")] == ["B", "A"]
+    assert again.get(a)["version"] == 3
+    assert again.data["seq"] == 4
+    with open(board_path) as f:
+        assert [c["id"] for c in json.load(f)["columns"]["backlog"]["cards"]] == [b, a]
+
+def test_delete_leaves_tombstone(board_path):
+    board = _board(board_path)
+    cid = board.create("A")["id"]
+    assert board.delete(cid)
+    assert board.get(cid) is None and board.locate(cid) is None
+    changed, deleted = board.changed_since(0)
+    assert changed == [] and cid in deleted
+
+def test_rollups_follow_completions(board_path):
+    board = _board(board_path)
+    cid = board.create("A")["id"]
+    board.start(cid)
+    board.move(cid, "done")
+    board.done(cid)
+    assert sum(d["completed"] for d in board.rollups.data["days"].values()) == 1
+    board.move(cid, "progress")
+    assert sum(d["completed"] for d in board.rollups.data["days"].values()) == 0
+
+def test_write_command_loads_board_once(board_path, monkeypatch):
+    monkeypatch.setattr(kanban, "KANBAN_FILE", board_path)
+    assert kanban.main(["create", "A"]) == 0
+
+    loads = []
+    real_load = KanbanBoard.load
+    monkeypatch.setattr(KanbanBoard, "load", lambda self: loads.append(1) or real_load(self))
+    assert kanban.main(["create", "B"]) == 0
+    assert len(loads) == 1
+
+def test_legacy_board_gets_rollups_under_lock(board_path, monkeypatch):
+    board = _board(board_path, track_rollups=False)
+    cid = board.create("A", column="done")["id"]
+    board.done(cid)
+    board.save()
+    monkeypatch.setattr(kanban, "KANBAN_FILE", board_path)
+
+    assert kanban.main(["report"]) == 0
+    rollups = _board(board_path).rollups
+    assert sum(d["completed"] for d in rollups.data["days"].values()) == 1
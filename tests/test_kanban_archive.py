@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from kanban import KanbanBoard
+from kanban_archive import KanbanArchive, archive_board, archive_dir, restore_card
+
+@pytest.fixture
+def board_path(home):
+    return str(home / "kanban.json")
+
+def _old_done(board, title, days=30):
+    card = board.create(title)
+    board.move(card["id"], "done")
+    when = (datetime.now() - timedelta(days=days)).astimezone().isoformat(timespec="seconds")
+    card["done"] = card["updated"] = when
+    return card["id"]
+
+def test_archive_moves_old_done_cards(board_path):
+    board = KanbanBoard(board_path, auto_archive=False)
+    old = _old_done(board, "Vieja")
+    board.create("Abierta")
+    assert archive_board(board) == 1
+    board.save()
+    assert board.get(old) is None
+    assert [e["card"]["id"] for e in KanbanArchive(archive_dir(board_path)).iter_cards()] == [old]
+
+def test_restored_card_is_not_archived_again(board_path):
+    board = KanbanBoard(board_path, auto_archive=False)
+    cid = _old_done(board, "Vieja")
+    archive_board(board)
+    board.save()
+
+    assert restore_card(board, cid)
+    assert board.locate(cid) == "done" and board.get(cid)["restored"]
+    assert archive_board(board) == 0
+    assert board.locate(cid) == "done"
+    assert cid not in KanbanArchive(archive_dir(board_path)).index["ids"]
+
+def test_crash_before_board_save_leaves_no_duplicates(board_path):
+    board = KanbanBoard(board_path, auto_archive=False)
+    cid = _old_done(board, "Vieja")
+    board.save()
+    # Archivado cortado: el archivo ya tiene la tarjeta, el tablero en disco también
+    archive_board(KanbanBoard(board_path, auto_archive=False))
+
+    board = KanbanBoard(board_path, auto_archive=False)
+    assert board.get(cid) is not None
+    archive = KanbanArchive(archive_dir(board_path))
+    assert list(archive.iter_cards(exclude=board.index)) == []
+    assert len(board.rebuild_rollups().data["days"]) == 1
+    assert sum(d["completed"] for d in board.rollups.data["days"].values()) == 1
+
+    # La siguiente pasada termina el trabajo sin duplicar la entrada
+    assert archive_board(board) == 1
+    board.save()
+    assert [e["card"]["id"] for e in KanbanArchive(archive_dir(board_path)).iter_cards()] == [cid]
+    assert len(list(archive.read_partition(archive.index["ids"][cid]))) == 1
+
+def test_crash_during_restore_does_not_keep_the_stale_copy(board_path, monkeypatch):
+    board = KanbanBoard(board_path, auto_archive=False)
+    cid = _old_done(board, "Vieja")
+    archive_board(board)
+    board.save()
+    # Restauración cortada: tablero guardado, archivo sin limpiar
+    monkeypatch.setattr(KanbanArchive, "remove", lambda self, card_id: None)
+    assert restore_card(board, cid)
+    monkeypatch.undo()
+
+    board.update(cid, title="Vieja (editada)")
+    assert archive_board(board, days=-1) == 1
+    board.save()
+    archive = KanbanArchive(archive_dir(board_path))
+    assert [e["card"]["title"] for e in archive.iter_cards()] == ["Vieja (editada)"]
+    assert sum(p["cards"] for p in archive.index["partitions"].values()) == 1
+
+def test_restore_unknown_card(board_path):
+    board = KanbanBoard(board_path, auto_archive=False)
+    assert not restore_card(board, "nada")
@@ -0,0 +1,61 @@
+import pytest
+
+from kanban import KanbanBoard
+from kanban_search import open_index
+
+@pytest.fixture
+def board_path(home):
+    return str(home / "kanban.json")
+
+def _board(path, cards):
+    board = KanbanBoard(path, auto_archive=False)
+    ids = {}
+    for title, column in cards:
+        ids[title] = board.create(title, column=column)["id"]
+    board.save()
+    return ids
+
+def test_lookup_exact_title_ignores_case_and_punctuation(board_path):
+    ids = _board(board_path, [("Deploy staging", "progress"), ("Deploy", "progress")])
+    index = open_index(board_path)
+    assert index.lookup("deploy", "progress") == ids["Deploy"]
+    assert index.lookup("Deploy  staging.", "progress") == ids["Deploy staging"]
+
+def test_lookup_never_returns_a_loose_match(board_path):
+    _board(board_path, [("Deploy staging", "progress")])
+    assert open_index(board_path).lookup("Deploy", "progress") is None
+    assert open_index(board_path).lookup("Deploy prod", "progress") is None
+
+def test_lookup_ambiguous_title_returns_none(board_path):
+    _board(board_path, [("Revisar PR", "progress"), ("revisar pr", "backlog")])
+    index = open_index(board_path)
+    assert index.lookup("Revisar PR") is None
+    assert index.lookup("Revisar PR", "progress") is not None
+
+def test_search_matches_prefix_of_last_word(board_path):
+    ids = _board(board_path, [("Migrar base de datos", "backlog"), ("Migrar logs", "done")])
+    results = open_index(board_path).search("migrar da")
+    assert [r["id"] for r in results] == [ids["Migrar base de datos"]]
+
+def test_lookup_finds_the_card_among_many_with_the_same_words(board_path):
+    board = KanbanBoard(board_path, auto_archive=False)
+    for i in range(600):
+        board.create(f"Revisar PR del equipo {i}", column="progress")
+    target = board.create("Revisar PR del equipo", column="progress")["id"]
+    board.save()
+    assert open_index(board_path).lookup("Revisar PR del equipo", "progress") == target
+
+def test_lookup_title_of_one_letter_words(board_path):
+    ids = _board(board_path, [("A y B", "progress")])
+    assert open_index(board_path).lookup("a y b", "progress") == ids["A y B"]
+
+def test_lookup_cli_reports_missing_and_ambiguous(board_path, monkeypatch, capsys):
+    import kanban_search
+
+    ids = _board(board_path, [("Deploy", "progress"), ("Revisar PR", "progress"), ("revisar pr", "progress")])
+    monkeypatch.setattr(kanban_search, "open_index", lambda: open_index(board_path))
+    assert kanban_search.main(["lookup", "deploy", "progress"]) == 0
+    assert capsys.readouterr().out.strip() == ids["Deploy"]
+    assert kanban_search.main(["lookup", "Nada", "progress"]) == 1
+    assert kanban_search.main(["lookup", "Revisar PR", "progress"]) == 2
+    assert capsys.readouterr().out == ""
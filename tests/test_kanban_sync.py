@@ -0,0 +1,131 @@
+import pytest
+
+import kanban_sync
+from fizzy_api import FizzyClient
+from kanban import KanbanBoard
+from kanban_sync import KanbanSync
+from locking import file_lock, lock_path
+
+@pytest.fixture
+def board_path(home):
+    return str(home / "kanban.json")
+
+@pytest.fixture
+def client(fake_fizzy):
+    client = FizzyClient(fake_fizzy.url)
+    yield client
+    client.close()
+
+def _snapshot(path):
+    board = KanbanBoard(path, auto_archive=False, load=False)
+    board.snapshot()
+    return board
+
+def _sync(path, client, **kw):
+    sync = KanbanSync(_snapshot(path), client, **kw)
+    actions = sync.run()
+    return sync, actions
+
+def _edit(path, fn):
+    """Otro escritor: transacción propia sobre el archivo"""
+    board = KanbanBoard(path, auto_archive=False, load=False)
+    with board.transaction():
+        return fn(board)
+
+def test_push_then_nothing_to_do(board_path, client, fake_fizzy):
+    cid = _edit(board_path, lambda b: b.create("Local", "desc")["id"])
+    sync, actions = _sync(board_path, client)
+    assert [(a.direction, a.kind) for a in actions] == [("push", "create")]
+    assert [c["title"] for c in fake_fizzy.live()] == ["Local"]
+    assert sync.state["links"][cid]["remote_id"] == str(fake_fizzy.live()[0]["id"])
+    assert _sync(board_path, client)[1] == []
+
+def test_pull_applies_remote_move(board_path, client, fake_fizzy):
+    cid = _edit(board_path, lambda b: b.create("Tarea")["id"])
+    sync, _ = _sync(board_path, client)
+    rid = sync.state["links"][cid]["remote_id"]
+    client.move_card(rid, kanban_sync.COLUMN_IDS["done"])
+
+    sync, actions = _sync(board_path, client)
+    assert [(a.direction, a.kind) for a in actions] == [("pull", "update")]
+    board = KanbanBoard(board_path, auto_archive=False)
+    assert board.locate(cid) == "done" and board.get(cid)["done"]
+    assert _sync(board_path, client)[1] == []
+
+def test_remote_card_is_created_locally(board_path, client, fake_fizzy):
+    fake_fizzy.add_card("Desde Fizzy", "", kanban_sync.COLUMN_IDS["progress"])
+    _sync(board_path, client)
+    board = KanbanBoard(board_path, auto_archive=False)
+    assert [c["title"] for c in board.cards("progress")] == ["Desde Fizzy"]
+
+def test_board_lock_is_free_during_network_calls(board_path, client, fake_fizzy, monkeypatch):
+    _edit(board_path, lambda b: b.create("A"))
+    fake_fizzy.add_card("B")
+    free = []
+
+    def probe(method):
+        def wrapper(*args, **kwargs):
+            with file_lock(lock_path(board_path), blocking=False) as acquired:
+                free.append(acquired)
+            return method(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(client, "list_cards", probe(client.list_cards))
+    monkeypatch.setattr(client, "create_card", probe(client.create_card))
+    _sync(board_path, client)
+    assert free == [True, True]
+
+def test_card_edited_during_sync_is_not_overwritten(board_path, client, fake_fizzy, monkeypatch):
+    cid = _edit(board_path, lambda b: b.create("Original")["id"])
+    sync, _ = _sync(board_path, client)
+    rid = sync.state["links"][cid]["remote_id"]
+    client.update_card(rid, {"title": "Remoto"})
+
+    # Un escritor local cambia la tarjeta mientras la sincronización está en la red
+    list_cards = client.list_cards
+    def racing_list(*args, **kwargs):
+        _edit(board_path, lambda b: b.update(cid, title="Local"))
+        return list_cards(*args, **kwargs)
+    monkeypatch.setattr(client, "list_cards", racing_list)
+    sync, _ = _sync(board_path, client)
+    assert sync.last_stats["stale"] == 1
+    assert KanbanBoard(board_path, auto_archive=False).get(cid)["title"] == "Local"
+
+    # La marca remota no avanzó: la próxima ronda vuelve a ver el conflicto
+    monkeypatch.setattr(client, "list_cards", list_cards)
+    sync, actions = _sync(board_path, client, policy="local")
+    assert [(a.direction, a.conflict) for a in actions] == [("push", True)]
+    assert fake_fizzy.cards[int(rid)]["title"] == "Local"
+
+def test_local_delete_is_pushed(board_path, client, fake_fizzy):
+    cid = _edit(board_path, lambda b: b.create("A")["id"])
+    _sync(board_path, client)
+    _edit(board_path, lambda b: b.delete(cid))
+    _sync(board_path, client)
+    assert fake_fizzy.live() == []
+    assert KanbanBoard(board_path, auto_archive=False).data.get("deleted") == {}
+
+def test_main_skips_when_another_sync_runs(board_path, monkeypatch, capsys):
+    monkeypatch.setattr(kanban_sync, "KANBAN_FILE", board_path)
+    with file_lock(f"{kanban_sync.sync_state_path(board_path)}.lock"):
+        assert kanban_sync.main([]) == 0
+    assert "en marcha" in capsys.readouterr().out
+
+def test_remote_edit_of_locally_archived_card_is_not_lost(board_path, client, fake_fizzy):
+    from kanban_archive import KanbanArchive, archive_board, archive_dir
+
+    cid = _edit(board_path, lambda b: b.create("Vieja")["id"])
+    _edit(board_path, lambda b: b.move(cid, "done") and b.done(cid))
+    sync, _ = _sync(board_path, client)
+    rid = sync.state["links"][cid]["remote_id"]
+    _edit(board_path, lambda b: archive_board(b, days=-1))
+    assert KanbanBoard(board_path, auto_archive=False).get(cid) is None
+
+    client.update_card(rid, {"title": "Vieja (reabierta)"})
+    sync, actions = _sync(board_path, client)
+    assert [(a.direction, a.kind) for a in actions] == [("pull", "update")]
+    assert sync.last_stats["stale"] == 0
+    board = KanbanBoard(board_path, auto_archive=False)
+    assert board.get(cid)["title"] == "Vieja (reabierta)"
+    assert KanbanArchive(archive_dir(board_path)).get(cid) is None
+    assert _sync(board_path, client)[1] == []
@@ -0,0 +1,25 @@
+import json
+import threading
+
+from locking import atomic_write_json
+
+def test_threads_writing_the_same_file_do_not_share_a_tmp(tmp_path):
+    path = tmp_path / "state.json"
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(50):
+                atomic_write_json(str(path), {"writer": n, "i": i, "pad": "x" * 2000}, fsync=False)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert json.loads(path.read_text())["i"] == 49
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
@@ -0,0 +1,43 @@
+import os
+import threading
+
+import pytest
+
+from conftest import load_memory_module
+
+@pytest.fixture
+def memoria(home):
+    return load_memory_module("memoria-local.py")
+
+def test_search_does_not_rewrite_memory_file(memoria):
+    memoria.add("el usuario prefiere respuestas breves", "preferencia")
+    before = os.stat(memoria.MEMORY_FILE).st_mtime_ns
+    hits = memoria.search("respuestas breves")
+    assert [h["usage_count"] for h in hits] == [0]
+    assert os.stat(memoria.MEMORY_FILE).st_mtime_ns == before
+    assert memoria.search("respuestas breves")[0]["usage_count"] == 1
+
+def test_concurrent_search_and_add_lose_nothing(memoria):
+    memoria.add("memoria inicial de prueba")
+    per_thread, writers = 25, 4
+    stop = threading.Event()
+
+    def writer(n):
+        for i in range(per_thread):
+            memoria.add(f"memoria {n}-{i} de prueba")
+
+    def reader():
+        while not stop.is_set():
+            memoria.search("memoria prueba")
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    pool = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for t in readers + pool:
+        t.start()
+    for t in pool:
+        t.join()
+    stop.set()
+    for t in readers:
+        t.join()
+
+    assert len(memoria.get()) == 1 + per_thread * writers
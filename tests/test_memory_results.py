@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from conftest import load_memory_module
+
+@pytest.fixture
+def memoria(home):
+    return load_memory_module("memoria-local.py")
+
+def test_same_task_normalized_is_a_hit(memoria):
+    memoria.remember_result("Resume el informe de ventas", "resumen", agent="minimax", elapsed=3.0)
+    hit = memoria.find_result("resume el informe de ventas.", agent="minimax")
+    assert hit["result"] == "resumen" and hit["elapsed"] == 3.0
+    stats = memoria.result_stats()
+    assert stats["hits"] == 1 and stats["saved_seconds"] == 3.0
+
+def test_one_word_difference_is_a_miss(memoria):
+    memoria.remember_result("borra la tabla users de producción", "hecho", agent="ollama")
+    assert memoria.find_result("crea la tabla users de producción", agent="ollama") is None
+    assert memoria.find_result("borra la tabla users de producción", agent="minimax") is None
+
+def test_miss_does_not_write(memoria):
+    memoria.remember_result("tarea A", "a")
+    before = os.stat(memoria.RESULTS_FILE).st_mtime_ns
+    assert memoria.find_result("tarea B") is None
+    assert os.stat(memoria.RESULTS_FILE).st_mtime_ns == before
+
+def test_hit_updates_counters_atomically(memoria):
+    memoria.remember_result("tarea", "r", elapsed=1.0)
+    for _ in range(3):
+        memoria.find_result("tarea")
+    data = memoria.load_results()
+    entry = next(iter(data["results"].values()))
+    assert entry["hits"] == 3 and data["stats"]["hits"] == 3
+    assert memoria.result_stats()["hit_rate"] == pytest.approx(3 / 4)
+    leftovers = [f for f in os.listdir(memoria.MEMORY_DIR) if f.endswith(".tmp")]
+    assert leftovers == []
+
+def test_expired_result_is_a_miss(memoria, monkeypatch):
+    memoria.remember_result("tarea", "vieja")
+    monkeypatch.setattr(memoria, "RESULT_TTL", -1)
+    assert memoria.find_result("tarea") is None
+
+def test_similar_embedding_above_threshold_is_a_hit(memoria):
+    memoria.remember_result("Resume el informe de ventas", "resumen", vector=[1.0, 0.0, 0.1])
+    hit = memoria.find_result("Haz un resumen del informe de ventas", vector=[1.0, 0.0, 0.12])
+    assert hit["result"] == "resumen" and 0.99 < hit["similarity"] < 1
+
+    assert memoria.find_result("Borra la tabla", vector=[0.0, 1.0, 0.0]) is None
+    assert memoria.find_result("Otra cosa", vector=[1.0, 0.0, 0.12], threshold=1.0) is None
+    assert memoria.find_result("Otra cosa", agent="ollama", vector=[1.0, 0.0, 0.1]) is None
+
+def test_evicted_results_drop_their_vectors(memoria, monkeypatch):
+    monkeypatch.setattr(memoria, "RESULT_MAX_ENTRIES", 2)
+    for i in range(3):
+        memoria.remember_result(f"tarea {i}", "r", vector=[1.0, float(i)])
+    assert set(memoria.load_vectors()) == set(memoria.load_results()["results"])
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+import pytest
+
+from conftest import load_memory_module
+
+@pytest.fixture
+def modules(home):
+    return load_memory_module("memoria-wrapper.py"), load_memory_module("memoria-local.py")
+
+def test_concurrent_aadd_and_searches_lose_no_write(modules):
+    wrapper, local = modules
+    memoria = wrapper.Memoria()
+    total = 60
+    stop = threading.Event()
+
+    def retrieval():
+        # La búsqueda de context_builder (memoria-local) corre a la vez
+        while not stop.is_set():
+            local.search("nota concurrente")
+
+    def cli_writer():
+        # memoria-local.py add desde otro módulo (la CLI)
+        for i in range(total):
+            local.add(f"nota local {i}")
+
+    async def main():
+        writes = [memoria.aadd(f"nota concurrente {i}") for i in range(total)]
+        reads = [memoria.asearch("nota concurrente") for _ in range(total)]
+        await asyncio.gather(*writes, *reads)
+
+    readers = [threading.Thread(target=retrieval) for _ in range(2)]
+    readers.append(threading.Thread(target=cli_writer))
+    for t in readers:
+        t.start()
+    try:
+        asyncio.run(main())
+    finally:
+        stop.set()
+        for t in readers:
+            t.join()
+
+    texts = {m["text"] for m in memoria.get_all()}
+    assert texts == ({f"nota concurrente {i}" for i in range(total)}
+                     | {f"nota local {i}" for i in range(total)})
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+import model_residency
+from model_residency import DEFAULT_KEEP_ALIVE, PIN_MIN_USES, PINNED_KEEP_ALIVE, ModelResidencyManager
+
+MODELS = ["llama3.1:8b", "qwen2.5:14b", "qwen2.5-coder:7b"]
+
+@pytest.fixture
+def manager(fake_llm, home):
+    _, url = fake_llm
+    return ModelResidencyManager(url, str(home / "residency.json"), models=MODELS)
+
+def _wait_warming(manager):
+    for thread in threading.enumerate():
+        if thread.name.startswith("warm-"):
+            thread.join(5)
+
+def test_loaded_models_reads_api_ps(manager, fake_llm):
+    handler, _ = fake_llm
+    assert manager.loaded_models(refresh=True) == ["llama3.1:8b"]
+    handler.loaded["qwen2.5:14b"] = "5m"
+    assert manager.loaded_models() == ["llama3.1:8b"]          # caché de /api/ps
+    assert set(manager.loaded_models(refresh=True)) == {"llama3.1:8b", "qwen2.5:14b"}
+
+def test_warm_and_unload(manager, fake_llm):
+    handler, _ = fake_llm
+    assert manager.warm("qwen2.5:14b")
+    assert manager.is_loaded("qwen2.5:14b")
+    assert manager.unload("qwen2.5:14b")
+    assert not manager.is_loaded("qwen2.5:14b")
+    assert handler.generates[-1] == {"model": "qwen2.5:14b", "prompt": "", "keep_alive": 0}
+
+def test_frequent_model_gets_pinned_keep_alive(manager, fake_llm):
+    handler, _ = fake_llm
+    for _ in range(PIN_MIN_USES):
+        manager.record_use("llama3.1:8b")
+        _wait_warming(manager)
+    assert manager.is_hot("llama3.1:8b")
+    assert handler.loaded["llama3.1:8b"] == PINNED_KEEP_ALIVE
+
+def test_cold_model_is_loaded_with_default_keep_alive(manager, fake_llm):
+    handler, _ = fake_llm
+    manager.record_use("qwen2.5-coder:7b")
+    _wait_warming(manager)
+    assert handler.loaded["qwen2.5-coder:7b"] == DEFAULT_KEEP_ALIVE
+
+def test_prewarm_next_only_with_free_slot(manager, fake_llm, monkeypatch):
+    handler, _ = fake_llm
+    monkeypatch.setattr(model_residency, "MAX_RESIDENT", 2)
+    manager.transitions = {"llama3.1:8b": {"qwen2.5:14b": 3}}
+    assert manager.record_use("llama3.1:8b") == "qwen2.5:14b"
+    _wait_warming(manager)
+    assert "qwen2.5:14b" in handler.loaded
+
+    # Lleno: no se desaloja el modelo actual para precalentar el siguiente
+    handler.loaded.clear()
+    handler.loaded.update({"llama3.1:8b": "5m", "qwen2.5-coder:7b": "5m"})
+    manager.record_use("qwen2.5-coder:7b", prewarm=False)
+    manager.transitions = {"llama3.1:8b": {"qwen2.5:14b": 3}}
+    manager.loaded_models(refresh=True)
+    manager.record_use("llama3.1:8b")
+    _wait_warming(manager)
+    assert "qwen2.5:14b" not in handler.loaded
+
+def test_group_by_model_puts_loaded_first(manager):
+    tasks = [{"id": 1, "model": "qwen2.5:14b"}, {"id": 2, "model": "llama3.1:8b"},
+             {"id": 3, "model": "qwen2.5:14b"}, {"id": 4, "model": "llama3.1:8b"}]
+    assert [t["id"] for t in manager.group_by_model(tasks)] == [2, 4, 1, 3]
+
+def test_state_survives_concurrent_saves(manager, home):
+    threads = [threading.Thread(target=manager.record_use, args=(m, False))
+               for m in MODELS * 20]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    manager.flush()
+    with open(home / "residency.json") as f:
+        state = json.load(f)
+    assert len(state["history"]) == model_residency.RECENT_WINDOW
+    assert not [p for p in home.iterdir() if p.suffix == ".tmp"]
+
+def test_pipeline_orders_ready_tasks_by_residency(manager, monkeypatch):
+    from pipeline import Pipeline, order_by_residency
+    from registry import AGENT_ID_MODELS
+
+    monkeypatch.setattr(model_residency, "_manager", manager)
+    manager.models = list(AGENT_ID_MODELS.values())
+    manager.warm(AGENT_ID_MODELS["ollama-coder"])
+    pipeline = Pipeline.from_dict({"tasks": [
+        {"id": "a", "task": "x", "agent": "ollama-qwen14b"},
+        {"id": "b", "task": "x", "agent": "ollama-coder"},
+        {"id": "c", "task": "x", "agent": "ollama-qwen14b"},
+        {"id": "d", "task": "x", "agent": "ollama-coder"},
+    ]})
+    assert order_by_residency(pipeline, pipeline.order) == ["b", "d", "a", "c"]
+
+def test_record_use_does_not_block_on_ollama(manager, fake_llm, monkeypatch):
+    handler, _ = fake_llm
+    monkeypatch.setattr(handler, "latency", 0.5)
+    manager.transitions = {"llama3.1:8b": {"qwen2.5:14b": 3}}
+    start = time.monotonic()
+    assert manager.record_use("llama3.1:8b") == "qwen2.5:14b"
+    assert time.monotonic() - start < 0.2
+    _wait_warming(manager)
+    manager.flush()
+    with open(manager.state_file) as f:
+        assert json.load(f)["history"] == ["llama3.1:8b"]
@@ -0,0 +1,52 @@
+import threading
+import time
+
+import pytest
+
+import pipeline
+from pipeline import Pipeline, backend_slot, run_pipeline
+
+INFERENCE = 0.1
+
+@pytest.fixture
+def serial_backend(monkeypatch):
+    """Un backend que atiende una inferencia a la vez (Ollama por defecto)"""
+    monkeypatch.setitem(pipeline._slots, "fake", threading.BoundedSemaphore(1))
+
+def _execute(spec, results):
+    with backend_slot("fake"):
+        time.sleep(INFERENCE)
+    return spec.task, "fake"
+
+def _fan_out(n):
+    return Pipeline.from_dict({"tasks": [{"id": f"t{i}", "task": f"t{i}"} for i in range(n)]})
+
+def test_queue_wait_is_not_counted_as_work(serial_backend):
+    result = run_pipeline(_fan_out(3), max_parallel=3, execute=_execute)
+    assert result.ok
+    durations = sorted(r.duration for r in result.runs.values())
+    assert all(d == pytest.approx(INFERENCE, abs=0.05) for d in durations)
+    # Sin paralelismo real en el backend no hay aceleración que reportar
+    assert result.sequential == pytest.approx(3 * INFERENCE, abs=0.1)
+    assert result.sequential / result.wall == pytest.approx(1.0, abs=0.25)
+    waits = sorted(r.queue_wait for r in result.runs.values())
+    assert waits[0] < 0.05 and waits[-1] == pytest.approx(2 * INFERENCE, abs=0.07)
+    assert result.queue_wait == pytest.approx(sum(waits))
+
+def test_runs_without_slot_use_the_whole_call():
+    def execute(spec, results):
+        time.sleep(0.05)
+        return "ok", "x"
+    result = run_pipeline(_fan_out(2), max_parallel=2, execute=execute)
+    assert all(r.queue_wait == 0.0 and r.duration >= 0.05 for r in result.runs.values())
+
+def test_failure_skips_dependents():
+    job = Pipeline.from_dict({"tasks": [
+        {"id": "a", "task": "a"},
+        {"id": "b", "task": "b", "depends": ["a"]},
+    ]})
+    def execute(spec, results):
+        raise RuntimeError("boom")
+    result = run_pipeline(job, execute=execute)
+    assert result.runs["a"].status == "failed" and result.runs["b"].status == "skipped"
+    assert result.critical_path() == ["a"]
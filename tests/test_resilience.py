@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import resilience
+from resilience import (
+    FAILURE_THRESHOLD,
+    MAX_HUNG_CALLS,
+    BackendUnavailable,
+    DeadlineExceeded,
+    ResilienceManager,
+    is_transient,
+)
+
+@pytest.fixture
+def manager(home, monkeypatch):
+    monkeypatch.setattr(resilience, "backoff_delay", lambda attempt: 0)
+    return ResilienceManager(str(home / "resilience.json"))
+
+class HTTPError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+class APIConnectionError(Exception):
+    """Mismo nombre que la de openai/litellm"""
+
+def _failing(error, calls):
+    def fn():
+        calls.append(1)
+        raise error
+    return fn
+
+def test_transient_errors():
+    assert is_transient(TimeoutError())
+    assert is_transient(ConnectionRefusedError())
+    assert is_transient(APIConnectionError())
+    assert is_transient(HTTPError(503))
+    assert is_transient(HTTPError(429))
+    assert not is_transient(HTTPError(400))
+    assert not is_transient(HTTPError(401))
+    assert not is_transient(ValueError("bad request"))
+
+def test_transient_error_is_retried_and_counted(manager):
+    calls = []
+    with pytest.raises(ConnectionError):
+        manager.call("ollama", _failing(ConnectionError("refused"), calls), retries=2)
+    assert len(calls) == 3
+    assert manager.breakers["ollama"].state == "open"
+
+def test_bad_request_is_not_retried_nor_counted(manager):
+    calls = []
+    for _ in range(FAILURE_THRESHOLD + 1):
+        with pytest.raises(HTTPError):
+            manager.call("ollama", _failing(HTTPError(400), calls))
+    assert len(calls) == FAILURE_THRESHOLD + 1
+    assert manager.breakers["ollama"].state == "closed"
+    assert manager.breakers["ollama"].failures == 0
+
+def test_open_breaker_rejects_without_calling(manager):
+    for _ in range(FAILURE_THRESHOLD):
+        manager.record("ollama", "kickoff", ok=False)
+    with pytest.raises(BackendUnavailable):
+        manager.call("ollama", lambda: pytest.fail("no debería llamarse"))
+
+def test_health_probe_closes_half_open_breaker_on_probation(manager):
+    breaker = manager.breakers["ollama"]
+    for _ in range(FAILURE_THRESHOLD):
+        manager.record("ollama", "health", ok=False)
+    breaker.opened_at -= resilience.COOLDOWN_SECONDS
+    assert breaker.state == "half_open"
+
+    manager.record("ollama", "health", ok=True, seconds=0.01, close_breaker=False)
+    assert breaker.state == "closed"
+    manager.record("ollama", "health", ok=False)
+    assert breaker.state == "open"
+
+def test_health_probe_does_not_reset_failures_when_closed(manager):
+    manager.record("ollama", "health", ok=False)
+    manager.record("ollama", "health", ok=True, seconds=0.01, close_breaker=False)
+    assert manager.breakers["ollama"].failures == 1
+
+def test_hung_calls_are_bounded(manager, monkeypatch):
+    monkeypatch.setitem(resilience.DEADLINES, "slow", (0.05, 0.01, 1.0))
+    release = threading.Event()
+    for _ in range(MAX_HUNG_CALLS):
+        with pytest.raises(DeadlineExceeded):
+            manager.call("opencode", release.wait, operation="slow")
+        manager.breakers["opencode"].record_success()   # aislar el límite de colgadas
+    with pytest.raises(BackendUnavailable, match="colgadas"):
+        manager.call("opencode", lambda: "ok", operation="slow")
+
+    release.set()
+    deadline = time.monotonic() + 2
+    while manager.hung["opencode"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert manager.call("opencode", lambda: "ok", operation="slow") == "ok"
+
+def test_state_writes_are_debounced_and_atomic(manager, home):
+    path = home / "resilience.json"
+    manager.record("ollama", "health", ok=True, seconds=0.1, close_breaker=False)
+    first = path.stat().st_mtime_ns
+    for _ in range(20):
+        manager.record("ollama", "health", ok=True, seconds=0.1, close_breaker=False)
+    assert path.stat().st_mtime_ns == first                 # solo latencias: esperan
+
+    for _ in range(FAILURE_THRESHOLD):
+        manager.record("ollama", "kickoff", ok=False)       # abrir el breaker: se escribe ya
+    state = json.loads(path.read_text())
+    assert state["breakers"]["ollama"]["opened_at"] is not None
+
+    manager.flush()
+    assert len(json.loads(path.read_text())["latencies"]["ollama:health"]) == 21
+    assert not [p for p in home.iterdir() if p.suffix == ".tmp"]
+
+def test_state_is_shared_between_processes(manager, home):
+    for _ in range(FAILURE_THRESHOLD):
+        manager.record("lm_studio", "kickoff", ok=False)
+    other = ResilienceManager(str(home / "resilience.json"))
+    assert not other.is_available("lm_studio")
+
+def test_acall_retries_transient_errors(manager):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 2:
+            raise ConnectionError("refused")
+        return "ok"
+
+    assert asyncio.run(manager.acall("ollama", flaky)) == "ok"
+    assert len(calls) == 2
+    assert manager.breakers["ollama"].failures == 0
+
+def test_acall_bad_request_is_not_retried(manager):
+    calls = []
+    with pytest.raises(HTTPError):
+        asyncio.run(manager.acall("ollama", _failing(HTTPError(400), calls)))
+    assert len(calls) == 1
+    assert manager.breakers["ollama"].failures == 0
+
+def test_acall_deadline_frees_the_caller(manager, monkeypatch):
+    monkeypatch.setitem(resilience.DEADLINES, "slow", (0.05, 0.01, 1.0))
+    release = threading.Event()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(manager.acall("opencode", release.wait, operation="slow"))
+    assert manager.hung["opencode"] == 1
+    release.set()
+    deadline = time.monotonic() + 2
+    while manager.hung["opencode"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert manager.hung["opencode"] == 0
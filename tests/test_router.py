@@ -0,0 +1,71 @@
+import json
+
+import router
+from router import HELD_OUT_TASKS, TUNING_TASKS, classify_task, keyword_scores, load_labelled
+
+def test_tuning_set_has_no_regressions():
+    misses = [(t, l, classify_task(t)) for t, l in TUNING_TASKS if classify_task(t) != l]
+    assert misses == []
+
+def test_held_out_set_is_disjoint_from_tuning_set():
+    assert not {t for t, _ in TUNING_TASKS} & {t for t, _ in HELD_OUT_TASKS}
+
+def test_task_without_keywords_falls_back_to_general():
+    assert keyword_scores("Buenos días") == {}
+    assert classify_task("Buenos días") == "general"
+
+def test_ties_prefer_the_more_specific_type():
+    # "error" (code) y "explica" (reasoning): gana code
+    assert classify_task("Explica este error") == "code"
+
+def test_load_labelled_reads_jsonl(tmp_path):
+    path = tmp_path / "labels.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in [
+        {"task": "Corrige el bug", "label": "code"}, {"task": "Hola", "label": "quick"}]) + "\n\n")
+    assert load_labelled(str(path)) == [("Corrige el bug", "code"), ("Hola", "quick")]
+
+def test_keywords_do_not_match_other_words_with_the_same_stem():
+    # Fallos vistos en el conjunto reservado y parecidos: raíces abiertas
+    # ("planifica" → planificación, "prove" → proveedor) o temas, no tareas ("API")
+    cases = [
+        ("Notas de la reunión de planificación", "general"),
+        ("Compara el coste de Ollama local con la API de pago", "reasoning"),
+        ("Busca un proveedor de catering", "general"),
+        ("Lista de testigos del juicio", "general"),
+        ("Horario de las clases de yoga", "general"),
+        ("Presupuesto de la depuradora", "general"),
+        ("Busca un hotel a un precio razonable", "general"),
+        ("Pick a reasonable default", "general"),
+    ]
+    assert [(t, classify_task(t)) for t, _ in cases] == cases
+
+def test_variants_listed_explicitly_still_match():
+    assert classify_task("Depurando los tests de integración") == "code"
+    assert classify_task("ANALIZAR los resultados") == "reasoning"
+    assert classify_task("Respuesta rápida, por favor") == "quick"
+
+def test_prototypes_are_retried_after_ollama_comes_back(monkeypatch):
+    calls = []
+    up = {"ok": False}
+    def fake_embed(text, timeout=2):
+        calls.append(text)
+        return [1.0, 0.0] if up["ok"] else None
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(router, "embed", fake_embed)
+    monkeypatch.setattr(router.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(router, "_prototype_vectors", None)
+    monkeypatch.setattr(router, "_prototype_retry_at", 0.0)
+
+    assert router._get_prototypes() == {}
+    assert len(calls) == 1
+    # Dentro del plazo no se vuelve a llamar a Ollama
+    up["ok"] = True
+    assert router._get_prototypes() == {}
+    assert len(calls) == 1
+
+    clock["now"] += router.PROTOTYPE_RETRY
+    prototypes = router._get_prototypes()
+    assert set(prototypes) == set(router._PROTOTYPE_TYPES)
+    # Con éxito queda en caché
+    router._get_prototypes()
+    assert len(calls) == 1 + len(router._PROTOTYPE_TYPES)
@@ -0,0 +1,100 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+import telemetry
+from telemetry import BUCKETS, Histogram
+
+def _load(monkeypatch, home, sinks):
+    """telemetry.py recién importado con MOLTBOT_TELEMETRY=sinks en un directorio temporal"""
+    monkeypatch.setenv("MOLTBOT_TELEMETRY", sinks)
+    monkeypatch.setenv("MOLTBOT_TELEMETRY_DIR", str(home / "telemetry"))
+    spec = importlib.util.spec_from_file_location("telemetry_enabled", telemetry.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_quantile_interpolates_within_the_bucket():
+    hist = Histogram()
+    assert hist.quantile(0.5) is None
+    for seconds in (0.010, 0.011, 0.012, 0.200):
+        hist.observe(seconds)
+    p50 = hist.quantile(0.5)
+    i = next(i for i, bound in enumerate(BUCKETS) if bound >= 0.010)
+    assert BUCKETS[i - 1] <= p50 <= BUCKETS[i]
+    assert 0.1 < hist.quantile(0.99) <= 0.3
+    assert hist.count == 4 and hist.total == pytest.approx(0.233)
+
+def test_overflow_bucket_reports_the_last_bound():
+    hist = Histogram()
+    hist.observe(BUCKETS[-1] * 10)
+    assert hist.counts[-1] == 1
+    assert hist.quantile(0.5) == BUCKETS[-1]
+
+def test_merge_adds_counts_and_totals():
+    a, b = Histogram(), Histogram()
+    a.observe(0.01)
+    b.observe(0.01)
+    b.observe(1.0)
+    a.merge(b)
+    assert a.count == 3 and a.total == pytest.approx(1.02)
+    assert a.to_dict()["counts"] == [x + y for x, y in zip(Histogram().counts, a.counts)]
+
+def test_disabled_mode_is_a_no_op(home):
+    assert not telemetry.ENABLED
+    assert telemetry.timer("x") is telemetry.timer("y")
+
+    def fn():
+        return 1
+    assert telemetry.timed("x")(fn) is fn
+
+    with telemetry.timer("memory.search"):
+        pass
+    telemetry.count("results.hit")
+    telemetry.flush()
+    assert telemetry._telemetry.histograms == {} and telemetry._telemetry.counters == {}
+
+def test_flush_accumulates_across_processes_and_renders_prometheus(monkeypatch, home):
+    tel = _load(monkeypatch, home, "jsonl,prom")
+    for _ in range(3):
+        with tel.timer("memory.search"):
+            pass
+    with pytest.raises(ValueError):
+        with tel.timer("memory.search"):
+            raise ValueError("roto")
+    tel.count("results.hit", 2)
+    tel.flush()
+
+    # Otro "proceso" vuelca encima
+    other = _load(monkeypatch, home, "jsonl,prom")
+    with other.timer("memory.search"):
+        pass
+    other.flush()
+
+    state = other.load_state()
+    assert state["histograms"]["memory.search"].count == 5
+    assert state["counters"] == {"results.hit": 2, "memory.search.errors": 1}
+
+    prom = (home / "telemetry" / "metrics.prom").read_text()
+    assert "# TYPE moltbot_memory_search_seconds histogram" in prom
+    assert 'moltbot_memory_search_seconds_bucket{le="+Inf"} 5' in prom
+    assert "moltbot_memory_search_seconds_count 5" in prom
+    assert "moltbot_results_hit_total 2" in prom
+    buckets = [int(line.rsplit(" ", 1)[1]) for line in prom.splitlines()
+               if line.startswith("moltbot_memory_search_seconds_bucket")]
+    assert buckets == sorted(buckets)   # acumulativos
+
+    events = (home / "telemetry" / "events.jsonl").read_text().splitlines()
+    assert len(events) == 5 and json.loads(events[0])["stage"] == "memory.search"
+    assert not [p for p in os.listdir(home / "telemetry") if p.endswith(".tmp")]
+
+def test_summary_includes_pending_measurements(monkeypatch, home):
+    tel = _load(monkeypatch, home, "jsonl")
+    tel.observe("agent.kickoff", 0.5)
+    stages = tel.summary()
+    assert stages["agent.kickoff"]["count"] == 1
+    assert 0.3 < stages["agent.kickoff"]["p50"] <= 0.7   # dentro del bucket de 0.5 s
+    assert not (home / "telemetry" / "metrics.prom").exists()
+    tel._telemetry._take()   # nada pendiente para el volcado de atexit
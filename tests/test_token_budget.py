@@ -0,0 +1,42 @@
+from token_budget import (
+    SUMMARY_TOKENS,
+    _synthetic_memories,
+    estimate_tokens,
+    get_prompt_budget,
+    pack_prompt,
+)
+
+TASK = "Resume el estado del tablero y propone las tareas de la semana."
+OLLAMA = "llama3.1:8b-instruct-q4_K_M"
+
+def test_everything_fits_without_summary():
+    memories = _synthetic_memories(3, 10)
+    packed = pack_prompt(TASK, memories, OLLAMA)
+    assert packed.included == 3
+    assert packed.summarized == packed.truncated == packed.dropped == 0
+    assert packed.text.endswith(TASK)
+
+def test_long_memories_are_summarized_not_dropped():
+    memories = _synthetic_memories(8, 300)
+    packed = pack_prompt(TASK, memories, OLLAMA)
+    assert packed.summarized > 0
+    assert packed.included + packed.summarized + packed.dropped == 8
+    assert "memorias resumidas" in packed.text
+    assert packed.memory_tokens <= 1024
+
+def test_summary_reserve_is_bounded_by_budget():
+    memories = _synthetic_memories(40, 60)
+    packed = pack_prompt(TASK, memories, OLLAMA, memory_budget=200)
+    assert packed.memory_tokens <= 200
+    assert packed.summarized > 0
+    assert SUMMARY_TOKENS > 200 // 4   # la reserva queda acotada a 1/4
+
+def test_prompt_never_exceeds_model_budget():
+    huge_task = "palabra " * 20000
+    packed = pack_prompt(huge_task, _synthetic_memories(20, 100), OLLAMA)
+    assert packed.tokens <= get_prompt_budget(OLLAMA)
+    assert "tarea truncada" in packed.notes
+
+def test_estimate_depends_on_tokenizer_family():
+    text = "x" * 350
+    assert estimate_tokens(text, "qwen2.5:14b") > estimate_tokens(text, "llama3.1:8b")
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import usage
+from usage import EWMA_ALPHA, MIN_SAMPLES, UsageTracker
+
+CODER = "qwen2.5-coder:7b-instruct-q4_K_M"
+LLAMA = "llama3.1:8b-instruct-q4_K_M"
+MINIMAX = "minimax/minimax-m2.1-free"
+
+@pytest.fixture
+def tracker(home):
+    return UsageTracker(str(home / "usage"))
+
+def test_latency_is_an_ewma_trusted_after_min_samples(tracker):
+    tracker.record(LLAMA, "code", 100, 50, 10.0)
+    tracker.record(LLAMA, "code", 100, 50, 20.0)
+    assert MIN_SAMPLES == 3 and tracker.expected_latency(LLAMA, "code") is None
+
+    tracker.record(LLAMA, "code", 100, 50, 20.0)
+    first = 10.0 + EWMA_ALPHA * (20.0 - 10.0)
+    assert tracker.expected_latency(LLAMA, "code") == pytest.approx(first + EWMA_ALPHA * (20.0 - first))
+    # Otro tipo sin muestras: latencia en caliente del modelo
+    assert tracker.expected_latency(LLAMA, "quick") == tracker.summary[LLAMA]["warm_s"]
+
+def test_errors_and_cold_calls_stay_out_of_the_latency(tracker):
+    for _ in range(MIN_SAMPLES):
+        tracker.record(LLAMA, "code", 100, 50, 2.0)
+    tracker.record(LLAMA, "code", 100, 0, 60.0, ok=False)
+    tracker.record(LLAMA, "code", 100, 50, 12.0, cold=True)
+
+    stats = tracker.summary[LLAMA]["types"]["code"]
+    assert stats["errors"] == 1 and stats["n"] == MIN_SAMPLES + 1
+    assert tracker.expected_latency(LLAMA, "code") == pytest.approx(2.0)
+    # Descargado: se suma lo que cuesta cargarlo
+    assert tracker.expected_latency(LLAMA, "code", loaded=False) == pytest.approx(12.0)
+
+def test_other_processes_see_the_summary(tracker, home):
+    for _ in range(MIN_SAMPLES):
+        tracker.record(CODER, "code", 10, 10, 1.0)
+    assert UsageTracker(str(home / "usage")).expected_latency(CODER, "code") == pytest.approx(1.0)
+
+def test_log_is_trimmed_to_its_most_recent_half(tracker, monkeypatch):
+    monkeypatch.setattr(usage, "MAX_LOG_BYTES", 2000)
+    for i in range(100):
+        tracker.record(LLAMA, "code", i, i, 1.0)
+
+    with open(tracker.log_file, 'rb') as f:
+        raw = f.read()
+    assert len(raw) <= 2000
+    lines = [json.loads(line) for line in raw.splitlines()]   # ninguna línea cortada
+    assert lines[-1]["in"] == 99
+    assert [r["in"] for r in lines] == list(range(lines[0]["in"], 100))
+    # El resumen no se recorta con el log
+    assert tracker.summary[LLAMA]["types"]["code"]["n"] == 100
+
+# ── Ruteo por latencia (agents.py, necesita crewai) ────────────
+
+class _Residency:
+    def __init__(self, loaded):
+        self.loaded = set(loaded)
+
+    def loaded_models(self):
+        return self.loaded
+
+    def record_use(self, model):
+        pass
+
+@pytest.fixture
+def agents(tracker, monkeypatch):
+    pytest.importorskip("crewai")
+    import agents
+    monkeypatch.setattr(agents, "check_services",
+                        lambda: {"opencode": True, "ollama": True, "lm_studio": False})
+    monkeypatch.setattr(agents, "get_usage_tracker", lambda: tracker)
+    monkeypatch.setattr(agents, "EXPLORE_RATE", 0)
+    # El modelo elegido, sin construir el Agent de CrewAI
+    monkeypatch.setattr(agents, "create_ollama_agent", lambda model: model)
+    monkeypatch.setattr(agents, "create_minimax_agent", lambda: MINIMAX)
+    return agents
+
+def _observe(tracker, model, seconds, cold=False):
+    for _ in range(MIN_SAMPLES):
+        tracker.record(model, "code", 100, 50, seconds, cold=cold)
+
+def test_latency_routing_picks_the_observed_fastest(agents, tracker, monkeypatch):
+    # Con prioridades fijas saldría MiniMax (cloud primero)
+    monkeypatch.setattr(agents, "get_residency_manager", lambda: _Residency([CODER, LLAMA]))
+    _observe(tracker, MINIMAX, 5.0)
+    _observe(tracker, LLAMA, 3.0)
+    _observe(tracker, CODER, 1.0)
+    assert agents.get_best_agent_for_task("Corrige el bug del parser", mode="latency") == CODER
+    assert agents.get_best_agent_for_task("Corrige el bug del parser", mode="static") == MINIMAX
+
+def test_latency_routing_counts_the_load_of_an_unloaded_model(agents, tracker, monkeypatch):
+    monkeypatch.setattr(agents, "get_residency_manager", lambda: _Residency([LLAMA]))
+    _observe(tracker, LLAMA, 3.0)
+    _observe(tracker, CODER, 1.0)
+    _observe(tracker, CODER, 20.0, cold=True)
+    assert agents.get_best_agent_for_task("Corrige el bug del parser", mode="latency") == LLAMA
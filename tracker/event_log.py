@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+🗒️ Event Log - Registro de tareas del agente
+Log append-only particionado por día, reemplaza a active_tasks.log/tracking.log.
+
+Estructura (~/.fizzy/events):
+    2026-10-19.jsonl   → eventos del día ({"ts", "type", "id", "title", ...})
+    index.json         → índice temporal: día → nº de eventos, primer/último ts
+    active.json        → tareas en curso (id → título, inicio)
+
+Los reportes leen solo las particiones del rango pedido.
+Escritores serializados con lock (events.lock); los lectores no lo toman.
+
+Uso:
+    python3 event_log.py start ID "título"
+    python3 event_log.py complete [--id ID] ["título"] [segundos]
+    python3 event_log.py report daily|weekly
+    python3 event_log.py generate            → Reporte diario (markdown)
+    python3 event_log.py cron                → Resumen en una línea
+    python3 event_log.py migrate [log]       → Importar active_tasks.log (queda como .migrated)
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from locking import atomic_write_json, file_lock
+from rollups import Rollups, fizzy_rollups_path
+
+EVENTS_DIR = os.environ.get("FIZZY_EVENTS_DIR") or os.path.expanduser("~/.fizzy/events")
+LEGACY_LOG = os.path.expanduser("~/.fizzy/active_tasks.log")
+
+def day_of(ts: float) -> str:
+    """Partición (fecha local) de un timestamp"""
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+
+def day_start(day: date) -> float:
+    return datetime(day.year, day.month, day.day).timestamp()
+
+# ═══════════════════════════════════════════════════════════════
+#  LOG DE EVENTOS
+# ═══════════════════════════════════════════════════════════════
+
+class EventLog:
+    """Log de eventos particionado por día con índice temporal"""
+
+    def __init__(self, base_dir: str = EVENTS_DIR, track_rollups: bool = True):
+        self.base_dir = base_dir
+        self.index_file = os.path.join(base_dir, "index.json")
+        self.active_file = os.path.join(base_dir, "active.json")
+        self.lock_file = os.path.join(base_dir, "events.lock")
+        # flock serializa procesos; el RLock, los hilos de este proceso
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        os.makedirs(base_dir, exist_ok=True)
+        self.rollups = Rollups(fizzy_rollups_path(base_dir)) if track_rollups else None
+        if self.rollups is not None and not os.path.exists(self.rollups.path):
+            with self._locked():
+                # Otro proceso pudo construirlos mientras esperábamos el lock
+                if not os.path.exists(self.rollups.path):
+                    self.rebuild_rollups()
+
+    # ── Archivos auxiliares ────────────────────────────────────
+
+    def _read_json(self, path: str, default):
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _write_json(self, path: str, data):
+        atomic_write_json(path, data)
+
+    @contextmanager
+    def _locked(self):
+        """Lock de escritura (reentrante en el mismo hilo; los demás hilos esperan)"""
+        with self._thread_lock:
+            # Solo el hilo dueño del RLock llega aquí: la profundidad es suya
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            with file_lock(self.lock_file):
+                self._lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth = 0
+
+    def partition_path(self, day: str) -> str:
+        return os.path.join(self.base_dir, f"{day}.jsonl")
+
+    def load_index(self) -> Dict[str, Dict]:
+        return self._read_json(self.index_file, {"days": {}})["days"]
+
+    def load_active(self) -> Dict[str, Dict]:
+        return self._read_json(self.active_file, {})
+
+    # ── Escritura ──────────────────────────────────────────────
+
+    def append(self, event: Dict) -> Dict:
+        """Añadir evento a la partición de su día y actualizar el índice"""
+        day = day_of(event["ts"])
+        with self._locked():
+            with open(self.partition_path(day), 'a') as f:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+            index = self._read_json(self.index_file, {"days": {}})
+            entry = index["days"].setdefault(day, {"events": 0, "first": event["ts"], "last": event["ts"]})
+            entry["events"] += 1
+            entry["first"] = min(entry["first"], event["ts"])
+            entry["last"] = max(entry["last"], event["ts"])
+            self._write_json(self.index_file, index)
+        return event
+
+    def task_started(self, card_id: str, title: str, ts: Optional[float] = None) -> Dict:
+        """Registrar inicio de tarea"""
+        ts = int(ts if ts is not None else time.time())
+        with self._locked():
+            event = self.append({"ts": ts, "type": "started", "id": str(card_id), "title": title})
+
+            active = self.load_active()
+            active[str(card_id)] = {"title": title, "started": ts}
+            self._write_json(self.active_file, active)
+        return event
+
+    def find_active(self, card_id: Optional[str] = None, title: Optional[str] = None) -> Optional[str]:
+        """ID de una tarea en curso (por ID o por título exacto, la más reciente)"""
+        active = self.load_active()
+        if card_id:
+            return str(card_id) if str(card_id) in active else None
+        matches = [(info["started"], cid) for cid, info in active.items() if info["title"] == title]
+        return max(matches)[1] if matches else None
+
+    def task_completed(self, card_id: Optional[str] = None, title: Optional[str] = None,
+                       ts: Optional[float] = None, duration: Optional[int] = None) -> Optional[Dict]:
+        """Registrar fin de tarea; None si no hay tarea activa que coincida"""
+        with self._locked():
+            found = self.find_active(card_id, title)
+            if found is None:
+                return None
+
+            active = self.load_active()
+            info = active.pop(found)
+            ts = int(ts if ts is not None else time.time())
+            if duration is None:
+                duration = max(ts - info["started"], 0)
+
+            event = self.append({
+                "ts": ts,
+                "type": "completed",
+                "id": found,
+                "title": info["title"],
+                "started": info["started"],
+                "duration": int(duration),
+            })
+            self._write_json(self.active_file, active)
+
+            if self.rollups is not None:
+                # Releer: otro proceso pudo sumar completadas desde que se cargó
+                self.rollups = Rollups(self.rollups.path)
+                self.rollups.record_completion(
+                    datetime.fromtimestamp(ts).date(), event["duration"], found, info["title"]
+                )
+                self.rollups.save()
+        return event
+
+    def rebuild_rollups(self) -> Rollups:
+        """Recalcular rollups desde todas las particiones (bajo el lock de escritura)"""
+        with self._locked():
+            if self.rollups is None:
+                self.rollups = Rollups(fizzy_rollups_path(self.base_dir))
+            self.rollups.clear()
+            index = self.load_index()
+            if index:
+                days = sorted(index)
+                start = datetime.strptime(days[0], "%Y-%m-%d").timestamp()
+                end = (datetime.strptime(days[-1], "%Y-%m-%d") + timedelta(days=1)).timestamp()
+                for event in self.completed_between(start, end):
+                    self.rollups.record_completion(
+                        datetime.fromtimestamp(event["ts"]).date(),
+                        event.get("duration", 0), event["id"], event["title"],
+                    )
+            self.rollups.save()
+        return self.rollups
+
+    # ── Lectura ────────────────────────────────────────────────
+
+    def read_range(self, start_ts: float, end_ts: float) -> Iterator[Dict]:
+        """Eventos en [start_ts, end_ts) leyendo solo las particiones del rango"""
+        index = self.load_index()
+        day = datetime.fromtimestamp(start_ts).date()
+        last_day = datetime.fromtimestamp(max(end_ts - 1, start_ts)).date()
+        for offset in range((last_day - day).days + 1):
+            key = (day + timedelta(days=offset)).strftime("%Y-%m-%d")
+            entry = index.get(key)
+            if entry is None or entry["last"] < start_ts or entry["first"] >= end_ts:
+                continue
+            path = self.partition_path(key)
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    if start_ts <= event["ts"] < end_ts:
+                        yield event
+
+    def completed_between(self, start_ts: float, end_ts: float) -> List[Dict]:
+        return [e for e in self.read_range(start_ts, end_ts) if e["type"] == "completed"]
+
+    def summary(self, days: int = 1, today: Optional[date] = None) -> Dict:
+        """Completadas en los últimos `days` días (incluye hoy) y tareas en curso
+
+        Con rollups cuesta O(días); sin ellos lee las particiones del rango.
+        """
+        today = today or date.today()
+        first_day = today - timedelta(days=days - 1)
+        if self.rollups is not None:
+            totals = self.rollups.range(first_day, today)
+            completed = [
+                {"id": task[0], "title": task[1], "duration": task[2] if len(task) > 2 else 0}
+                for task in totals["tasks"]
+            ]
+            total_time = totals["duration"]
+        else:
+            events = self.completed_between(day_start(first_day), day_start(today + timedelta(days=1)))
+            completed = [
+                {"id": e["id"], "title": e["title"], "duration": e.get("duration", 0)}
+                for e in events
+            ]
+            total_time = sum(e.get("duration", 0) for e in events)
+        active = self.load_active()
+        return {
+            "completed": completed,
+            "total_time": total_time,
+            "in_progress": sorted(active.values(), key=lambda a: a["started"]),
+        }
+
+    # ── Migración ──────────────────────────────────────────────
+
+    def migrate_legacy(self, path: str = LEGACY_LOG) -> int:
+        """Importar active_tasks.log ("ID título (done: ts)")
+
+        Al terminar el log se renombra a `.migrated`: una segunda ejecución no
+        encuentra nada que importar y no duplica eventos.
+        """
+        imported = 0
+        with self._locked():
+            if not os.path.exists(path):
+                return 0
+            mtime = int(os.path.getmtime(path))
+            with open(path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    card_id, _, rest = line.partition(" ")
+                    title = re.sub(r"\s*\(.*$", "", rest) or card_id
+                    done = re.search(r"done: (\d+)", rest)
+                    started = re.search(r"started (\d+)", rest)
+                    start_ts = int(started.group(1)) if started else (int(done.group(1)) if done else mtime)
+                    self.task_started(card_id, title, ts=start_ts)
+                    if done:
+                        self.task_completed(card_id=card_id, ts=int(done.group(1)))
+                    imported += 1
+            done_path = f"{path}.migrated"
+            if os.path.exists(done_path):
+                done_path = f"{done_path}.{int(time.time())}"
+            os.replace(path, done_path)
+        return imported
+
+# ═══════════════════════════════════════════════════════════════
+#  REPORTES
+# ═══════════════════════════════════════════════════════════════
+
+def _format_duration(seconds: int) -> str:
+    mins = seconds // 60
+    hours, mins = divmod(mins, 60)
+    return f"{hours}h {mins}m" if hours else f"{mins}m"
+
+def print_report(log: EventLog, period: str = "daily"):
+    """Reporte diario o semanal en consola"""
+    days = 7 if period == "weekly" else 1
+    s = log.summary(days)
+
+    if period == "weekly":
+        print("📊 Reporte Semanal")
+        print("=====================")
+        print(f"\n✅ Tareas completadas: {len(s['completed'])}")
+        print(f"⏱️  Tiempo total: {_format_duration(s['total_time'])}")
+        return
+
+    print("📊 Reporte Diario de Actividades")
+    print("================================")
+    print("\n✅ Completadas hoy:")
+    for e in s["completed"]:
+        print(f"   - {e['title']} ({e.get('duration', 0) // 60} min)")
+    print("\n⏳ En progreso:")
+    for task in s["in_progress"]:
+        print(f"   - {task['title']}")
+
+def generate_report(log: EventLog) -> str:
+    """Reporte diario en markdown (para enviar al canal)"""
+    s = log.summary(1)
+    line = "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+    total_mins = s["total_time"] // 60
+    hours, mins = divmod(total_mins, 60)
+
+    parts = [
+        f"📊 **Reporte Diario de Actividades - {date.today().strftime('%d/%m/%Y')}**",
+        line,
+        "",
+    ]
+    completed_line = f"✅ **Completadas hoy:** {len(s['completed'])}"
+    if hours or mins:
+        completed_line += f" ({hours} h {mins} m)"
+    parts += [completed_line, "", f"⏳ **En progreso:** {len(s['in_progress'])}", "", line, ""]
+
+    parts.append("**Últimas completadas:**")
+    if s["completed"]:
+        parts += [f"• {e['title']}" for e in s["completed"]]
+    else:
+        parts.append("_(sin tareas completadas)_")
+
+    parts += ["", "**Ahora:**"]
+    if s["in_progress"]:
+        parts += [f"• 🔄 {t['title']}" for t in s["in_progress"]]
+    else:
+        parts.append("_(sin tareas activas)_")
+
+    parts += ["", line, "_Generado automáticamente por Fizzy Tracker_"]
+    return "\n".join(parts)
+
+def cron_line(log: EventLog) -> str:
+    s = log.summary(1)
+    return f"REPORT COMPLETED={len(s['completed'])} IN_PROGRESS={len(s['in_progress'])}"
+
+# ═══════════════════════════════════════════════════════════════
+#  CLI
+# ═══════════════════════════════════════════════════════════════
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return 0
+
+    log = EventLog()
+    command, args = argv[0], argv[1:]
+
+    if command == "start":
+        if len(args) < 2:
+            print("❌ Uso: start ID \"título\"")
+            return 1
+        log.task_started(args[0], args[1])
+        return 0
+
+    if command == "complete":
+        card_id = None
+        if args[:1] == ["--id"] and len(args) > 1:
+            card_id, args = args[1], args[2:]
+        title = args[0] if args else None
+        duration = int(args[1]) if len(args) > 1 and args[1] else None
+        event = log.task_completed(card_id=card_id, title=title, duration=duration)
+        if event is None:
+            return 1
+        # Salida: "ID duración" para que el hook mueva la tarjeta
+        print(f"{event['id']} {event['duration']}")
+        return 0
+
+    if command == "report":
+        print_report(log, args[0] if args else "daily")
+        return 0
+
+    if command == "generate":
+        print(generate_report(log))
+        return 0
+
+    if command == "cron":
+        print(cron_line(log))
+        return 0
+
+    if command == "migrate":
+        count = log.migrate_legacy(args[0] if args else LEGACY_LOG)
+        print(f"✅ {count} tareas importadas")
+        return 0
+
+    print(f"❌ Comando desconocido: {command}")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,114 +12,8 @@ source "$(dirname "$0")/fizzy-tracker.sh"
 # ═══════════════════════════════════════════════════════════════
 
 generate_report() {
-    local report=""
-    local date_formatted=$(date "+%d/%m/%Y")
-    
-    report="📊 **Reporte Diario de Actividades - $date_formatted**"
-    report="$report"$'\n'"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-    report="$report"$'\n\n'
-    
-    # Contar tareas completadas hoy
-    local today=$(date +%s)
-    local today_start=$((today - $(date +%H) * 3600 - $(date +%M) * 60 - $(date +%S)))
-    
-    local completed_count=0
-    local in_progress_count=0
-    local total_time=0
-    
-    if [ -f ~/.fizzy/active_tasks.log ]; then
-        # Tareas completadas hoy
-        while IFS= read -r line; do
-            if echo "$line" | grep -q "done:"; then
-                local done_time=$(echo "$line" | grep -oE "done: [0-9]+" | grep -oE "[0-9]+")
-                if [ -n "$done_time" ] && [ $done_time -ge $today_start ]; then
-                    completed_count=$((completed_count + 1))
-                    
-                    # Calcular tiempo (si hay started time)
-                    local started_time=$(echo "$line" | grep -oE "started [0-9]+" | grep -oE "[0-9]+" | head -1)
-                    if [ -n "$started_time" ]; then
-                        local duration=$((done_time - started_time))
-                        total_time=$((total_time + duration))
-                    fi
-                fi
-            fi
-        done < ~/.fizzy/active_tasks.log
-        
-        # Tareas en progreso
-        while IFS= read -r line; do
-            if ! echo "$line" | grep -q "done:"; then
-                local task_title=$(echo "$line" | sed 's/^[0-9]* //' | sed 's/ (.*//')
-                in_progress_count=$((in_progress_count + 1))
-            fi
-        done < ~/.fizzy/active_tasks.log
-    fi
-    
-    # Formatear tiempo total
-    local total_mins=$((total_time / 60))
-    local hours=$((total_mins / 60))
-    local mins=$((total_mins % 60))
-    
-    # Construir reporte
-    report="$report✅ **Completadas hoy:** $completed_count"
-    
-    if [ $hours -gt 0 ] || [ $mins -gt 0 ]; then
-        report="$report ($hours h $mins m)"
-    fi
-    report="$report"$'\n'
-    report="$report"$'\n'
-    report="$report"⏳ **En progreso:** $in_progress_count"$'\n'
-    report="$report"$'\n'
-    report="$report"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"$'\n'
-    
-    # Lista de tareas completadas
-    report="$report"$'\n'**Últimas completadas:**'$'\n'
-    
-    if [ -f ~/.fizzy/active_tasks.log ]; then
-        local found=false
-        while IFS= read -r line; do
-            if echo "$line" | grep -q "done:"; then
-                local done_time=$(echo "$line" | grep -oE "done: [0-9]+" | grep -oE "[0-9]+")
-                if [ -n "$done_time" ] && [ $done_time -ge $today_start ]; then
-                    local task_title=$(echo "$line" | sed 's/^[0-9]* //' | sed 's/ (.*//')
-                    report="$report"• "$task_title"$'\n'
-                    found=true
-                fi
-            fi
-        done < ~/.fizzy/active_tasks.log
-        
-        if [ "$found" = false ]; then
-            report="$report"_(sin tareas completadas)_$'\n'
-        fi
-    else
-        report="$report"_(sin datos de tracking)_$'\n'
-    fi
-    
-    # Tareas en progreso
-    report="$report"$'\n'**Ahora:**'$'\n'
-    
-    if [ -f ~/.fizzy/active_tasks.log ]; then
-        local found=false
-        while IFS= read -r line; do
-            if ! echo "$line" | grep -q "done:"; then
-                local task_title=$(echo "$line" | sed 's/^[0-9]* //' | sed 's/ (.*//')
-                report="$report"• 🔄 "$task_title"$'\n'
-                found=true
-            fi
-        done < ~/.fizzy/active_tasks.log
-        
-        if [ "$found" = false ]; then
-            report="$report"_(sin tareas activas)_$'\n'
-        fi
-    else
-        report="$report"_(sin datos de tracking)_$'\n'
-    fi
-    
-    # Footer
-    report="$report"$'\n'
-    report="$report"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"$'\n'
-    report="$report"_Generado automáticamente por Fizzy Tracker_$'\n'
-    
-    echo "$report"
+    # Un solo proceso; los totales salen de los rollups diarios, no del log
+    python3 "$FIZZY_EVENTS_PY" generate
 }
 
 # ═══════════════════════════════════════════════════════════════
@@ -145,26 +39,7 @@ send_report() {
 # ═══════════════════════════════════════════════════════════════
 
 cron_mode() {
-    local today=$(date +%s)
-    local today_start=$((today - $(date +%H) * 3600 - $(date +%M) * 60 - $(date +%S)))
-    
-    local completed_count=0
-    local in_progress_count=0
-    
-    if [ -f ~/.fizzy/active_tasks.log ]; then
-        while IFS= read -r line; do
-            if echo "$line" | grep -q "done:"; then
-                local done_time=$(echo "$line" | grep -oE "done: [0-9]+" | grep -oE "[0-9]+")
-                if [ -n "$done_time" ] && [ $done_time -ge $today_start ]; then
-                    completed_count=$((completed_count + 1))
-                fi
-            else
-                in_progress_count=$((in_progress_count + 1))
-            fi
-        done < ~/.fizzy/active_tasks.log
-    fi
-    
-    echo "REPORT COMPLETED=$completed_count IN_PROGRESS=$in_progress_count"
+    python3 "$FIZZY_EVENTS_PY" cron
 }
 
 # ═══════════════════════════════════════════════════════════════
@@ -8,6 +8,20 @@ FIZZY_URL="${FIZZY_URL:-http://localhost:3000}"
 FIZZY_API_TOKEN="${FIZZY_API_TOKEN:-}"
 BOARD_ID="${FIZZY_BOARD_ID:-1}"
 
+# Log de eventos de tareas (particionado por día en ~/.fizzy/events)
+FIZZY_EVENTS_PY="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/event_log.py"
+
+# Cola local de operaciones de tarjetas (sincronización en segundo plano)
+FIZZY_OUTBOX_PY="$(dirname "$FIZZY_EVENTS_PY")/fizzy_outbox.py"
+FIZZY_COLUMN_PROGRESS="${FIZZY_COLUMN_PROGRESS:-2}"
+FIZZY_COLUMN_DONE="${FIZZY_COLUMN_DONE:-3}"
+
+fizzy_outbox() {
+    FIZZY_URL="$FIZZY_URL" FIZZY_API_TOKEN="$FIZZY_API_TOKEN" FIZZY_BOARD_ID="$BOARD_ID" \
+    FIZZY_COLUMN_DONE="$FIZZY_COLUMN_DONE" \
+        python3 "$FIZZY_OUTBOX_PY" "$@"
+}
+
 # Colores
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -142,7 +156,7 @@ fizzy_list() {
 #  REGISTRO DE TIEMPO
 # ═══════════════════════════════════════════════════════════════
 
-# Iniciar tarea (crear + mover a "en progreso")
+# Iniciar tarea (crear directamente en "en progreso", vía la cola local)
 # Uso: fizzy_start "Título" [descripción]
 fizzy_start() {
     check_config || return 1
@@ -150,17 +164,11 @@ fizzy_start() {
     local title="$1"
     local description="${2:-}"
     
-    # Crear en backlog primero
-    local card_id=$(fizzy_create "$title" "$description" --column 1)
+    local card_id=$(fizzy_outbox create "$title" "$description" "$FIZZY_COLUMN_PROGRESS")
     
     if [ -n "$card_id" ]; then
-        # Mover a "en progreso"
-        fizzy_move "$card_id" "progress" || \
-        fizzy_move "$card_id" "doing" || \
-        fizzy_move "$card_id" "in-progress"
-        
-        # Registrar inicio en archivo de tracking
-        echo "$(date +%s)|$card_id|$title|started" >> ~/.fizzy/tracking.log
+        # Registrar inicio en el log de eventos
+        python3 "$FIZZY_EVENTS_PY" start "$card_id" "$title"
         
         echo -e "${GREEN}🚀 Tarea iniciada: $title${NC}"
     fi
@@ -170,97 +178,40 @@ fizzy_start() {
 # Uso: fizzy_finish card_id
 fizzy_finish() {
     local card_id="$1"
+    local finished
     
-    # Buscar inicio en tracking.log
-    if [ -f ~/.fizzy/tracking.log ]; then
-        local start_line=$(grep "|$card_id|" ~/.fizzy/tracking.log | tail -1)
-        if [ -n "$start_line" ]; then
-            local start_time=$(echo "$start_line" | cut -d'|' -f1)
-            local end_time=$(date +%s)
-            local duration=$((end_time - start_time))
-            
-            # Formatear duración
-            local mins=$((duration / 60))
-            local hours=$((mins / 60))
-            local mins_rem=$((mins % 60))
-            
-            if [ $hours -gt 0 ]; then
-                echo -e "${YELLOW}⏱️  Tiempo: ${hours}h ${mins_rem}m${NC}"
-            else
-                echo -e "${YELLOW}⏱️  Tiempo: ${mins}m${NC}"
-            fi
-            
-            # Marcar como completada
-            fizzy_done "$card_id"
-            
-            # Actualizar tracking.log
-            sed -i "s/$start_line/$start_line|finished|${duration}s/" ~/.fizzy/tracking.log
+    # Cerrar la tarea en el log de eventos (calcula la duración)
+    finished=$(python3 "$FIZZY_EVENTS_PY" complete --id "$card_id")
+    if [ -n "$finished" ]; then
+        local duration=${finished##* }
+        local mins=$((duration / 60))
+        local hours=$((mins / 60))
+        local mins_rem=$((mins % 60))
+        
+        if [ $hours -gt 0 ]; then
+            echo -e "${YELLOW}⏱️  Tiempo: ${hours}h ${mins_rem}m${NC}"
         else
-            fizzy_done "$card_id"
+            echo -e "${YELLOW}⏱️  Tiempo: ${mins}m${NC}"
         fi
-    else
-        fizzy_done "$card_id"
     fi
+    
+    # Clave local o ID remoto: el syncer resuelve y fusiona
+    fizzy_outbox move "$card_id" "$FIZZY_COLUMN_DONE"
+    echo -e "${GREEN}✅ Tarjeta $card_id marcada como completada${NC}"
 }
 
 # ═══════════════════════════════════════════════════════════════
 #  REPORTES
 # ═══════════════════════════════════════════════════════════════
 
-# Reporte diario
+# Reporte diario (lee solo la partición de hoy)
 fizzy_report_daily() {
-    echo -e "${BLUE}📊 Reporte Diario de Actividades${NC}"
-    echo "================================"
-    
-    if [ -f ~/.fizzy/tracking.log ]; then
-        local today=$(date +%s | cut -c1-10)
-        local yesterday=$(($today - 86400))
-        
-        echo ""
-        echo -e "${GREEN}✅ Completadas hoy:${NC}"
-        grep "|$today|finished" ~/.fizzy/tracking.log | while read line; do
-            local title=$(echo "$line" | cut -d'|' -f3)
-            local duration=$(echo "$line" | cut -d'|' -f5 | tr -d 's')
-            local mins=$((duration / 60))
-            echo "   - $title ($mins min)"
-        done
-        
-        echo ""
-        echo -e "${YELLOW}⏳ En progreso:${NC}"
-        grep "|$today|started" ~/.fizzy/tracking.log | grep -v "finished" | while read line; do
-            local title=$(echo "$line" | cut -d'|' -f3)
-            echo "   - $title"
-        done
-    else
-        echo "No hay datos de tracking aún."
-    fi
+    python3 "$FIZZY_EVENTS_PY" report daily
 }
 
-# Reporte semanal
+# Reporte semanal (lee solo las particiones de los últimos 7 días)
 fizzy_report_weekly() {
-    echo -e "${BLUE}📊 Reporte Semanal${NC}"
-    echo "====================="
-    
-    if [ -f ~/.fizzy/tracking.log ]; then
-        local week_ago=$(($(date +%s) - 604800))
-        
-        local total_mins=0
-        local tasks_done=0
-        
-        grep "|$week_ago|finished" ~/.fizzy/tracking.log | while read line; do
-            local title=$(echo "$line" | cut -d'|' -f3)
-            local duration=$(echo "$line" | cut -d'|' -f5 | tr -d 's')
-            total_mins=$((total_mins + duration / 60))
-            tasks_done=$((tasks_done + 1))
-        done
-        
-        local hours=$((total_mins / 60))
-        local mins_rem=$((total_mins % 60))
-        
-        echo ""
-        echo -e "${GREEN}✅ Tareas completadas: $tasks_done${NC}"
-        echo -e "${YELLOW}⏱️  Tiempo total: ${hours}h ${mins_rem}m${NC}"
-    fi
+    python3 "$FIZZY_EVENTS_PY" report weekly
 }
 
 # ═══════════════════════════════════════════════════════════════
@@ -287,6 +238,9 @@ fizzy_help() {
     echo "║    fizzy_start \"título\" [descripción]  → Crea y starts    ║"
     echo "║    fizzy_finish card_id             → Completa y registra ║"
     echo "║                                                            ║"
+    echo "║  COLA LOCAL (sincroniza en segundo plano)                 ║"
+    echo "║    fizzy_outbox status | sync | retry                     ║"
+    echo "║                                                            ║"
     echo "║  REPORTES                                                  ║"
     echo "║    fizzy_report_daily                                      ║"
     echo "║    fizzy_report_weekly                                     ║"
@@ -313,10 +267,13 @@ export -f fizzy_report_weekly
 export -f fizzy_help
 export -f check_config
 export -f fizzy_api
+export -f fizzy_outbox
 
-# Si se ejecuta con argumentos
-if [ $# -gt 0 ]; then
-    "$@"
-else
-    fizzy_help
+# Si se ejecuta (no al hacer source) con argumentos
+if [ "${BASH_SOURCE[0]}" = "$0" ]; then
+    if [ $# -gt 0 ]; then
+        "$@"
+    else
+        fizzy_help
+    fi
 fi
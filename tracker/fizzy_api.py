@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+🌐 Fizzy API Client
+Cliente HTTP para la API de Fizzy con conexión persistente (keep-alive).
+
+Misma configuración que los scripts de shell:
+    MOLTBOT_FIZZY_URL / FIZZY_URL          (http://localhost:3000)
+    MOLTBOT_FIZZY_TOKEN / FIZZY_API_TOKEN
+    MOLTBOT_FIZZY_BOARD / FIZZY_BOARD_ID   (1)
+"""
+
+import http.client
+import json
+import os
+import select
+from typing import Dict, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+def _env(*names: str, default: str = "") -> str:
+    for name in names:
+        value = os.environ.get(name)
+        if value:
+            return value
+    return default
+
+FIZZY_URL = _env("MOLTBOT_FIZZY_URL", "FIZZY_URL", default="http://localhost:3000")
+FIZZY_TOKEN = _env("MOLTBOT_FIZZY_TOKEN", "FIZZY_API_TOKEN")
+FIZZY_BOARD = _env("MOLTBOT_FIZZY_BOARD", "FIZZY_BOARD_ID", default="1")
+
+# Se pueden repetir sin duplicar nada (los PATCH de Fizzy fijan valores absolutos)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "PATCH", "DELETE"})
+
+class FizzyError(RuntimeError):
+    """Error de la API de Fizzy (HTTP o red)"""
+
+    def __init__(self, message: str, status: Optional[int] = None, ambiguous: bool = False):
+        super().__init__(message)
+        self.status = status
+        # La petición llegó a enviarse: el servidor pudo aplicarla sin que viéramos la respuesta
+        self.ambiguous = ambiguous
+
+    @property
+    def retryable(self) -> bool:
+        # Red, 408/429 y 5xx se reintentan; otros 4xx no
+        return self.status is None or self.status in (408, 429) or self.status >= 500
+
+class FizzyClient:
+    """Cliente de Fizzy que reutiliza una sola conexión HTTP"""
+
+    def __init__(self, base_url: str = FIZZY_URL, token: str = FIZZY_TOKEN,
+                 board_id: str = FIZZY_BOARD, timeout: float = 10):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/") + "/api/v1"
+        self.token = token
+        self.board_id = board_id
+        self.timeout = timeout
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self.requests = 0
+        self.connections = 0
+
+    # ── Conexión ───────────────────────────────────────────────
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            self._conn = cls(self.host, self.port, timeout=self.timeout)
+            self.connections += 1
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _stale(self) -> bool:
+        """La conexión keep-alive ya no sirve (el servidor la cerró mientras estaba ociosa)"""
+        sock = self._conn.sock if self._conn is not None else None
+        if sock is None:
+            return False
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        # Ociosa no debería tener nada que leer: o es EOF o es basura
+        return bool(readable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None,
+                idempotency_key: Optional[str] = None):
+        """Petición JSON; reabre la conexión una vez si el servidor la cerró
+
+        Solo se reintenta lo que no llegó a enviarse o es idempotente: un POST
+        que falló después de enviarse lanza FizzyError con `ambiguous=True`.
+        """
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+
+        for attempt in range(2):
+            if self._stale():
+                self.close()
+            conn = self._connection()
+            sent = False
+            try:
+                if conn.sock is None:
+                    conn.connect()
+                sent = True
+                conn.request(method, self.prefix + path, body=payload, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+                self.requests += 1
+                break
+            except (http.client.HTTPException, ConnectionError, OSError) as e:
+                self.close()
+                if attempt == 1 or (sent and method not in IDEMPOTENT_METHODS):
+                    raise FizzyError(f"{method} {path}: {e}", ambiguous=sent)
+
+        if resp.status >= 400:
+            raise FizzyError(f"{method} {path}: HTTP {resp.status}", resp.status)
+        if resp.getheader("Connection", "").lower() == "close":
+            self.close()
+        return json.loads(data) if data else None
+
+    # ── Tarjetas ───────────────────────────────────────────────
+
+    def create_card(self, title: str, description: str = "", column_id=None,
+                    idempotency_key: Optional[str] = None) -> str:
+        card = {"title": title, "description": description}
+        if column_id is not None:
+            card["column_id"] = int(column_id)
+        data = self.request("POST", f"/boards/{self.board_id}/cards", {"card": card},
+                            idempotency_key=idempotency_key)
+        return str(data["id"])
+
+    def move_card(self, card_id: str, column_id) -> Dict:
+        return self.request("PATCH", f"/cards/{card_id}/move", {"card": {"column_id": int(column_id)}})
+
+    def update_card(self, card_id: str, fields: Dict) -> Dict:
+        return self.request("PATCH", f"/cards/{card_id}", {"card": fields})
+
+    def get_card(self, card_id: str) -> Dict:
+        return self.request("GET", f"/cards/{card_id}")
+
+    def delete_card(self, card_id: str):
+        return self.request("DELETE", f"/cards/{card_id}")
+
+    def list_cards(self, column_id=None, updated_since: Optional[str] = None) -> List[Dict]:
+        """Tarjetas del tablero; con `updated_since` solo las modificadas después"""
+        if column_id is not None:
+            path = f"/boards/{self.board_id}/columns/{column_id}/cards"
+        else:
+            path = f"/boards/{self.board_id}/cards"
+        if updated_since:
+            path += "?" + urlencode({"updated_since": updated_since})
+        return self.request("GET", path) or []
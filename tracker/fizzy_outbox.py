@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+📮 Fizzy Outbox - Cola local write-behind para la API de Fizzy
+Los hooks del agente registran operaciones al instante; un proceso en
+segundo plano las envía a Fizzy por una sola conexión keep-alive.
+
+    ~/.fizzy/outbox/queue.jsonl  → operaciones pendientes (append-only)
+    ~/.fizzy/outbox/state.json   → estado deseado vs. remoto por tarjeta
+
+Las operaciones se fusionan por tarjeta antes de enviarse:
+create→progress→done se convierte en un único create en la columna final.
+
+Uso:
+    python3 fizzy_outbox.py create "título" [descripción] [columna]  → Imprime la clave local
+    python3 fizzy_outbox.py move clave columna
+    python3 fizzy_outbox.py sync [--quiet]    → Vaciar la cola (con reintentos)
+    python3 fizzy_outbox.py retry             → Reintentar tarjetas con error
+    python3 fizzy_outbox.py status
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from fizzy_api import FizzyClient, FizzyError
+from locking import atomic_write_json, file_lock
+
+OUTBOX_DIR = os.environ.get("FIZZY_OUTBOX_DIR", os.path.expanduser("~/.fizzy/outbox"))
+
+BACKOFF_BASE = 2          # segundos
+BACKOFF_MAX = 300
+MAX_ATTEMPTS = 8
+MAX_WAIT = 60             # espera máxima entre rondas del syncer
+KEEP_SYNCED_DAYS = 7      # claves locales ya cerradas (columna final) que se recuerdan
+CLOCK_SKEW = 300          # margen al buscar en Fizzy un create de resultado incierto
+
+# Columnas finales: una tarjeta que llegó ahí ya no espera más movimientos
+FINAL_COLUMNS = {
+    os.environ.get("MOLTBOT_FIZZY_COLUMN_DONE") or os.environ.get("FIZZY_COLUMN_DONE") or "3",
+    os.environ.get("FIZZY_COLUMN_ARCHIVED") or "5",
+}
+
+def _now() -> float:
+    return time.time()
+
+def new_key() -> str:
+    return f"local-{int(_now() * 1000):x}{random.getrandbits(16):04x}"
+
+def backoff_delay(attempt: int) -> float:
+    """Backoff exponencial con jitter completo"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+# ═══════════════════════════════════════════════════════════════
+#  OUTBOX
+# ═══════════════════════════════════════════════════════════════
+
+class Outbox:
+    """Cola de operaciones de tarjetas con sincronización diferida"""
+
+    def __init__(self, base_dir: str = OUTBOX_DIR):
+        self.base_dir = base_dir
+        self.queue_file = os.path.join(base_dir, "queue.jsonl")
+        self.state_file = os.path.join(base_dir, "state.json")
+        self.queue_lock = os.path.join(base_dir, "queue.lock")
+        self.sync_lock = os.path.join(base_dir, "sync.lock")
+        os.makedirs(base_dir, exist_ok=True)
+
+    def load_state(self) -> Dict:
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        return {"offset": 0, "cards": {}}
+
+    def save_state(self, state: Dict):
+        atomic_write_json(self.state_file, state)
+
+    # ── Encolar (lo que llaman los hooks) ──────────────────────
+
+    def enqueue(self, op: str, key: str, **fields) -> Dict:
+        entry = {"op": op, "key": key, "ts": _now(), **fields}
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with file_lock(self.queue_lock):
+            with open(self.queue_file, 'a') as f:
+                f.write(line)
+        return entry
+
+    def create(self, title: str, description: str = "", column=None) -> str:
+        key = new_key()
+        self.enqueue("create", key, title=title, description=description, column=column)
+        return key
+
+    def move(self, key: str, column) -> Dict:
+        return self.enqueue("move", str(key), column=column)
+
+    def pending_bytes(self) -> int:
+        try:
+            size = os.path.getsize(self.queue_file)
+        except FileNotFoundError:
+            return 0
+        return max(size - self.load_state().get("offset", 0), 0)
+
+    # ── Fusión de operaciones ──────────────────────────────────
+
+    def _read_new(self, state: Dict) -> List[Dict]:
+        """Operaciones añadidas desde el último offset procesado"""
+        if not os.path.exists(self.queue_file):
+            return []
+        with open(self.queue_file, 'rb') as f:
+            f.seek(state.get("offset", 0))
+            data = f.read()
+        # Solo líneas completas; una escritura a medias se lee en la siguiente ronda
+        complete = data[:data.rfind(b"\n") + 1]
+        state["offset"] = state.get("offset", 0) + len(complete)
+        return [json.loads(line) for line in complete.decode().splitlines() if line.strip()]
+
+    @staticmethod
+    def merge(cards: Dict, ops: List[Dict]) -> int:
+        """Aplicar operaciones al estado deseado; devuelve cuántas se fusionaron"""
+        merged = 0
+        for op in ops:
+            key = op["key"]
+            card = cards.get(key)
+            if op["op"] == "create":
+                cards[key] = {
+                    "title": op.get("title", ""),
+                    "description": op.get("description", ""),
+                    "column": op.get("column"),
+                    "remote_id": None,
+                    "remote_column": None,
+                    "attempts": 0,
+                    "next_try": 0,
+                    "updated": op["ts"],
+                }
+            elif op["op"] == "move":
+                if card is None:
+                    if not key.isdigit():
+                        # Sin create conocido: se guarda a la vista de `status`, no se descarta
+                        print(f"⚠️  Outbox: movimiento para clave desconocida {key}", file=sys.stderr)
+                        cards[key] = {"remote_id": None, "remote_column": None, "column": op["column"],
+                                      "orphan": True, "attempts": 0, "next_try": 0, "updated": op["ts"]}
+                        continue
+                    # ID remoto de una tarjeta creada fuera de la cola
+                    card = cards[key] = {"remote_id": key, "remote_column": None,
+                                         "attempts": 0, "next_try": 0}
+                elif card["column"] != card["remote_column"]:
+                    merged += 1
+                card["column"] = op["column"]
+                card["updated"] = op["ts"]
+                card["next_try"] = 0
+                card.pop("error", None)
+        return merged
+
+    @staticmethod
+    def is_dirty(card: Dict) -> bool:
+        if card.get("error") or card.get("orphan"):
+            return False
+        return card["remote_id"] is None or (
+            card["column"] is not None and str(card["column"]) != str(card["remote_column"]))
+
+    # ── Sincronización ─────────────────────────────────────────
+
+    def _push(self, client: FizzyClient, key: str, card: Dict):
+        if card["remote_id"] is None and card.get("uncertain"):
+            self._reconcile(client, card)
+        if card["remote_id"] is None:
+            sent_at = _now()
+            try:
+                card["remote_id"] = client.create_card(card["title"], card["description"], card["column"],
+                                                       idempotency_key=key)
+            except FizzyError as e:
+                # El POST salió pero no hubo respuesta: antes de repetirlo, buscarlo en Fizzy
+                if e.ambiguous:
+                    card.setdefault("uncertain", sent_at)
+                raise
+            card.pop("uncertain", None)
+        elif card["column"] is not None and str(card["column"]) != str(card["remote_column"]):
+            client.move_card(card["remote_id"], card["column"])
+        card["remote_column"] = card["column"]
+        card["attempts"] = 0
+        card["synced"] = _now()
+
+    @staticmethod
+    def _reconcile(client: FizzyClient, card: Dict):
+        """Adoptar la tarjeta si un create anterior sí llegó a crearse en Fizzy"""
+        since = datetime.fromtimestamp(card["uncertain"] - CLOCK_SKEW, timezone.utc)
+        for remote in client.list_cards(updated_since=since.strftime("%Y-%m-%dT%H:%M:%SZ")):
+            if remote.get("title") == card["title"] and \
+                    (remote.get("description") or "") == card["description"]:
+                card["remote_id"] = str(remote["id"])
+                card["remote_column"] = remote.get("column_id")
+                break
+        card.pop("uncertain", None)
+
+    def _prune(self, cards: Dict):
+        """Olvidar solo tarjetas cerradas: una abierta aún puede recibir su move a done"""
+        cutoff = _now() - KEEP_SYNCED_DAYS * 86400
+        for key in [k for k, c in cards.items()
+                    if not self.is_dirty(c) and not c.get("error")
+                    and str(c.get("remote_column")) in FINAL_COLUMNS
+                    and c.get("synced", _now()) < cutoff]:
+            del cards[key]
+
+    def _compact(self, state: Dict):
+        """Truncar la cola si todo lo escrito ya se procesó"""
+        with file_lock(self.queue_lock):
+            if os.path.exists(self.queue_file) and os.path.getsize(self.queue_file) == state["offset"]:
+                open(self.queue_file, 'w').close()
+                state["offset"] = 0
+                self.save_state(state)
+
+    def sync_once(self, client: FizzyClient) -> Dict:
+        """Una ronda: leer la cola, fusionar y enviar lo que toca"""
+        state = self.load_state()
+        ops = self._read_new(state)
+        stats = {"ops": len(ops), "merged": self.merge(state["cards"], ops),
+                 "sent": 0, "failed": 0, "waiting": 0}
+        self.save_state(state)
+
+        now = _now()
+        for key, card in state["cards"].items():
+            if not self.is_dirty(card):
+                continue
+            if card["next_try"] > now:
+                stats["waiting"] += 1
+                continue
+            try:
+                self._push(client, key, card)
+                stats["sent"] += 1
+            except FizzyError as e:
+                card["attempts"] += 1
+                stats["failed"] += 1
+                if not e.retryable or card["attempts"] >= MAX_ATTEMPTS:
+                    card["error"] = str(e)
+                else:
+                    card["next_try"] = _now() + backoff_delay(card["attempts"])
+                    stats["waiting"] += 1
+            # Guardar tras cada envío: un create confirmado no se repite
+            self.save_state(state)
+
+        self._prune(state["cards"])
+        self._compact(state)
+        self.save_state(state)
+        return stats
+
+    def sync(self, client: Optional[FizzyClient] = None, wait: bool = True,
+             quiet: bool = False) -> Optional[Dict]:
+        """Vaciar la cola; None si ya hay otro syncer en marcha"""
+        client = client or FizzyClient()
+        totals = {"ops": 0, "merged": 0, "sent": 0, "failed": 0, "waiting": 0}
+        try:
+            while True:
+                with file_lock(self.sync_lock, blocking=False) as acquired:
+                    if not acquired:
+                        return None
+                    while True:
+                        stats = self.sync_once(client)
+                        for k in ("ops", "merged", "sent", "failed"):
+                            totals[k] += stats[k]
+                        totals["waiting"] = stats["waiting"]
+                        if not quiet and (stats["ops"] or stats["sent"] or stats["failed"]):
+                            print(f"📮 ops {stats['ops']}  fusionadas {stats['merged']}  "
+                                  f"enviadas {stats['sent']}  fallidas {stats['failed']}")
+                        if self.pending_bytes():
+                            continue
+                        if not (wait and stats["waiting"]):
+                            break
+                        self._wait(min(self._next_retry_in(), MAX_WAIT))
+                # Operación encolada justo al soltar el lock: otra vuelta
+                if not self.pending_bytes():
+                    break
+        finally:
+            client.close()
+        return totals
+
+    def _wait(self, seconds: float):
+        """Dormir hasta el próximo reintento o hasta que llegue algo nuevo"""
+        deadline = _now() + seconds
+        while _now() < deadline and not self.pending_bytes():
+            time.sleep(min(0.5, max(deadline - _now(), 0)))
+
+    def _next_retry_in(self) -> float:
+        cards = self.load_state()["cards"].values()
+        waits = [c["next_try"] - _now() for c in cards if self.is_dirty(c)]
+        return max(min(waits, default=0), 0.1)
+
+    def spawn_syncer(self):
+        """Lanzar el syncer en segundo plano (sale solo si ya hay uno)"""
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "sync", "--quiet"],
+            env={**os.environ, "FIZZY_OUTBOX_DIR": self.base_dir},
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    def clear_errors(self) -> int:
+        """Volver a poner en cola las tarjetas marcadas con error"""
+        with file_lock(self.sync_lock):
+            state = self.load_state()
+            failed = [c for c in state["cards"].values() if c.pop("error", None)]
+            for card in failed:
+                card["attempts"] = 0
+                card["next_try"] = 0
+            self.save_state(state)
+        return len(failed)
+
+    def resolve(self, key: str) -> Optional[str]:
+        """ID remoto de una clave local (si ya se sincronizó)"""
+        card = self.load_state()["cards"].get(key)
+        return card.get("remote_id") if card else (key if key.isdigit() else None)
+
+    def status(self) -> Dict:
+        cards = self.load_state()["cards"]
+        return {
+            "pending_bytes": self.pending_bytes(),
+            "cards": len(cards),
+            "dirty": sum(1 for c in cards.values() if self.is_dirty(c)),
+            "failed": {k: c["error"] for k, c in cards.items() if c.get("error")},
+            "orphans": {k: c["column"] for k, c in cards.items() if c.get("orphan")},
+        }
+
+# ═══════════════════════════════════════════════════════════════
+#  CLI
+# ═══════════════════════════════════════════════════════════════
+
+def _auto_sync() -> bool:
+    return os.environ.get("FIZZY_OUTBOX_SYNC", "1") != "0"
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return 1
+
+    outbox = Outbox()
+    command, args = argv[0], argv[1:]
+
+    if command == "create" and args:
+        column = args[2] if len(args) > 2 else None
+        print(outbox.create(args[0], args[1] if len(args) > 1 else "", column))
+        if _auto_sync():
+            outbox.spawn_syncer()
+        return 0
+
+    if command == "move" and len(args) == 2:
+        outbox.move(args[0], args[1])
+        if _auto_sync():
+            outbox.spawn_syncer()
+        return 0
+
+    if command == "sync":
+        totals = outbox.sync(quiet="--quiet" in args, wait="--no-wait" not in args)
+        if totals is None:
+            if "--quiet" not in args:
+                print("⏳ Ya hay un syncer en marcha")
+            return 0
+        return 1 if outbox.status()["failed"] else 0
+
+    if command == "retry":
+        print(f"🔁 {outbox.clear_errors()} tarjetas de nuevo en cola")
+        outbox.spawn_syncer()
+        return 0
+
+    if command == "resolve" and args:
+        remote = outbox.resolve(args[0])
+        if remote:
+            print(remote)
+        return 0 if remote else 1
+
+    if command == "status":
+        s = outbox.status()
+        print(f"\n📮 OUTBOX FIZZY ({datetime.now().strftime('%H:%M:%S')})")
+        print(f"  Cola sin procesar: {s['pending_bytes']} bytes")
+        print(f"  Tarjetas: {s['cards']}  (pendientes: {s['dirty']})")
+        for key, error in s["failed"].items():
+            print(f"  ❌ {key}: {error}")
+        for key, column in s["orphans"].items():
+            print(f"  ⚠️  {key}: movimiento a columna {column} sin tarjeta conocida")
+        return 0
+
+    print(__doc__)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
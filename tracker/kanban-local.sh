@@ -19,47 +19,20 @@ NC='\033[0m'
 # ═══════════════════════════════════════════════════════════════
 
 init_kanban() {
-    mkdir -p "$(dirname "$KANBAN_FILE")"
-    
-    if [ ! -f "$KANBAN_FILE" ]; then
-        cat > "$KANBAN_FILE" << 'EOF'
-{
-  "columns": {
-    "backlog": {"title": "Backlog", "cards": []},
-    "thisweek": {"title": "Esta Semana", "cards": []},
-    "progress": {"title": "En Progreso", "cards": []},
-    "done": {"title": "Hecho", "cards": []},
-    "archived": {"title": "Archivado", "cards": []}
-  },
-  "last_updated": ""
-}
-EOF
+    # kanban.py lo crea bajo el lock y con rename atómico
+    if [ ! -f "$KANBAN_FILE" ] && _kanban_py init; then
         echo -e "${GREEN}✅ Kanban inicializado en $KANBAN_FILE${NC}"
     fi
 }
 
 # ═══════════════════════════════════════════════════════════════
-#  GESTIÓN DE JSON
+#  MOTOR PYTHON (kanban.py)
 # ═══════════════════════════════════════════════════════════════
 
-get_json() {
-    local field="$1"
-    local file="$2"
-    python3 -c "import json; d=json.load(open('$file')); print($field)" 2>/dev/null || echo ""
-}
+KANBAN_PY="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/kanban.py"
 
-set_json() {
-    local field="$1"
-    local value="$2"
-    local file="$3"
-    python3 << PYEOF
-import json
-with open('$file', 'r') as f:
-    d = json.load(f)
-d$field = $value
-with open('$file', 'w') as f:
-    json.dump(d, f, indent=2, ensure_ascii=False)
-PYEOF
+_kanban_py() {
+    KANBAN_FILE="$KANBAN_FILE" python3 "$KANBAN_PY" "$@"
 }
 
 # ═══════════════════════════════════════════════════════════════
@@ -67,149 +40,30 @@ PYEOF
 # ═══════════════════════════════════════════════════════════════
 
 kanban_create() {
-    init_kanban
-    
-    local title="$1"
-    local description="${2:-}"
-    local column="${3:-backlog}"
-    
-    # Generar ID único
-    local id=$(date +%s)$(printf "%04d" $((RANDOM % 10000)))
-    
-    # Leer JSON
-    python3 << PYEOF
-import json
-with open('$KANBAN_FILE', 'r') as f:
-    data = json.load(f)
-
-card = {
-    "id": "$id",
-    "title": """$title""",
-    "description": """$description""",
-    "created": "$(date -Iseconds)",
-    "started": None,
-    "done": None
-}
-
-data["columns"]["$column"]["cards"].append(card)
-data["last_updated"] = "$(date -Iseconds)"
-
-with open('$KANBAN_FILE', 'w') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
-PYEOF
-    
-    echo -e "${GREEN}✅ Creada: $title${NC} (ID: $id)"
+    _kanban_py create "$1" "${2:-}" "${3:-backlog}"
 }
 
 kanban_move() {
-    init_kanban
-    
-    local id="$1"
-    local target_column="$2"
-    
-    python3 << PYEOF
-import json
-with open('$KANBAN_FILE', 'r') as f:
-    data = json.load(f)
-
-card = None
-for col_name, col_data in data["columns"].items():
-    for c in col_data["cards"]:
-        if c["id"] == "$id":
-            card = c
-            col_data["cards"].remove(c)
-            break
-    if card:
-        break
-
-if card:
-    data["columns"]["$target_column"]["cards"].append(card)
-    data["last_updated"] = "$(date -Iseconds)"
-    with open('$KANBAN_FILE', 'w') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print("OK")
-else:
-    print("NOT_FOUND")
-PYEOF
-    
-    echo -e "${YELLOW}🔄 Movida a '$target_column'${NC}"
+    _kanban_py move "$1" "$2"
 }
 
 kanban_start() {
-    init_kanban
-    
-    local id="$1"
-    
-    python3 << PYEOF
-import json
-from datetime import datetime
-
-with open('$KANBAN_FILE', 'r') as f:
-    data = json.load(f)
-
-for col_name, col_data in data["columns"].items():
-    for c in col_data["cards"]:
-        if c["id"] == "$id":
-            c["started"] = datetime.now().isoformat()
-            break
-
-with open('$KANBAN_FILE', 'w') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
-PYEOF
-    
-    echo -e "${CYAN}🚀 Iniciada: $id${NC}"
+    _kanban_py start "$1"
 }
 
 kanban_done() {
-    init_kanban
-    
-    local id="$1"
-    
-    python3 << PYEOF
-import json
-from datetime import datetime
-
-with open('$KANBAN_FILE', 'r') as f:
-    data = json.load(f)
-
-for col_name, col_data in data["columns"].items():
-    for c in col_data["cards"]:
-        if c["id"] == "$id":
-            c["done"] = datetime.now().isoformat()
-            break
-
-with open('$KANBAN_FILE', 'w') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
-PYEOF
-    
-    echo -e "${GREEN}✅ Completada: $id${NC}"
+    _kanban_py done "$1"
 }
 
 kanban_delete() {
-    init_kanban
-    
-    local id="$1"
-    
-    python3 << PYEOF
-import json
-with open('$KANBAN_FILE', 'r') as f:
-    data = json.load(f)
-
-for col_name, col_data in data["columns"].items():
-    for c in col_data["cards"]:
-        if c["id"] == "$id":
-            col_data["cards"].remove(c)
-            print("OK")
-            break
-    else:
-        continue
-    break
-
-with open('$KANBAN_FILE', 'w') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
-PYEOF
-    
-    echo -e "${RED}🗑️  Eliminada: $id${NC}"
+    _kanban_py delete "$1"
+}
+
+# Varios comandos en un solo proceso (uno por línea, desde stdin o archivo)
+# Uso: kanban_batch < comandos.txt
+#      printf 'create "A"\nmove ID done\n' | kanban_batch
+kanban_batch() {
+    _kanban_py batch "$@"
 }
 
 # ═══════════════════════════════════════════════════════════════
@@ -217,104 +71,25 @@ PYEOF
 # ═══════════════════════════════════════════════════════════════
 
 kanban_show() {
-    init_kanban
-    
     echo ""
     echo -e "${BLUE}╔══════════════════════════════════════════════════════════╗${NC}"
     echo -e "${BLUE}║                  📋 KANBAN TRACKER                        ║${NC}"
     echo -e "${BLUE}╚══════════════════════════════════════════════════════════╝${NC}"
     echo ""
     
-    python3 << 'PYEOF'
-import json
-import sys
-
-with open('$HOME/.fizzy/kanban.json'.replace('$HOME', __import__('os').environ['HOME']), 'r') as f:
-    data = json.load(f)
-
-columns = ['backlog', 'thisweek', 'progress', 'done', 'archived']
-titles = {'backlog': '📚 Backlog', 'thisweek': '📅 Esta Semana', 'progress': '🔄 En Progreso', 'done': '✅ Hecho', 'archived': '📦 Archivado'}
-
-# Calcular anchos
-for col in columns:
-    max_len = len(titles[col])
-    for card in data["columns"][col]["cards"]:
-        max_len = max(max_len, len(card["title"]))
-    data["columns"][col]["_width"] = min(max_len + 4, 40)
-
-# Headers
-header = ""
-for col in columns:
-    col_data = data["columns"][col]
-    title = titles[col][:col_data["_width"]-4]
-    header += f" {title:<{col_data['_width']-1}} |"
-print(f"┌{'─'*(58)}┐")
-print(f"│{header}")
-print(f"├{'─'*(58)}┤")
-
-# Cards (máximo 5 por columna para mostrar)
-max_rows = max(len(data["columns"][c]["cards"]) for c in columns)
-max_rows = min(max_rows, 10)
-
-for row in range(max_rows):
-    line = "│"
-    for col in columns:
-        cards = data["columns"][col]["cards"]
-        if row < len(cards):
-            title = cards[row]["title"]
-            if len(title) > col_data["_width"]-5:
-                title = title[:col_data["_width"]-8] + "..."
-            line += f" {title:<{col_data['_width']-2}} │"
-        else:
-            line += f" {' '*(col_data['_width']-2)} │"
-    print(line)
-
-print(f"└{'─'*(58)}┘")
-
-# Stats
-total = sum(len(data["columns"][c]["cards"]) for c in columns)
-done = len(data["columns"]["done"]["cards"])
-print(f"\n📊 Total: {total} | ✅ Hecho: {done} ({int(done/total*100) if total > 0 else 0}%)")
-PYEOF
+    _kanban_py show
     
     echo ""
 }
 
 kanban_list() {
-    init_kanban
-    
-    local column="${1:-all}"
-    
-    python3 << 'PYEOF'
-import json
-import sys
-
-with open('$HOME/.fizzy/kanban.json'.replace('$HOME', __import__('os').environ['HOME']), 'r') as f:
-    data = json.load(f)
-
-columns = {'backlog': '📚 Backlog', 'thisweek': '📅 Esta Semana', 'progress': '🔄 En Progreso', 'done': '✅ Hecho', 'archived': '📦 Archivado'}
-
-if "$column" == "all":
-    for col_key, col_title in columns.items():
-        print(f"\n{col_title}:")
-        for card in data["columns"][col_key]["cards"]:
-            status = ""
-            if card.get("started"):
-                status += "🔄"
-            if card.get("done"):
-                status += "✅"
-            print(f"  [{card['id'][-4:]}] {status} {card['title']}")
-else:
-    col_title = columns.get("$column", "$column")
-    print(f"\n{col_title}:")
-    for card in data["columns"]["$column"]["cards"]:
-        status = ""
-        if card.get("started"):
-            status += "🔄"
-        if card.get("done"):
-            status += "✅"
-        print(f"  [{card['id'][-4:]}] {status} {card['title']}")
-PYEOF
+    _kanban_py list "${1:-all}" "${@:2}"
+}
+
+# Búsqueda indexada (título/descripción + filtros), incluye el archivo
+# Uso: kanban_search "texto" [--column col] [--done DESDE..HASTA] [--hot]
+kanban_search() {
+    KANBAN_FILE="$KANBAN_FILE" python3 "$(dirname "$KANBAN_PY")/kanban_search.py" "$@"
 }
 
 # ═══════════════════════════════════════════════════════════════
@@ -322,50 +97,7 @@ PYEOF
 # ═══════════════════════════════════════════════════════════════
 
 kanban_report() {
-    init_kanban
-    
-    python3 << 'PYEOF'
-import json
-from datetime import datetime, timedelta
-
-with open('$HOME/.fizzy/kanban.json'.replace('$HOME', __import__('os').environ['HOME']), 'r') as f:
-    data = json.load(f)
-
-today = datetime.now()
-today_start = today.replace(hour=0, minute=0, second=0, microsecond=0)
-
-print("📊 Reporte de Actividades")
-print("=" * 40)
-
-# Esta semana (lunes)
-week_start = today - timedelta(days=today.weekday())
-week_start = week_start.replace(hour=0, minute=0, second=0)
-
-done_today = 0
-done_week = 0
-in_progress = 0
-
-for card in data["columns"]["done"]["cards"]:
-    if card.get("done"):
-        done_date = datetime.fromisoformat(card["done"])
-        if done_date >= today_start:
-            done_today += 1
-        if done_date >= week_start:
-            done_week += 1
-
-for card in data["columns"]["progress"]["cards"]:
-    if card.get("started") and not card.get("done"):
-        in_progress += 1
-
-print(f"\n✅ Completadas hoy: {done_today}")
-print(f"📅 Completadas esta semana: {done_week}")
-print(f"🔄 En progreso: {in_progress}")
-print(f"📚 Total en backlog: {len(data['columns']['backlog']['cards'])}")
-
-# Calcular porcentaje de la semana
-week_goal = 10  # Meta semanal
-print(f"\n🎯 Progreso semanal: {done_week}/{week_goal} ({int(done_week/week_goal*100)}%)")
-PYEOF
+    _kanban_py report
 }
 
 # ═══════════════════════════════════════════════════════════════
@@ -373,47 +105,37 @@ PYEOF
 # ═══════════════════════════════════════════════════════════════
 
 kanban_export_report() {
-    init_kanban
-    
-    python3 << 'PYEOF'
-import json
-from datetime import datetime, timedelta
-
-with open('$HOME/.fizzy/kanban.json'.replace('$HOME', __import__('os').environ['HOME']), 'r') as f:
-    data = json.load(f)
-
-today = datetime.now()
-today_str = today.strftime("%d/%m/%Y")
-week_start = today - timedelta(days=today.weekday())
-
-done_today = 0
-done_week = 0
-in_progress = []
-done_titles = []
-
-for card in data["columns"]["done"]["cards"]:
-    if card.get("done"):
-        done_date = datetime.fromisoformat(card["done"])
-        if done_date.date() >= week_start.date():
-            done_titles.append(f"  • {card['title']}")
+    _kanban_py export-report
+}
 
-for card in data["columns"]["progress"]["cards"]:
-    in_progress.append(f"  🔄 {card['title']}")
+# Prueba de carga: escritores concurrentes (en un directorio temporal)
+# Uso: kanban_stress [--writers 8] [--ops 50] [--readers 2]
+kanban_stress() {
+    python3 "$(dirname "$KANBAN_PY")/stress.py" "$@"
+}
 
-print(f"""📊 **Reporte Semanal - {today_str}**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# Recalcular rollups (contadores por día/semana) desde las tarjetas
+kanban_rebuild_rollups() {
+    KANBAN_FILE="$KANBAN_FILE" python3 "$(dirname "$KANBAN_PY")/rollups.py" rebuild kanban
+}
 
-✅ **Completadas esta semana:** {len(done_titles)}
+# ═══════════════════════════════════════════════════════════════
+#  ARCHIVO (tarjetas terminadas antiguas, comprimidas por mes)
+# ═══════════════════════════════════════════════════════════════
 
-{chr(10).join(done_titles) if done_titles else "  (sin tareas completadas)"}
+# Uso: kanban_archive run [días] | search "texto" | list [YYYY-MM] | restore ID
+kanban_archive() {
+    KANBAN_FILE="$KANBAN_FILE" python3 "$(dirname "$KANBAN_PY")/kanban_archive.py" "$@"
+}
 
-⏳ **En progreso:**
-{chr(10).join(in_progress) if in_progress else "  (sin tareas activas)"}
+# ═══════════════════════════════════════════════════════════════
+#  SINCRONIZACIÓN CON FIZZY
+# ═══════════════════════════════════════════════════════════════
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-_Generado automáticamente por Kanban Tracker_
-""")
-PYEOF
+# Sincronización incremental en ambos sentidos (solo el delta)
+# Uso: kanban_sync [--dry-run] [--policy newest|local|remote]
+kanban_sync() {
+    KANBAN_FILE="$KANBAN_FILE" python3 "$(dirname "$KANBAN_PY")/kanban_sync.py" "$@"
 }
 
 # ═══════════════════════════════════════════════════════════════
@@ -434,14 +156,24 @@ kanban_help() {
     echo "║    kanban_start id                                        ║"
     echo "║    kanban_done id                                         ║"
     echo "║    kanban_delete id                                       ║"
+    echo "║    kanban_batch < comandos.txt  (un proceso, 1 escritura) ║"
     echo "║                                                            ║"
     echo "║  VISUALIZACIÓN                                             ║"
     echo "║    kanban_show                                            ║"
-    echo "║    kanban_list [columna]                                  ║"
+    echo "║    kanban_list [columna] [--archive]                      ║"
+    echo "║    kanban_search \"texto\" [--column c] [--done A..B]      ║"
     echo "║                                                            ║"
     echo "║  REPORTES                                                  ║"
     echo "║    kanban_report                                          ║"
     echo "║    kanban_export_report                                   ║"
+    echo "║    kanban_rebuild_rollups                                 ║"
+    echo "║    kanban_stress [--writers N] [--ops N]                  ║"
+    echo "║                                                            ║"
+    echo "║  ARCHIVO (done/archived > KANBAN_ARCHIVE_DAYS días)       ║"
+    echo "║    kanban_archive run | search \"texto\" | list | restore  ║"
+    echo "║                                                            ║"
+    echo "║  FIZZY                                                     ║"
+    echo "║    kanban_sync [--dry-run] [--policy newest|local|remote] ║"
     echo "║                                                            ║"
     echo "║  COLUMNAS: backlog, thisweek, progress, done, archived    ║"
     echo "║                                                            ║"
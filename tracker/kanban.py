@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+"""
+📋 Kanban Engine
+Motor del tablero local (kanban.json) que usa kanban-local.sh.
+
+- Cada columna es un dict id → tarjeta (ordenado por inserción) más un
+  índice id → columna: mover, buscar y borrar tarjetas es O(1); la lista
+  del JSON se arma una vez al guardar
+- Modo batch: varios comandos en un solo proceso y una sola escritura
+- Cada cambio sube `version`/`updated` de la tarjeta y el `seq` del tablero
+  (marcas de agua para la sincronización incremental con Fizzy)
+- Tarjetas terminadas hace más de KANBAN_ARCHIVE_DAYS pasan al archivo
+  comprimido (kanban_archive.py), una vez al día al guardar
+- Escritores serializados con lock (kanban.json.lock) y rename atómico;
+  los lectores (show, list, report) no esperan: ven una versión completa
+
+Uso:
+    python3 kanban.py init                → Crear el tablero si no existe
+    python3 kanban.py create "título" [descripción] [columna]
+    python3 kanban.py move ID columna
+    python3 kanban.py start|done|delete ID
+    python3 kanban.py show | list [columna] [--archive] | report | export-report
+    python3 kanban.py batch [archivo]     → comandos por línea (stdin por defecto)
+"""
+
+import json
+import os
+import random
+import shlex
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from locking import atomic_write_json, file_lock, lock_path
+from rollups import Rollups, kanban_rollups_path, week_start
+from telemetry_shim import observe, timer
+
+KANBAN_FILE = os.environ.get("KANBAN_FILE") or os.path.expanduser("~/.fizzy/kanban.json")
+
+COLUMNS = ["backlog", "thisweek", "progress", "done", "archived"]
+
+COLUMN_TITLES = {
+    "backlog": "Backlog",
+    "thisweek": "Esta Semana",
+    "progress": "En Progreso",
+    "done": "Hecho",
+    "archived": "Archivado",
+}
+
+DISPLAY_TITLES = {
+    "backlog": "📚 Backlog",
+    "thisweek": "📅 Esta Semana",
+    "progress": "🔄 En Progreso",
+    "done": "✅ Hecho",
+    "archived": "📦 Archivado",
+}
+
+WEEK_GOAL = 10  # Meta semanal
+
+# Colores (mismos que kanban-local.sh)
+RED = '\033[0;31m'
+GREEN = '\033[0;32m'
+YELLOW = '\033[1;33m'
+BLUE = '\033[0;34m'
+CYAN = '\033[0;36m'
+NC = '\033[0m'
+
+def now_iso() -> str:
+    return datetime.now().astimezone().isoformat(timespec="seconds")
+
+def _parse_date(value: str) -> datetime:
+    """ISO con o sin zona → datetime local naive"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def completion_of(card: Dict) -> Optional[Tuple[date, int]]:
+    """(día, duración en s) de una tarjeta completada; None si no tiene 'done'"""
+    if not card.get("done"):
+        return None
+    done = _parse_date(card["done"])
+    duration = 0
+    if card.get("started"):
+        duration = max(int((done - _parse_date(card["started"])).total_seconds()), 0)
+    return done.date(), duration
+
+# ═══════════════════════════════════════════════════════════════
+#  TABLERO
+# ═══════════════════════════════════════════════════════════════
+
+class KanbanBoard:
+    """Tablero kanban: columnas id → tarjeta e índice id → columna"""
+
+    def __init__(self, path: str = KANBAN_FILE, track_rollups: bool = True,
+                 auto_archive: bool = True, load: bool = True):
+        self.path = path
+        self.auto_archive = auto_archive
+        self.track_rollups = track_rollups
+        self.data: Dict = {}
+        self.columns: Dict[str, Dict[str, Dict]] = {}
+        self.index: Dict[str, str] = {}
+        self.dirty = False
+        self.rollups: Optional[Rollups] = None
+        # load=False: se carga dentro de transaction(), bajo lock y una sola vez
+        if load:
+            self.load()
+
+    # ── Persistencia ───────────────────────────────────────────
+
+    @staticmethod
+    def empty() -> Dict:
+        return {
+            "columns": {col: {"title": COLUMN_TITLES[col], "cards": []} for col in COLUMNS},
+            "last_updated": "",
+        }
+
+    def load(self):
+        """Cargar tablero (lo crea si no existe) y construir el índice"""
+        self.dirty = False
+        if os.path.exists(self.path):
+            with timer("kanban.load"), open(self.path, 'r') as f:
+                self.data = json.load(f)
+        else:
+            self.data = self.empty()
+            self.dirty = True
+        for col in COLUMNS:
+            self.data["columns"].setdefault(col, {"title": COLUMN_TITLES[col], "cards": []})
+        self._build_index()
+        if self.track_rollups:
+            self.rollups = Rollups(kanban_rollups_path(self.path))
+
+    def rollups_missing(self) -> bool:
+        """Tablero anterior a los rollups: hay que construirlos (al guardar)"""
+        return self.track_rollups and not os.path.exists(kanban_rollups_path(self.path))
+
+    def save(self):
+        """Guardar si hubo cambios"""
+        if not self.dirty:
+            return
+        if self.auto_archive and self.data.get("last_archive") != date.today().isoformat():
+            from kanban_archive import archive_board
+            archive_board(self)
+        for col, cards in self.columns.items():
+            self.data["columns"][col]["cards"] = list(cards.values())
+        self.data["last_updated"] = now_iso()
+        with timer("kanban.save"):
+            atomic_write_json(self.path, self.data, indent=2)
+        self.dirty = False
+        if self.rollups_missing():
+            self.rebuild_rollups()
+        elif self.rollups is not None:
+            self.rollups.save()
+
+    @contextmanager
+    def transaction(self):
+        """Leer-modificar-escribir bajo lock: recarga la última versión y guarda al salir"""
+        start = time.perf_counter()
+        with file_lock(lock_path(self.path)):
+            observe("kanban.lock_wait", time.perf_counter() - start)
+            self.load()
+            if self.rollups_missing():
+                self.dirty = True
+            yield self
+            self.save()
+
+    def snapshot(self):
+        """Cargar bajo lock sin escribir: foto para trabajar fuera del lock (p. ej. red)"""
+        with file_lock(lock_path(self.path)):
+            self.load()
+
+    # ── Índice ─────────────────────────────────────────────────
+
+    def _build_index(self):
+        self.columns = {col: {card["id"]: card for card in self.data["columns"][col]["cards"]}
+                        for col in self.data["columns"]}
+        self.index = {cid: col for col, cards in self.columns.items() for cid in cards}
+
+    def locate(self, card_id: str) -> Optional[str]:
+        """Columna de una tarjeta"""
+        return self.index.get(card_id)
+
+    def get(self, card_id: str) -> Optional[Dict]:
+        column = self.index.get(card_id)
+        if column is None:
+            return None
+        return self.columns[column][card_id]
+
+    def cards(self, column: str) -> List[Dict]:
+        """Tarjetas de la columna en orden (copia: O(n), solo para leer)"""
+        return list(self.columns[column].values())
+
+    def count(self, column: str) -> int:
+        return len(self.columns[column])
+
+    def _remove(self, card_id: str) -> Optional[Dict]:
+        column = self.index.pop(card_id, None)
+        if column is None:
+            return None
+        return self.columns[column].pop(card_id)
+
+    def _append(self, column: str, card: Dict):
+        self.columns[column][card["id"]] = card
+        self.index[card["id"]] = column
+
+    def evict(self, card_id: str) -> Optional[Dict]:
+        """Quitar del tablero sin tocar rollups ni sync (al archivar)"""
+        card = self._remove(card_id)
+        if card is not None:
+            self.dirty = True
+        return card
+
+    def restore(self, column: str, card: Dict):
+        """Volver a poner una tarjeta archivada"""
+        self._append(column, card)
+        self.dirty = True
+
+    # ── Rollups ────────────────────────────────────────────────
+
+    def _completion(self, card_id: str) -> Optional[Tuple[date, int]]:
+        """Completada que cuenta en reportes: en 'done' y con fecha"""
+        if self.index.get(card_id) != "done":
+            return None
+        return completion_of(self.get(card_id))
+
+    def rebuild_rollups(self) -> Rollups:
+        """Recalcular rollups desde las tarjetas en 'done' (incluye el archivo)"""
+        from kanban_archive import KanbanArchive, archive_dir
+
+        if self.rollups is None:
+            self.rollups = Rollups(kanban_rollups_path(self.path))
+        self.rollups.clear()
+        archive = KanbanArchive(archive_dir(self.path))
+        archived = [e["card"] for e in archive.iter_cards("done", exclude=self.index)]
+        for card in archived + self.cards("done"):
+            completion = completion_of(card)
+            if completion:
+                self.rollups.record_completion(completion[0], completion[1], card["id"], card["title"])
+        self.rollups.save()
+        return self.rollups
+
+    def _tracked(self, card_id: str, mutate: Callable[[], bool]) -> bool:
+        """Aplicar un cambio y actualizar rollups si cambió la completada"""
+        card = self.get(card_id)
+        before = self._completion(card_id)
+        ok = mutate()
+        after = self._completion(card_id)
+        if self.rollups is not None and card is not None and before != after:
+            if before:
+                self.rollups.remove_completion(before[0], before[1], card["id"])
+            if after:
+                self.rollups.record_completion(after[0], after[1], card["id"], card["title"])
+        return ok
+
+    # ── Marcas de cambio ───────────────────────────────────────
+
+    def _next_seq(self) -> int:
+        self.data["seq"] = self.data.get("seq", 0) + 1
+        return self.data["seq"]
+
+    def _touch(self, card: Dict):
+        """Registrar un cambio de la tarjeta (versión, fecha y seq del tablero)"""
+        card["version"] = card.get("version", 0) + 1
+        card["updated"] = now_iso()
+        card["seq"] = self._next_seq()
+        self.dirty = True
+
+    def changed_since(self, seq: int) -> Tuple[List[Tuple[str, Dict]], Dict[str, int]]:
+        """(columna, tarjeta) modificadas y eliminadas después de `seq`"""
+        changed = [(col, card) for col in COLUMNS for card in self.cards(col)
+                   if card.get("seq", 0) > seq]
+        deleted = {cid: s for cid, s in self.data.get("deleted", {}).items() if s > seq}
+        return changed, deleted
+
+    def forget_deleted(self, seq: int):
+        """Descartar marcas de borrado ya sincronizadas"""
+        deleted = self.data.get("deleted", {})
+        for cid in [cid for cid, s in deleted.items() if s <= seq]:
+            del deleted[cid]
+            self.dirty = True
+
+    # ── Operaciones ────────────────────────────────────────────
+
+    def _new_id(self) -> str:
+        while True:
+            card_id = f"{int(time.time())}{random.randint(0, 9999):04d}"
+            if card_id not in self.index:
+                return card_id
+
+    def create(self, title: str, description: str = "", column: str = "backlog") -> Dict:
+        """Crear tarjeta"""
+        if column not in self.columns:
+            raise ValueError(f"Columna desconocida: {column}")
+        card = {
+            "id": self._new_id(),
+            "title": title,
+            "description": description,
+            "created": now_iso(),
+            "started": None,
+            "done": None,
+        }
+        self._append(column, card)
+        self._touch(card)
+        return card
+
+    def move(self, card_id: str, column: str) -> bool:
+        """Mover tarjeta a otra columna"""
+        if column not in self.columns:
+            raise ValueError(f"Columna desconocida: {column}")
+
+        def _move():
+            card = self._remove(card_id)
+            if card is None:
+                return False
+            self._append(column, card)
+            self._touch(card)
+            return True
+
+        return self._tracked(card_id, _move)
+
+    def _set_timestamp(self, card_id: str, field: str) -> bool:
+        def _set():
+            card = self.get(card_id)
+            if card is None:
+                return False
+            card[field] = now_iso()
+            self._touch(card)
+            return True
+
+        return self._tracked(card_id, _set)
+
+    def update(self, card_id: str, **fields) -> bool:
+        """Cambiar título/descripción"""
+        card = self.get(card_id)
+        if card is None:
+            return False
+        changes = {k: v for k, v in fields.items()
+                   if k in ("title", "description") and v is not None and card.get(k) != v}
+        if changes:
+            card.update(changes)
+            self._touch(card)
+        return True
+
+    def start(self, card_id: str) -> bool:
+        """Marcar inicio"""
+        return self._set_timestamp(card_id, "started")
+
+    def done(self, card_id: str) -> bool:
+        """Marcar como completada"""
+        return self._set_timestamp(card_id, "done")
+
+    def delete(self, card_id: str) -> bool:
+        """Eliminar tarjeta"""
+        def _delete():
+            if self._remove(card_id) is None:
+                return False
+            self.data.setdefault("deleted", {})[card_id] = self._next_seq()
+            self.dirty = True
+            return True
+
+        return self._tracked(card_id, _delete)
+
+# ═══════════════════════════════════════════════════════════════
+#  VISUALIZACIÓN
+# ═══════════════════════════════════════════════════════════════
+
+def _fit(text: str, width: int) -> str:
+    if len(text) > width:
+        return text[:max(width - 3, 0)] + "..."
+    return text
+
+def show(board: KanbanBoard, max_rows: int = 10):
+    """Tablero en columnas"""
+    columns = {col: board.cards(col) for col in COLUMNS}
+    widths = {}
+    for col in COLUMNS:
+        longest = max([len(DISPLAY_TITLES[col])] + [len(c["title"]) for c in columns[col]])
+        widths[col] = min(longest + 2, 24)
+
+    total_width = sum(widths[c] + 3 for c in COLUMNS) - 1
+    print(f"┌{'─' * total_width}┐")
+    print("│" + "│".join(f" {_fit(DISPLAY_TITLES[c], widths[c]):<{widths[c]}} " for c in COLUMNS) + "│")
+    print(f"├{'─' * total_width}┤")
+
+    rows = min(max(len(columns[c]) for c in COLUMNS), max_rows)
+    for row in range(rows):
+        cells = []
+        for col in COLUMNS:
+            cards = columns[col]
+            title = cards[row]["title"] if row < len(cards) else ""
+            cells.append(f" {_fit(title, widths[col]):<{widths[col]}} ")
+        print("│" + "│".join(cells) + "│")
+
+    print(f"└{'─' * total_width}┘")
+
+    total = sum(board.count(c) for c in COLUMNS)
+    done = board.count("done")
+    print(f"\n📊 Total: {total} | ✅ Hecho: {done} ({int(done / total * 100) if total > 0 else 0}%)")
+
+def _print_cards(board: KanbanBoard, column: str):
+    print(f"\n{DISPLAY_TITLES.get(column, column)}:")
+    for card in board.cards(column):
+        status = ""
+        if card.get("started"):
+            status += "🔄"
+        if card.get("done"):
+            status += "✅"
+        print(f"  [{card['id'][-4:]}] {status} {card['title']}")
+
+def _print_archived(board: KanbanBoard, column: str):
+    from kanban_archive import KanbanArchive, archive_dir
+
+    entries = list(KanbanArchive(archive_dir(board.path)).iter_cards(column, exclude=board.index))
+    if entries:
+        print(f"\n🧊 {DISPLAY_TITLES.get(column, column)} (archivo):")
+    for entry in entries:
+        card = entry["card"]
+        print(f"  [{card['id'][-4:]}] {(card.get('done') or '')[:10]} {card['title']}")
+
+def list_cards(board: KanbanBoard, column: str = "all", archive: bool = False):
+    """Listar tarjetas (todas o de una columna); con `archive` incluye el archivo"""
+    for col in (COLUMNS if column == "all" else [column]):
+        _print_cards(board, col)
+        if archive and col in ("done", "archived"):
+            _print_archived(board, col)
+
+# ═══════════════════════════════════════════════════════════════
+#  REPORTES
+# ═══════════════════════════════════════════════════════════════
+
+def _rollups(board: KanbanBoard) -> Rollups:
+    return board.rollups or Rollups(kanban_rollups_path(board.path))
+
+def report(board: KanbanBoard):
+    """Reporte de actividades (completadas desde rollups)"""
+    today = date.today()
+    rollups = _rollups(board)
+    done_today = rollups.day(today)["completed"]
+    done_week = rollups.range(week_start(today), today)["completed"]
+
+    in_progress = sum(
+        1 for card in board.cards("progress")
+        if card.get("started") and not card.get("done")
+    )
+
+    print("📊 Reporte de Actividades")
+    print("=" * 40)
+    print(f"\n✅ Completadas hoy: {done_today}")
+    print(f"📅 Completadas esta semana: {done_week}")
+    print(f"🔄 En progreso: {in_progress}")
+    print(f"📚 Total en backlog: {board.count('backlog')}")
+    print(f"\n🎯 Progreso semanal: {done_week}/{WEEK_GOAL} ({int(done_week / WEEK_GOAL * 100)}%)")
+
+def export_report(board: KanbanBoard):
+    """Reporte semanal en markdown"""
+    today = date.today()
+    week = _rollups(board).range(week_start(today), today)
+
+    done_titles = [f"  • {task[1]}" for task in week["tasks"]]
+    in_progress = [f"  🔄 {card['title']}" for card in board.cards("progress")]
+
+    print(f"""📊 **Reporte Semanal - {today.strftime("%d/%m/%Y")}**
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+✅ **Completadas esta semana:** {len(done_titles)}
+
+{chr(10).join(done_titles) if done_titles else "  (sin tareas completadas)"}
+
+⏳ **En progreso:**
+{chr(10).join(in_progress) if in_progress else "  (sin tareas activas)"}
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+_Generado automáticamente por Kanban Tracker_
+""")
+
+# ═══════════════════════════════════════════════════════════════
+#  COMANDOS
+# ═══════════════════════════════════════════════════════════════
+
+def _cmd_create(board, args):
+    if not args:
+        print(f"{RED}❌ Falta título{NC}")
+        return False
+    title = args[0]
+    description = args[1] if len(args) > 1 else ""
+    column = args[2] if len(args) > 2 else "backlog"
+    card = board.create(title, description, column)
+    print(f"{GREEN}✅ Creada: {title}{NC} (ID: {card['id']})")
+    return True
+
+def _cmd_move(board, args):
+    if len(args) < 2:
+        print(f"{RED}❌ Uso: move ID columna{NC}")
+        return False
+    if not board.move(args[0], args[1]):
+        print(f"{RED}❌ No encontrada: {args[0]}{NC}")
+        return False
+    print(f"{YELLOW}🔄 Movida a '{args[1]}'{NC}")
+    return True
+
+def _cmd_list(board, args):
+    archive = "--archive" in args
+    args = [a for a in args if a != "--archive"]
+    list_cards(board, args[0] if args else "all", archive)
+    return True
+
+def _card_command(action, message):
+    def handler(board, args):
+        if not args:
+            print(f"{RED}❌ Falta ID{NC}")
+            return False
+        if not action(board, args[0]):
+            print(f"{RED}❌ No encontrada: {args[0]}{NC}")
+            return False
+        print(message.format(id=args[0]))
+        return True
+    return handler
+
+COMMANDS = {
+    "init": lambda board, args: True,   # crear el tablero si no existe (bajo lock)
+    "create": _cmd_create,
+    "move": _cmd_move,
+    "start": _card_command(KanbanBoard.start, f"{CYAN}🚀 Iniciada: {{id}}{NC}"),
+    "done": _card_command(KanbanBoard.done, f"{GREEN}✅ Completada: {{id}}{NC}"),
+    "delete": _card_command(KanbanBoard.delete, f"{RED}🗑️  Eliminada: {{id}}{NC}"),
+    "show": lambda board, args: show(board) or True,
+    "list": _cmd_list,
+    "report": lambda board, args: report(board) or True,
+    "export-report": lambda board, args: export_report(board) or True,
+}
+
+def run_command(board: KanbanBoard, argv: List[str]) -> bool:
+    """Ejecutar un comando sobre un tablero ya cargado"""
+    if not argv:
+        return True
+    handler = COMMANDS.get(argv[0])
+    if handler is None:
+        print(f"{RED}❌ Comando desconocido: {argv[0]}{NC}")
+        return False
+    try:
+        return handler(board, argv[1:])
+    except ValueError as e:
+        print(f"{RED}❌ {e}{NC}")
+        return False
+
+def run_batch(board: KanbanBoard, lines) -> int:
+    """Ejecutar comandos (uno por línea) con una sola carga y escritura"""
+    failures = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if not run_command(board, shlex.split(line)):
+            failures += 1
+    board.save()
+    return failures
+
+READ_COMMANDS = {"show", "list", "report", "export-report"}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv or argv[0] in READ_COMMANDS:
+        # Lectura sin lock; solo se escribe si el tablero o sus rollups aún no existen
+        board = KanbanBoard(KANBAN_FILE)
+        if board.dirty or board.rollups_missing():
+            with board.transaction():
+                pass
+        if not argv:
+            show(board)
+            return 0
+        return 0 if run_command(board, argv) else 1
+
+    # Escritura: el tablero se lee una sola vez, ya bajo lock
+    board = KanbanBoard(KANBAN_FILE, load=False)
+    if argv[0] == "batch":
+        lines = sys.stdin
+        if len(argv) > 1:
+            with open(argv[1], 'r') as f:
+                lines = f.readlines()
+        with board.transaction():
+            failures = run_batch(board, lines)
+        return 1 if failures else 0
+
+    with board.transaction():
+        ok = run_command(board, argv)
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+🧊 Kanban Archive - Almacenamiento frío para tarjetas terminadas
+Las tarjetas en 'done' o 'archived' con más de N días salen de kanban.json
+y pasan a particiones mensuales comprimidas junto al tablero:
+
+    kanban.archive/2026-10.jsonl.gz   → tarjetas (una por línea)
+    kanban.archive/index.json         → id → partición y palabras por partición
+
+Así kanban.json mantiene un tamaño pequeño y constante. Los rollups no se
+tocan: los reportes siguen contando lo archivado.
+
+Archivar escribe primero el archivo y luego el tablero; restaurar, al revés.
+Si algo se corta entre medias la tarjeta queda en los dos sitios, nunca en
+ninguno: gana el tablero y los lectores descartan la copia archivada.
+
+Uso:
+    python3 kanban_archive.py run [días]        → Archivar ahora (por defecto KANBAN_ARCHIVE_DAYS)
+    python3 kanban_archive.py search "texto"    → Buscar en el archivo
+    python3 kanban_archive.py list [YYYY-MM]    → Particiones o tarjetas de un mes
+    python3 kanban_archive.py restore ID        → Devolver una tarjeta al tablero
+"""
+
+import gzip
+import json
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from locking import atomic_write, atomic_write_json
+
+ARCHIVE_DAYS = int(os.environ.get("KANBAN_ARCHIVE_DAYS", "14"))
+ARCHIVE_COLUMNS = ("done", "archived")
+
+_WORD = re.compile(r"\w{3,}")
+
+def words_of(text: str) -> set:
+    return set(_WORD.findall(text.lower()))
+
+def archive_dir(kanban_file: str) -> str:
+    base, _ = os.path.splitext(kanban_file)
+    return f"{base}.archive"
+
+def _card_date(card: Dict) -> Optional[datetime]:
+    """Fecha que decide el archivado: restauración, fin, última modificación o creación"""
+    from kanban import _parse_date
+
+    # Una tarjeta restaurada cuenta su edad desde que volvió al tablero
+    for key in ("restored", "done", "updated", "created"):
+        if card.get(key):
+            return _parse_date(card[key])
+    return None
+
+# ═══════════════════════════════════════════════════════════════
+#  ARCHIVO
+# ═══════════════════════════════════════════════════════════════
+
+class KanbanArchive:
+    """Particiones mensuales .jsonl.gz con índice pequeño"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_file = os.path.join(path, "index.json")
+        self.index = {"partitions": {}, "ids": {}}
+        if os.path.exists(self.index_file):
+            with open(self.index_file, 'r') as f:
+                self.index = json.load(f)
+
+    def partition_file(self, month: str) -> str:
+        return os.path.join(self.path, f"{month}.jsonl.gz")
+
+    def save_index(self):
+        atomic_write_json(self.index_file, self.index)
+
+    # ── Escritura ──────────────────────────────────────────────
+
+    def add(self, entries: List[Dict]):
+        """Añadir tarjetas ({column, card}) a sus particiones
+
+        Si una tarjeta ya está en el índice (una restauración se cortó antes
+        de limpiar el archivo), la copia vieja se sustituye por la nueva.
+        """
+        stale: Dict[str, set] = {}
+        for entry in entries:
+            month = self.index["ids"].get(entry["card"]["id"])
+            if month is not None:
+                stale.setdefault(month, set()).add(entry["card"]["id"])
+        for month, ids in stale.items():
+            self._drop(month, ids)
+
+        by_month: Dict[str, List[Dict]] = {}
+        for entry in entries:
+            when = _card_date(entry["card"]) or datetime.now()
+            by_month.setdefault(when.strftime("%Y-%m"), []).append(entry)
+
+        os.makedirs(self.path, exist_ok=True)
+        for month, items in by_month.items():
+            # Cada escritura añade un miembro gzip; se leen como un solo flujo
+            with gzip.open(self.partition_file(month), 'at', encoding='utf-8') as f:
+                for entry in items:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+            part = self.index["partitions"].setdefault(month, {"cards": 0, "words": []})
+            words = set(part["words"])
+            for entry in items:
+                card = entry["card"]
+                words |= words_of(f"{card['title']} {card.get('description', '')}")
+                self.index["ids"][card["id"]] = month
+            part["cards"] += len(items)
+            part["words"] = sorted(words)
+        self.save_index()
+
+    def get(self, card_id: str) -> Optional[Dict]:
+        month = self.index["ids"].get(card_id)
+        if month is None:
+            return None
+        return next((e for e in self.read_partition(month) if e["card"]["id"] == card_id), None)
+
+    def _drop(self, month: str, ids: set) -> List[Dict]:
+        """Reescribir una partición sin `ids` (el índice se guarda aparte)"""
+        entries = list(self.read_partition(month))
+        found = [e for e in entries if e["card"]["id"] in ids]
+        rest = [e for e in entries if e["card"]["id"] not in ids]
+        text = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in rest)
+        atomic_write(self.partition_file(month), gzip.compress(text.encode("utf-8")))
+
+        for card_id in ids:
+            self.index["ids"].pop(card_id, None)
+        part = self.index["partitions"][month]
+        part["cards"] = len(rest)
+        part["words"] = sorted(set().union(*(
+            words_of(f"{e['card']['title']} {e['card'].get('description', '')}") for e in rest)))
+        return found
+
+    def remove(self, card_id: str) -> Optional[Dict]:
+        """Sacar una tarjeta del archivo (reescribe solo su partición)"""
+        month = self.index["ids"].get(card_id)
+        if month is None:
+            return None
+        found = self._drop(month, {card_id})
+        self.save_index()
+        return found[0] if found else None
+
+    # ── Lectura ────────────────────────────────────────────────
+
+    def read_partition(self, month: str) -> Iterator[Dict]:
+        path = self.partition_file(month)
+        if not os.path.exists(path):
+            return
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def iter_cards(self, column: Optional[str] = None, exclude=()) -> Iterator[Dict]:
+        """Tarjetas archivadas, una vez cada una; `exclude`: ids que siguen en el tablero"""
+        seen = set(exclude)
+        for month in sorted(self.index["partitions"]):
+            for entry in self.read_partition(month):
+                card_id = entry["card"]["id"]
+                if card_id in seen:
+                    continue
+                seen.add(card_id)
+                if column is None or entry["column"] == column:
+                    yield entry
+
+    def search(self, query: str) -> List[Dict]:
+        """Solo descomprime las particiones que contienen todas las palabras"""
+        terms = words_of(query)
+        needle = query.lower()
+        results, seen = [], set()
+        for month, part in sorted(self.index["partitions"].items()):
+            if terms and not terms.issubset(part["words"]):
+                continue
+            for entry in self.read_partition(month):
+                card = entry["card"]
+                if card["id"] in seen:
+                    continue
+                seen.add(card["id"])
+                text = f"{card['title']} {card.get('description', '')}".lower()
+                if (terms and terms.issubset(words_of(text))) or needle in text:
+                    results.append(entry)
+        return results
+
+# ═══════════════════════════════════════════════════════════════
+#  TIERING
+# ═══════════════════════════════════════════════════════════════
+
+def archive_board(board, days: int = ARCHIVE_DAYS) -> int:
+    """Mover al archivo las tarjetas terminadas hace más de `days` días"""
+    cutoff = datetime.now() - timedelta(days=days)
+    entries = []
+    for column in ARCHIVE_COLUMNS:
+        for card in list(board.cards(column)):
+            when = _card_date(card)
+            if when is not None and when < cutoff:
+                entries.append({"column": column, "archived": datetime.now().isoformat(timespec="seconds"),
+                                "card": card})
+    if entries:
+        # Primero el archivo: si se corta antes de guardar el tablero, la tarjeta sigue en él
+        KanbanArchive(archive_dir(board.path)).add(entries)
+        for entry in entries:
+            board.evict(entry["card"]["id"])
+    board.data["last_archive"] = datetime.now().strftime("%Y-%m-%d")
+    board.dirty = True
+    return len(entries)
+
+def restore_card(board, card_id: str) -> bool:
+    """Devolver una tarjeta archivada a su columna (y que no se archive al día siguiente)"""
+    from kanban import now_iso
+
+    archive = KanbanArchive(archive_dir(board.path))
+    entry = archive.get(card_id)
+    if entry is None or board.get(card_id) is not None:
+        return False
+    card = entry["card"]
+    card["restored"] = now_iso()
+    board.restore(entry["column"], card)
+    # Primero el tablero: si se corta antes de limpiar el archivo, la copia archivada se ignora
+    board.save()
+    archive.remove(card_id)
+    return True
+
+# ═══════════════════════════════════════════════════════════════
+#  CLI
+# ═══════════════════════════════════════════════════════════════
+
+def _print_entry(entry: Dict):
+    card = entry["card"]
+    when = (card.get("done") or card.get("created") or "")[:10]
+    print(f"  [{card['id'][-4:]}] {when} {entry['column']:8} {card['title']}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from kanban import KANBAN_FILE, KanbanBoard
+
+    argv = sys.argv[1:] if argv is None else argv
+    command, args = (argv[0], argv[1:]) if argv else ("list", [])
+    archive = KanbanArchive(archive_dir(KANBAN_FILE))
+
+    if command == "run":
+        board = KanbanBoard(KANBAN_FILE, load=False)
+        with board.transaction():
+            moved = archive_board(board, int(args[0]) if args else ARCHIVE_DAYS)
+        print(f"🧊 {moved} tarjetas archivadas")
+        return 0
+
+    if command == "search" and args:
+        results = archive.search(" ".join(args))
+        print(f"\n🔎 {len(results)} en el archivo:")
+        for entry in results:
+            _print_entry(entry)
+        return 0
+
+    if command == "list":
+        if args:
+            for entry in archive.read_partition(args[0]):
+                _print_entry(entry)
+            return 0
+        print("\n🧊 Archivo:")
+        for month, part in sorted(archive.index["partitions"].items()):
+            print(f"  {month}: {part['cards']} tarjetas")
+        return 0
+
+    if command == "restore" and args:
+        board = KanbanBoard(KANBAN_FILE, load=False)
+        with board.transaction():
+            restored = restore_card(board, args[0])
+        if not restored:
+            print(f"❌ No está en el archivo: {args[0]}")
+            return 1
+        print(f"♻️  Restaurada: {args[0]}")
+        return 0
+
+    print(__doc__)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
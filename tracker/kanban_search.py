@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+🔎 Kanban Search - Búsqueda indexada de tarjetas (tablero + archivo)
+Índice invertido en SQLite junto al tablero (kanban.search.db):
+
+    cards(id, title, description, column, created, started, done, archived, norm_title)
+    terms(term, card_id)   → palabra → tarjetas (título y descripción)
+
+`lookup` busca por `norm_title` (título normalizado, indexado): no depende
+de las palabras ni de un límite de candidatos.
+
+Filtros indexados por columna y por rangos de created/started/done.
+El índice se actualiza de forma incremental antes de cada consulta: solo se
+reindexan las tarjetas con `seq` nuevo y las que entraron o salieron del tablero.
+
+Uso:
+    python3 kanban_search.py "texto" [--column done] [--done 2026-10-01..2026-10-19]
+                             [--created DESDE..HASTA] [--started DESDE..HASTA]
+                             [--hot] [--limit N]
+    python3 kanban_search.py lookup "título" [columna]   → ID de la tarjeta con ese título exacto (para hooks;
+                                                           sale con 1 si no existe, 2 si es ambiguo)
+    python3 kanban_search.py rebuild
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from kanban import COLUMNS, KANBAN_FILE, KanbanBoard, _parse_date
+from kanban_archive import KanbanArchive, archive_dir
+
+_TOKEN = re.compile(r"\w{2,}")
+_WORDS = re.compile(r"\w+")
+
+DATE_FIELDS = ("created", "started", "done")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    "column" TEXT NOT NULL,
+    created TEXT,
+    started TEXT,
+    done TEXT,
+    archived INTEGER NOT NULL DEFAULT 0,
+    norm_title TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT NOT NULL,
+    card_id TEXT NOT NULL,
+    PRIMARY KEY (term, card_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS terms_card ON terms(card_id);
+CREATE INDEX IF NOT EXISTS cards_column ON cards("column");
+CREATE INDEX IF NOT EXISTS cards_created ON cards(created);
+CREATE INDEX IF NOT EXISTS cards_started ON cards(started);
+CREATE INDEX IF NOT EXISTS cards_done ON cards(done);
+CREATE INDEX IF NOT EXISTS cards_archived ON cards(archived);
+CREATE INDEX IF NOT EXISTS cards_norm_title ON cards(norm_title);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+def normalize_title(text: str) -> str:
+    """Título sin mayúsculas, puntuación ni espacios repetidos"""
+    return " ".join(_WORDS.findall(text.lower()))
+
+def search_db_path(kanban_file: str) -> str:
+    base, _ = os.path.splitext(kanban_file)
+    return f"{base}.search.db"
+
+def _norm_date(value: Optional[str]) -> Optional[str]:
+    """ISO comparable como texto (hora local, sin zona)"""
+    return _parse_date(value).isoformat(timespec="seconds") if value else None
+
+def parse_range(spec: str) -> Tuple[Optional[str], Optional[str]]:
+    """'2026-10-01..2026-10-19' → [desde, hasta) en ISO; un extremo puede faltar"""
+    start, sep, end = spec.partition("..")
+    if not sep:
+        end = start
+    upper = (date.fromisoformat(end) + timedelta(days=1)).isoformat() if end else None
+    return (start or None), upper
+
+# ═══════════════════════════════════════════════════════════════
+#  ÍNDICE
+# ═══════════════════════════════════════════════════════════════
+
+class CardIndex:
+    """Índice invertido + filtros sobre tarjetas del tablero y del archivo"""
+
+    def __init__(self, board: KanbanBoard, db_path: Optional[str] = None):
+        self.board = board
+        self.db_path = db_path or search_db_path(board.path)
+        fresh = not os.path.exists(self.db_path)
+        self.db = sqlite3.connect(self.db_path)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(cards)")}
+        if columns and "norm_title" not in columns:
+            # Índice de una versión anterior: es derivado, se reconstruye
+            self.db.executescript("DROP TABLE cards; DROP TABLE IF EXISTS terms;")
+            fresh = True
+        self.db.executescript(SCHEMA)
+        if fresh:
+            self.rebuild()
+
+    def close(self):
+        self.db.close()
+
+    def _meta(self, key: str, default: str = "") -> str:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    # ── Escritura ──────────────────────────────────────────────
+
+    def _upsert(self, rows: Iterable[Tuple[str, Dict, bool]]):
+        cards, terms, ids = [], [], []
+        for column, card, archived in rows:
+            ids.append((card["id"],))
+            cards.append((card["id"], card["title"], card.get("description", ""), column,
+                          _norm_date(card.get("created")), _norm_date(card.get("started")),
+                          _norm_date(card.get("done")), int(archived), normalize_title(card["title"])))
+            for term in set(tokenize(f"{card['title']} {card.get('description', '')}")):
+                terms.append((term, card["id"]))
+        self.db.executemany("DELETE FROM terms WHERE card_id = ?", ids)
+        self.db.executemany("INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", cards)
+        self.db.executemany("INSERT OR IGNORE INTO terms VALUES (?, ?)", terms)
+
+    def _delete(self, card_ids: Iterable[str]):
+        ids = [(cid,) for cid in card_ids]
+        self.db.executemany("DELETE FROM terms WHERE card_id = ?", ids)
+        self.db.executemany("DELETE FROM cards WHERE id = ?", ids)
+
+    def rebuild(self):
+        """Indexar todo: tablero y archivo"""
+        with self.db:
+            self.db.execute("DELETE FROM terms")
+            self.db.execute("DELETE FROM cards")
+            archive = KanbanArchive(archive_dir(self.board.path))
+            self._upsert((e["column"], e["card"], True) for e in archive.iter_cards())
+            self._upsert((col, card, False) for col in COLUMNS for card in self.board.cards(col))
+            self._set_meta("seq", self.board.data.get("seq", 0))
+
+    def refresh(self):
+        """Actualización incremental antes de consultar"""
+        seq = int(self._meta("seq", "0"))
+        board = self.board
+        changed, _ = board.changed_since(seq)
+        indexed_hot = {row[0] for row in self.db.execute("SELECT id FROM cards WHERE archived = 0")}
+        hot = set(board.index)
+
+        rows = [(col, card, False) for col, card in changed]
+        # Restauradas del archivo o sin seq (tableros antiguos)
+        rows += [(board.locate(cid), board.get(cid), False)
+                 for cid in hot - indexed_hot if board.get(cid).get("seq", 0) <= seq]
+        gone = indexed_hot - hot
+        if not rows and not gone and board.data.get("seq", 0) == seq:
+            return
+
+        with self.db:
+            self._upsert(rows)
+            if gone:
+                archive = KanbanArchive(archive_dir(board.path))
+                archived = [cid for cid in gone if cid in archive.index["ids"]]
+                self.db.executemany("UPDATE cards SET archived = 1 WHERE id = ?", [(c,) for c in archived])
+                self._delete(gone - set(archived))
+            self._set_meta("seq", board.data.get("seq", 0))
+
+    # ── Consultas ──────────────────────────────────────────────
+
+    def search(self, text: str = "", column: Optional[str] = None,
+               created: Optional[Tuple] = None, started: Optional[Tuple] = None,
+               done: Optional[Tuple] = None, include_archive: bool = True,
+               limit: int = 50) -> List[Dict]:
+        """Tarjetas con todas las palabras (la última como prefijo) y filtros"""
+        sql = ['SELECT id, title, description, "column", created, started, done, archived FROM cards WHERE 1']
+        params: List = []
+
+        terms = tokenize(text)
+        for i, term in enumerate(terms):
+            if i == len(terms) - 1:
+                sql.append("AND id IN (SELECT card_id FROM terms WHERE term >= ? AND term < ?)")
+                params += [term, term + "\uffff"]
+            else:
+                sql.append("AND id IN (SELECT card_id FROM terms WHERE term = ?)")
+                params.append(term)
+
+        if column:
+            sql.append('AND "column" = ?')
+            params.append(column)
+        for name, bounds in (("created", created), ("started", started), ("done", done)):
+            if not bounds:
+                continue
+            low, high = bounds
+            if low:
+                sql.append(f"AND {name} >= ?")
+                params.append(low)
+            if high:
+                sql.append(f"AND {name} < ?")
+                params.append(high)
+        if not include_archive:
+            sql.append("AND archived = 0")
+
+        sql.append("ORDER BY COALESCE(done, started, created) DESC LIMIT ?")
+        params.append(limit)
+        keys = ("id", "title", "description", "column", "created", "started", "done", "archived")
+        return [dict(zip(keys, row)) for row in self.db.execute(" ".join(sql), params)]
+
+    def exact_matches(self, title: str, column: Optional[str] = None) -> List[str]:
+        """IDs de las tarjetas del tablero con ese título normalizado (como mucho 2)"""
+        sql = "SELECT id FROM cards WHERE norm_title = ? AND archived = 0"
+        params: List = [normalize_title(title)]
+        if column:
+            sql += ' AND "column" = ?'
+            params.append(column)
+        return [row[0] for row in self.db.execute(sql + " LIMIT 2", params)]
+
+    def lookup(self, title: str, column: Optional[str] = None) -> Optional[str]:
+        """ID de la única tarjeta con ese título (normalizado); None si no hay o es ambiguo
+
+        Sin coincidencia aproximada: el hook de fin de tarea marcaría otra tarjeta.
+        """
+        exact = self.exact_matches(title, column)
+        return exact[0] if len(exact) == 1 else None
+
+def open_index(kanban_file: str = KANBAN_FILE) -> CardIndex:
+    """Índice al día del tablero (solo lectura del tablero)"""
+    board = KanbanBoard(kanban_file, auto_archive=False)
+    index = CardIndex(board)
+    index.refresh()
+    return index
+
+# ═══════════════════════════════════════════════════════════════
+#  CLI
+# ═══════════════════════════════════════════════════════════════
+
+def _print_results(results: List[Dict], elapsed: float):
+    print(f"\n🔎 {len(results)} tarjetas ({elapsed * 1000:.1f} ms)")
+    for r in results:
+        when = (r["done"] or r["started"] or r["created"] or "")[:10]
+        where = f"{r['column']}{' 🧊' if r['archived'] else ''}"
+        print(f"  [{r['id'][-4:]}] {when} {where:11} {r['title']}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return 1
+
+    if argv[0] == "rebuild":
+        board = KanbanBoard(KANBAN_FILE, auto_archive=False)
+        index = CardIndex(board)
+        index.rebuild()
+        count = index.db.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+        print(f"✅ Índice reconstruido: {count} tarjetas")
+        return 0
+
+    if argv[0] == "lookup" and len(argv) > 1:
+        exact = open_index().exact_matches(argv[1], argv[2] if len(argv) > 2 else None)
+        if len(exact) == 1:
+            print(exact[0])
+            return 0
+        return 2 if exact else 1
+
+    text, filters, limit, hot = [], {}, 50, False
+    args = iter(argv)
+    for arg in args:
+        if arg == "--column":
+            filters["column"] = next(args)
+        elif arg.lstrip("-") in DATE_FIELDS and arg.startswith("--"):
+            filters[arg[2:]] = parse_range(next(args))
+        elif arg == "--limit":
+            limit = int(next(args))
+        elif arg == "--hot":
+            hot = True
+        else:
+            text.append(arg)
+
+    start = time.perf_counter()
+    index = open_index()
+    results = index.search(" ".join(text), include_archive=not hot, limit=limit, **filters)
+    _print_results(results, time.perf_counter() - start)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
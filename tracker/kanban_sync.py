@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+🔁 Kanban Sync - Sincronización incremental kanban.json ↔ Fizzy
+Solo se transfiere lo que cambió desde la última sincronización:
+
+    local  → tarjetas con `seq` mayor que la marca guardada (y borrados)
+    remoto → GET /boards/:id/cards?updated_since=<marca>
+
+Estado en <kanban>.sync.json: marcas de agua y vínculo id local ↔ id remoto
+con la última versión sincronizada de cada tarjeta.
+
+El lock del tablero no se retiene durante la red: plan y envío trabajan sobre
+una foto; lo recibido se aplica después bajo lock, saltando las tarjetas que
+otro escritor cambió entretanto (comparando su `version`).
+
+Una edición remota de una tarjeta ya archivada en local la devuelve al
+tablero (kanban_archive.restore_card) con el cambio aplicado: la marca
+remota avanza sin perderla.
+
+Conflictos (la tarjeta cambió en ambos lados):
+    newest → gana el cambio más reciente (por defecto)
+    local  → gana el tablero local
+    remote → gana Fizzy
+
+Uso:
+    python3 kanban_sync.py [--dry-run] [--policy newest|local|remote]
+"""
+
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from fizzy_api import FizzyClient, FizzyError
+from kanban import COLUMNS, KANBAN_FILE, KanbanBoard, _parse_date
+from kanban_archive import KanbanArchive, archive_dir, restore_card
+from locking import atomic_write_json, file_lock
+
+DEFAULT_COLUMN_IDS = {"backlog": "1", "progress": "2", "done": "3", "thisweek": "4", "archived": "5"}
+
+# Columna local → ID de columna en Fizzy (FIZZY_COLUMN_BACKLOG, FIZZY_COLUMN_DONE, ...)
+COLUMN_IDS = {col: os.environ.get(f"FIZZY_COLUMN_{col.upper()}", DEFAULT_COLUMN_IDS[col])
+              for col in COLUMNS}
+COLUMN_NAMES = {cid: col for col, cid in COLUMN_IDS.items()}
+
+POLICIES = ("newest", "local", "remote")
+
+def sync_state_path(kanban_file: str) -> str:
+    base, _ = os.path.splitext(kanban_file)
+    return f"{base}.sync.json"
+
+@dataclass
+class SyncAction:
+    """Un cambio a aplicar en un sentido"""
+    direction: str                    # "push" (local → Fizzy) | "pull" (Fizzy → local)
+    kind: str                         # "create" | "update" | "delete"
+    local_id: Optional[str] = None
+    remote_id: Optional[str] = None
+    fields: Dict = field(default_factory=dict)   # title / description / column
+    conflict: bool = False
+
+    def describe(self) -> str:
+        arrow = "⬆️ " if self.direction == "push" else "⬇️ "
+        target = self.local_id or "nueva"
+        remote = f"#{self.remote_id}" if self.remote_id else "nueva"
+        changes = ", ".join(f"{k}={v!r}" for k, v in self.fields.items())
+        note = "  ⚠️ conflicto" if self.conflict else ""
+        return f"{arrow} {self.kind:6} [{target} ↔ {remote}] {changes}{note}"
+
+# ═══════════════════════════════════════════════════════════════
+#  MOTOR DE SINCRONIZACIÓN
+# ═══════════════════════════════════════════════════════════════
+
+class KanbanSync:
+    """Calcula y aplica el delta entre el tablero local y Fizzy"""
+
+    def __init__(self, board: KanbanBoard, client: Optional[FizzyClient] = None,
+                 state_path: Optional[str] = None, policy: str = "newest"):
+        if policy not in POLICIES:
+            raise ValueError(f"Política desconocida: {policy}")
+        self.board = board
+        self.client = client or FizzyClient()
+        self.state_path = state_path or sync_state_path(board.path)
+        self.policy = policy
+        self.state = self._load_state()
+        self._remote_seen: List[Dict] = []
+        self._archive: Optional[KanbanArchive] = None
+
+    # ── Estado ─────────────────────────────────────────────────
+
+    def _load_state(self) -> Dict:
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        return {"local_seq": 0, "remote_since": None, "links": {}}
+
+    def save_state(self):
+        atomic_write_json(self.state_path, self.state, indent=2)
+
+    def _remote_index(self) -> Dict[str, str]:
+        return {link["remote_id"]: lid for lid, link in self.state["links"].items()}
+
+    def _link(self, local_id: str, remote_id: str, fields: Dict, remote_updated: Optional[str] = None):
+        self.state["links"][local_id] = {
+            "remote_id": str(remote_id),
+            "title": fields.get("title"),
+            "description": fields.get("description"),
+            "column": fields.get("column"),
+            "remote_updated": remote_updated,
+        }
+
+    # ── Comparación ────────────────────────────────────────────
+
+    @staticmethod
+    def _local_fields(column: str, card: Dict) -> Dict:
+        return {"title": card["title"], "description": card.get("description", ""), "column": column}
+
+    @staticmethod
+    def _remote_fields(remote: Dict) -> Dict:
+        fields = {"title": remote.get("title", ""), "description": remote.get("description") or ""}
+        column = COLUMN_NAMES.get(str(remote.get("column_id")))
+        if column:
+            fields["column"] = column
+        return fields
+
+    @staticmethod
+    def _diff(new: Dict, old: Dict) -> Dict:
+        return {k: v for k, v in new.items() if old.get(k) != v}
+
+    def _archived_fields(self, lid: str) -> Optional[Dict]:
+        """Campos de una tarjeta que ya no está en el tablero sino en el archivo"""
+        if self._archive is None:
+            self._archive = KanbanArchive(archive_dir(self.board.path))
+        entry = self._archive.get(lid)
+        return self._local_fields(entry["column"], entry["card"]) if entry else None
+
+    def _local_wins(self, card: Dict, remote: Dict) -> bool:
+        if self.policy != "newest":
+            return self.policy == "local"
+        local_ts, remote_ts = card.get("updated"), remote.get("updated_at")
+        if not local_ts or not remote_ts:
+            return remote_ts is None
+        return _parse_date(local_ts) >= _parse_date(remote_ts)
+
+    # ── Plan ───────────────────────────────────────────────────
+
+    def plan(self) -> List[SyncAction]:
+        """Delta en ambos sentidos (solo lee)"""
+        links = self.state["links"]
+        remote_index = self._remote_index()
+        changed, deleted = self.board.changed_since(self.state["local_seq"])
+        local_changed = {card["id"]: (col, card) for col, card in changed}
+        remote_changed = self.client.list_cards(updated_since=self.state["remote_since"])
+
+        actions: List[SyncAction] = []
+        handled = set()
+
+        for remote in remote_changed:
+            rid = str(remote["id"])
+            lid = remote_index.get(rid)
+            link = links.get(lid) if lid else None
+            # Eco de nuestro propio push
+            if link and remote.get("updated_at") and link.get("remote_updated") == remote["updated_at"]:
+                continue
+            fields = self._remote_fields(remote)
+            # Igual que lo último sincronizado (p. ej. nuestro propio create): nada que bajar
+            if link and not remote.get("deleted") and not self._diff(fields, link):
+                continue
+
+            if remote.get("deleted"):
+                if lid is None or lid in deleted:
+                    continue
+                handled.add(lid)
+                if lid in local_changed and self._local_wins(local_changed[lid][1], remote):
+                    col, card = local_changed[lid]
+                    actions.append(SyncAction("push", "create", lid, None,
+                                              self._local_fields(col, card), conflict=True))
+                else:
+                    actions.append(SyncAction("pull", "delete", lid, rid, conflict=lid in local_changed))
+                continue
+
+            if lid is None:
+                actions.append(SyncAction("pull", "create", None, rid, fields))
+                continue
+
+            handled.add(lid)
+            if lid in deleted:
+                # Borrada aquí, modificada allí: sin fecha de borrado, gana la edición
+                if self.policy == "local":
+                    actions.append(SyncAction("push", "delete", lid, rid, conflict=True))
+                else:
+                    actions.append(SyncAction("pull", "create", None, rid, fields, conflict=True))
+                continue
+
+            if lid in local_changed:
+                col, card = local_changed[lid]
+                if self._local_wins(card, remote):
+                    delta = self._diff(self._local_fields(col, card), fields)
+                    if delta:
+                        actions.append(SyncAction("push", "update", lid, rid, delta, conflict=True))
+                    continue
+                card_fields = self._local_fields(col, card)
+                delta = self._diff(fields, card_fields)
+                if delta:
+                    actions.append(SyncAction("pull", "update", lid, rid, delta, conflict=True))
+                continue
+
+            column = self.board.locate(lid)
+            current = (self._local_fields(column, self.board.get(lid)) if column
+                       else self._archived_fields(lid))
+            if current is None:
+                continue
+            delta = self._diff(fields, current)
+            if delta:
+                actions.append(SyncAction("pull", "update", lid, rid, delta))
+
+        for lid, (col, card) in local_changed.items():
+            if lid in handled:
+                continue
+            link = links.get(lid)
+            current = self._local_fields(col, card)
+            if link is None:
+                actions.append(SyncAction("push", "create", lid, None, current))
+                continue
+            delta = self._diff(current, link)
+            if delta:
+                actions.append(SyncAction("push", "update", lid, link["remote_id"], delta))
+
+        for lid in deleted:
+            if lid not in handled and lid in links:
+                actions.append(SyncAction("push", "delete", lid, links[lid]["remote_id"]))
+
+        self._remote_seen = remote_changed
+        return actions
+
+    # ── Aplicar ────────────────────────────────────────────────
+
+    def _apply_column(self, lid: str, column: str):
+        """Mover y marcar inicio/fin como lo haría el usuario"""
+        self.board.move(lid, column)
+        card = self.board.get(lid)
+        if column == "progress" and not card.get("started"):
+            self.board.start(lid)
+        elif column == "done" and not card.get("done"):
+            self.board.done(lid)
+
+    def _push(self, action: SyncAction):
+        client = self.client
+        lid = action.local_id
+        if action.kind == "delete":
+            client.delete_card(action.remote_id)
+            self.state["links"].pop(lid, None)
+            return
+        current = self._local_fields(self.board.locate(lid), self.board.get(lid))
+        if action.kind == "create":
+            rid = client.create_card(current["title"], current["description"], COLUMN_IDS[current["column"]])
+            self._link(lid, rid, current)
+            return
+        response = None
+        text = {k: v for k, v in action.fields.items() if k != "column"}
+        if text:
+            response = client.update_card(action.remote_id, text)
+        if "column" in action.fields:
+            response = client.move_card(action.remote_id, COLUMN_IDS[action.fields["column"]])
+        updated = response.get("updated_at") if isinstance(response, dict) else None
+        self._link(lid, action.remote_id, current, updated)
+
+    def _pull(self, action: SyncAction, remote: Dict):
+        board = self.board
+        fields = action.fields
+        if action.kind == "delete":
+            board.delete(action.local_id)
+            self.state["links"].pop(action.local_id, None)
+            return
+        if action.kind == "create":
+            card = board.create(fields.get("title", ""), fields.get("description", ""))
+            lid = card["id"]
+            # Recreada tras un borrado local: el vínculo viejo ya no vale
+            for old in [k for k, l in self.state["links"].items() if l["remote_id"] == action.remote_id]:
+                del self.state["links"][old]
+        else:
+            lid = action.local_id
+            if board.get(lid) is None and not restore_card(board, lid):
+                return
+            board.update(lid, title=fields.get("title"), description=fields.get("description"))
+        if fields.get("column") and board.locate(lid) != fields["column"]:
+            self._apply_column(lid, fields["column"])
+        column = board.locate(lid)
+        self._link(lid, action.remote_id, self._local_fields(column, board.get(lid)),
+                   remote.get("updated_at"))
+
+    def push(self, actions: List[SyncAction]) -> Dict:
+        """Enviar a Fizzy (red, sin el lock del tablero) desde la foto del plan"""
+        stats = {"push": 0, "pull": 0, "conflicts": 0, "errors": 0, "stale": 0}
+        try:
+            for action in actions:
+                if action.direction != "push":
+                    continue
+                self._push(action)
+                stats["push"] += 1
+                stats["conflicts"] += action.conflict
+        except FizzyError as e:
+            stats["errors"] += 1
+            print(f"❌ {e}")
+        finally:
+            # Los vínculos de lo ya creado en Fizzy no se pueden perder
+            self.save_state()
+        return stats
+
+    def pull(self, board: KanbanBoard, actions: List[SyncAction], stats: Dict) -> Dict:
+        """Aplicar lo de Fizzy al tablero recargado bajo lock
+
+        Una tarjeta que otro escritor cambió desde la foto no se pisa: la acción
+        se salta y la marca remota no avanza, así que vuelve en la próxima ronda.
+        """
+        snapshot, self.board = self.board, board
+        remote_by_id = {str(r["id"]): r for r in self._remote_seen}
+        concurrent = board.data.get("seq", 0) != snapshot.data.get("seq", 0)
+        for action in actions:
+            if action.direction != "pull":
+                continue
+            lid = action.local_id
+            if lid and (board.get(lid) or {}).get("version") != (snapshot.get(lid) or {}).get("version"):
+                stats["stale"] += 1
+                continue
+            self._pull(action, remote_by_id.get(action.remote_id, {}))
+            stats["pull"] += 1
+            stats["conflicts"] += action.conflict
+
+        if not stats["errors"]:
+            # Lo aplicado desde Fizzy también subió el seq local: no es delta para el próximo push.
+            # Con escritores concurrentes, sus cambios sí lo son: la marca se queda en la foto.
+            local_seq = snapshot.data.get("seq", 0) if concurrent else board.data.get("seq", 0)
+            self.state["local_seq"] = local_seq
+            stamps = [r["updated_at"] for r in remote_by_id.values() if r.get("updated_at")]
+            if stamps and not stats["stale"]:
+                self.state["remote_since"] = max(stamps + [self.state["remote_since"] or stamps[0]])
+            board.forget_deleted(local_seq)
+        self.save_state()
+        return stats
+
+    def run(self, dry_run: bool = False) -> List[SyncAction]:
+        """Plan y envío sin lock; lo que llega de Fizzy se aplica en una transacción corta"""
+        actions = self.plan()
+        if dry_run:
+            return actions
+        stats = self.push(actions)
+        live = KanbanBoard(self.board.path, track_rollups=self.board.track_rollups,
+                           auto_archive=self.board.auto_archive, load=False)
+        with live.transaction():
+            self.last_stats = self.pull(live, actions, stats)
+        return actions
+
+# ═══════════════════════════════════════════════════════════════
+#  CLI
+# ═══════════════════════════════════════════════════════════════
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    dry_run = "--dry-run" in argv
+    policy = "newest"
+    if "--policy" in argv:
+        policy = argv[argv.index("--policy") + 1]
+
+    sync_lock = f"{sync_state_path(KANBAN_FILE)}.lock"
+    client = FizzyClient()
+    try:
+        with file_lock(sync_lock, blocking=False) as acquired:
+            if not acquired:
+                print("⏳ Ya hay una sincronización en marcha")
+                return 0
+            # El lock del tablero solo se toma para la foto y para aplicar lo recibido
+            board = KanbanBoard(KANBAN_FILE, load=False)
+            board.snapshot()
+            sync = KanbanSync(board, client, policy=policy)
+            actions = sync.run(dry_run=dry_run)
+    except FizzyError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        client.close()
+
+    print(f"\n🔁 {'Diferencias (dry-run)' if dry_run else 'Sincronización'} kanban ↔ Fizzy")
+    for action in actions:
+        print(f"  {action.describe()}")
+    if not actions:
+        print("  ✅ Sin cambios")
+    if not dry_run:
+        s = sync.last_stats
+        print(f"\n  ⬆️  {s['push']}  ⬇️  {s['pull']}  ⚠️  {s['conflicts']} conflictos")
+        if s["stale"]:
+            print(f"  ⏭️  {s['stale']} cambiadas en local durante la sincronización: en la próxima ronda")
+        return 1 if s["errors"] else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+🔒 Locking - Escrituras serializadas y commits atómicos
+Los escritores toman un lock exclusivo (flock sobre <archivo>.lock), leen la
+versión actual, modifican y publican con un rename atómico. Los lectores no
+toman lock: abren el archivo y siempre ven una versión completa (inmutable).
+"""
+
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Union
+
+def lock_path(path: str) -> str:
+    return f"{path}.lock"
+
+@contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """Lock exclusivo entre procesos; con blocking=False cede False si está tomado"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        yield True
+    finally:
+        os.close(fd)  # cerrar el descriptor libera el flock
+
+def atomic_write(path: str, content: Union[str, bytes], fsync: bool = True):
+    """Escribir a un temporal del mismo directorio, fsync y rename
+
+    El temporal lleva pid e id de hilo: dos hilos del mismo proceso que
+    escriben el mismo archivo no se pisan el temporal. fsync=False para
+    estado que se puede perder (caché, métricas) y se escribe a menudo.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, 'wb' if isinstance(content, bytes) else 'w') as f:
+            f.write(content)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def atomic_write_json(path: str, data, indent=None, fsync: bool = True):
+    atomic_write(path, json.dumps(data, indent=indent, ensure_ascii=False), fsync)
@@ -19,6 +19,18 @@ MOLTBOT_FIZZY_COLUMN_BACKLOG="${MOLTBOT_FIZZY_COLUMN_BACKLOG:-1}"
 MOLTBOT_FIZZY_COLUMN_PROGRESS="${MOLTBOT_FIZZY_COLUMN_PROGRESS:-2}"
 MOLTBOT_FIZZY_COLUMN_DONE="${MOLTBOT_FIZZY_COLUMN_DONE:-3}"
 
+# Cola local (write-behind): los hooks no esperan a la API de Fizzy
+TRACKER_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+FIZZY_OUTBOX_PY="$TRACKER_DIR/fizzy_outbox.py"
+
+_moltbot_outbox() {
+    MOLTBOT_FIZZY_URL="$MOLTBOT_FIZZY_URL" \
+    MOLTBOT_FIZZY_TOKEN="$MOLTBOT_FIZZY_TOKEN" \
+    MOLTBOT_FIZZY_BOARD="$MOLTBOT_FIZZY_BOARD" \
+    MOLTBOT_FIZZY_COLUMN_DONE="$MOLTBOT_FIZZY_COLUMN_DONE" \
+        python3 "$FIZZY_OUTBOX_PY" "$@"
+}
+
 # ═══════════════════════════════════════════════════════════════
 #  API SIMPLIFICADA PARA INTEGRACIÓN
 # ═══════════════════════════════════════════════════════════════
@@ -73,11 +85,12 @@ moltbot_fizzy_on_task_start() {
     
     echo "[Fizzy] 🚀 Iniciando: $task_title"
     
-    card_id=$(moltbot_fizzy_create_card "$task_title" "$task_context (Iniciado: $(date))" "$MOLTBOT_FIZZY_COLUMN_PROGRESS")
+    # Se encola al instante; el syncer en segundo plano crea la tarjeta
+    card_id=$(_moltbot_outbox create "$task_title" "$task_context (Iniciado: $(date))" "$MOLTBOT_FIZZY_COLUMN_PROGRESS")
     
     if [ -n "$card_id" ]; then
-        echo "[Fizzy] ✅ Tarjeta #$card_id creada en 'En Progreso'"
-        echo "$card_id" >> ~/.fizzy/active_tasks.log
+        echo "[Fizzy] ✅ Tarjeta $card_id en cola para 'En Progreso'"
+        python3 "$FIZZY_EVENTS_PY" start "$card_id" "$task_title"
     fi
 }
 
@@ -88,23 +101,36 @@ moltbot_fizzy_on_task_complete() {
     
     echo "[Fizzy] ✅ Completando: $task_title"
     
-    # Buscar tarjeta activa
-    if [ -f ~/.fizzy/active_tasks.log ]; then
-        local card_id=$(grep "$task_title" ~/.fizzy/active_tasks.log | tail -1 | cut -d' ' -f1)
+    # Cerrar la tarea activa con ese título (más reciente) en el log de eventos
+    local finished
+    finished=$(python3 "$FIZZY_EVENTS_PY" complete "$task_title" "$duration_seconds")
+    
+    if [ -n "$finished" ]; then
+        local card_id=${finished%% *}
+        local duration=${finished##* }
         
-        if [ -n "$card_id" ]; then
-            moltbot_fizzy_move_card "$card_id" "$MOLTBOT_FIZZY_COLUMN_DONE"
-            
-            # Registrar tiempo
-            if [ -n "$duration_seconds" ]; then
-                local mins=$((duration_seconds / 60))
-                echo "[Fizzy] ⏱️  Tiempo registrado: ${mins} minutos"
-            fi
-            
-            # Actualizar log
-            sed -i "s/^$card_id.*/$card_id $task_title (done: $(date +%s))/" ~/.fizzy/active_tasks.log
-        fi
+        # Si el create aún no se envió, se fusiona en uno solo ya en 'Hecho'
+        _moltbot_outbox move "$card_id" "$MOLTBOT_FIZZY_COLUMN_DONE"
+        
+        local mins=$((duration / 60))
+        echo "[Fizzy] ⏱️  Tiempo registrado: ${mins} minutos"
     fi
+    
+    # Tarjeta del kanban local con ese título (índice de búsqueda, no grep)
+    local kanban_id
+    kanban_id=$(python3 "$TRACKER_DIR/kanban_search.py" lookup "$task_title" progress)
+    case $? in
+        0)
+            printf 'done %s\nmove %s done\n' "$kanban_id" "$kanban_id" | python3 "$TRACKER_DIR/kanban.py" batch > /dev/null
+            echo "[Fizzy] 📋 Kanban: tarjeta $kanban_id → 'Hecho'"
+            ;;
+        2)
+            echo "[Fizzy] ⚠️  Kanban: varias tarjetas en progreso se llaman \"$task_title\"; no se marca ninguna"
+            ;;
+        *)
+            echo "[Fizzy] ⚠️  Kanban: no hay tarjeta en progreso llamada \"$task_title\""
+            ;;
+    esac
 }
 
 # ═══════════════════════════════════════════════════════════════
@@ -115,35 +141,7 @@ moltbot_fizzy_on_task_complete() {
 moltbot_fizzy_daily_report() {
     local report_file="/tmp/fizzy_daily_report_$(date +%Y%m%d).txt"
     
-    {
-        echo "📊 **Reporte Diario de Actividades**"
-        echo "==================================="
-        echo ""
-        
-        if [ -f ~/.fizzy/active_tasks.log ]; then
-            local today=$(date +%s)
-            
-            echo "✅ **Completadas hoy:**"
-            grep "done:" ~/.fizzy/active_tasks.log | while read line; do
-                local done_time=$(echo "$line" | grep -o "done: [0-9]*" | cut -d' ' -f2)
-                local task_title=$(echo "$line" | cut -d'(' -f1 | sed 's/^[0-9]* //')
-                
-                if [ -n "$done_time" ] && [ $done_time -ge $((today - 86400)) ]; then
-                    echo "   - $task_title"
-                fi
-            done
-            
-            echo ""
-            echo "⏳ **En progreso:**"
-            grep -v "done:" ~/.fizzy/active_tasks.log | while read line; do
-                local task_title=$(echo "$line" | cut -d'(' -f1 | sed 's/^[0-9]* //')
-                echo "   - $task_title"
-            done
-        else
-            echo "No hay actividades registradas hoy."
-        fi
-        
-    } > "$report_file"
+    python3 "$FIZZY_EVENTS_PY" generate > "$report_file"
     
     cat "$report_file"
     return 0
@@ -189,6 +187,12 @@ case "${1:-help}" in
     cron)
         moltbot_fizzy_install_cron
         ;;
+    sync)
+        _moltbot_outbox sync
+        ;;
+    outbox)
+        _moltbot_outbox status
+        ;;
     help|*)
         echo "╔════════════════════════════════════════════════════════════╗"
         echo "║  Moltbot ↔ Fizzy Integration                              ║"
@@ -201,6 +205,8 @@ case "${1:-help}" in
         echo "║    $0 complete \"título\" [segundos]  → Completar tarea    ║"
         echo "║    $0 report                        → Ver reporte diario  ║"
         echo "║    $0 cron                          → Instalar cron       ║"
+        echo "║    $0 sync                          → Enviar cola a Fizzy ║"
+        echo "║    $0 outbox                        → Estado de la cola   ║"
         echo "║                                                            ║"
         echo "║  INTEGRACIÓN CON AGENTE:                                  ║"
         echo "║    source moltbot-fizzy.sh                                 ║"
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+📈 Rollups - Agregados pre-calculados para reportes
+Contadores por día y por semana que se actualizan al completar tareas.
+
+Un archivo por fuente:
+    kanban → junto a kanban.json (kanban.rollups.json)
+    fizzy  → ~/.fizzy/events/rollups.json
+
+Cada día guarda: completadas, duración total y (id, título, duración) de las tareas.
+Un reporte cuesta O(días del rango), sin importar el tamaño del historial.
+
+Uso:
+    python3 rollups.py rebuild [kanban|fizzy|all]   → Recalcular desde el historial
+    python3 rollups.py show [kanban|fizzy]          → Ver últimos días
+"""
+
+import json
+import os
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from locking import atomic_write_json
+
+def day_key(day: date) -> str:
+    return day.strftime("%Y-%m-%d")
+
+def week_key(day: date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+# ═══════════════════════════════════════════════════════════════
+#  ROLLUPS
+# ═══════════════════════════════════════════════════════════════
+
+class Rollups:
+    """Contadores de completadas y duración por día y por semana ISO"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data = {"days": {}, "weeks": {}}
+        self.dirty = False
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.data = json.load(f)
+
+    def save(self):
+        if not self.dirty:
+            return
+        atomic_write_json(self.path, self.data)
+        self.dirty = False
+
+    def clear(self):
+        self.data = {"days": {}, "weeks": {}}
+        self.dirty = True
+
+    # ── Actualización incremental ──────────────────────────────
+
+    def _bucket(self, kind: str, key: str) -> Dict:
+        return self.data[kind].setdefault(key, {"completed": 0, "duration": 0})
+
+    def record_completion(self, day: date, duration: int = 0, card_id: Optional[str] = None,
+                          title: Optional[str] = None):
+        """Sumar una tarea completada"""
+        d = self._bucket("days", day_key(day))
+        d["completed"] += 1
+        d["duration"] += int(duration)
+        if title is not None:
+            d.setdefault("tasks", []).append([card_id, title, int(duration)])
+
+        w = self._bucket("weeks", week_key(day))
+        w["completed"] += 1
+        w["duration"] += int(duration)
+        self.dirty = True
+
+    def remove_completion(self, day: date, duration: int = 0, card_id: Optional[str] = None):
+        """Restar una tarea (p. ej. tarjeta que sale de 'done')"""
+        d = self.data["days"].get(day_key(day))
+        w = self.data["weeks"].get(week_key(day))
+        if not d or not w:
+            return
+        for bucket in (d, w):
+            bucket["completed"] = max(bucket["completed"] - 1, 0)
+            bucket["duration"] = max(bucket["duration"] - int(duration), 0)
+        tasks = d.get("tasks", [])
+        for i, task in enumerate(tasks):
+            if task[0] == card_id:
+                del tasks[i]
+                break
+        self.dirty = True
+
+    # ── Consultas ──────────────────────────────────────────────
+
+    def day(self, day: date) -> Dict:
+        return self.data["days"].get(day_key(day), {"completed": 0, "duration": 0})
+
+    def week(self, day: date) -> Dict:
+        return self.data["weeks"].get(week_key(day), {"completed": 0, "duration": 0})
+
+    def range(self, start: date, end: date) -> Dict:
+        """Agregado de [start, end] (O(días del rango))"""
+        total = {"completed": 0, "duration": 0, "tasks": []}
+        for offset in range((end - start).days + 1):
+            d = self.data["days"].get(day_key(start + timedelta(days=offset)))
+            if d:
+                total["completed"] += d["completed"]
+                total["duration"] += d["duration"]
+                total["tasks"].extend(d.get("tasks", []))
+        return total
+
+# ═══════════════════════════════════════════════════════════════
+#  RECONSTRUCCIÓN DESDE HISTORIAL
+# ═══════════════════════════════════════════════════════════════
+
+def kanban_rollups_path(kanban_file: str) -> str:
+    base, _ = os.path.splitext(kanban_file)
+    return f"{base}.rollups.json"
+
+def fizzy_rollups_path(events_dir: str) -> str:
+    return os.path.join(events_dir, "rollups.json")
+
+def rebuild_kanban(kanban_file: Optional[str] = None) -> Rollups:
+    """Recalcular desde las tarjetas en 'done'"""
+    from kanban import KanbanBoard, KANBAN_FILE
+
+    board = KanbanBoard(kanban_file or KANBAN_FILE, track_rollups=False)
+    return board.rebuild_rollups()
+
+def rebuild_fizzy(events_dir: Optional[str] = None) -> Rollups:
+    """Recalcular desde todas las particiones del log de eventos"""
+    from event_log import EventLog, EVENTS_DIR
+
+    log = EventLog(events_dir or EVENTS_DIR, track_rollups=False)
+    return log.rebuild_rollups()
+
+# ═══════════════════════════════════════════════════════════════
+#  CLI
+# ═══════════════════════════════════════════════════════════════
+
+def _print_rollups(name: str, rollups: Rollups, days: int = 7):
+    today = date.today()
+    print(f"\n📈 {name}")
+    for offset in range(days - 1, -1, -1):
+        day = today - timedelta(days=offset)
+        d = rollups.day(day)
+        print(f"  {day_key(day)}  ✅ {d['completed']:3}  ⏱️ {d['duration'] // 60} min")
+    w = rollups.week(today)
+    print(f"  Semana {week_key(today)}: ✅ {w['completed']}  ⏱️ {w['duration'] // 60} min")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "show"
+    source = argv[1] if len(argv) > 1 else "all"
+
+    if command == "rebuild":
+        if source in ("kanban", "all"):
+            r = rebuild_kanban()
+            print(f"✅ Rollups kanban: {len(r.data['days'])} días")
+        if source in ("fizzy", "all"):
+            r = rebuild_fizzy()
+            print(f"✅ Rollups fizzy: {len(r.data['days'])} días")
+        return 0
+
+    if command == "show":
+        if source in ("kanban", "all"):
+            from kanban import KANBAN_FILE
+            _print_rollups("Kanban", Rollups(kanban_rollups_path(KANBAN_FILE)))
+        if source in ("fizzy", "all"):
+            from event_log import EVENTS_DIR
+            _print_rollups("Fizzy", Rollups(fizzy_rollups_path(EVENTS_DIR)))
+        return 0
+
+    print(__doc__)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+🧨 Stress - Escritores concurrentes sobre kanban.json y el log de eventos
+Lanza N procesos que crean y mueven tarjetas y registran inicio/fin de tareas
+a la vez, con lectores leyendo el tablero sin lock. Al final comprueba que
+no se perdió ninguna actualización y muestra el throughput.
+
+Trabaja en un directorio temporal (no toca ~/.fizzy).
+
+Uso:
+    python3 stress.py [--writers 8] [--ops 50] [--readers 2]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from event_log import EventLog
+from kanban import KanbanBoard
+
+def _writer(board_path: str, events_dir: str, worker: int, ops: int):
+    board = KanbanBoard(board_path)
+    log = EventLog(events_dir)
+    for i in range(ops):
+        task = f"w{worker}-{i}"
+        with board.transaction():
+            card = board.create(task)
+        # Segunda transacción: leer-modificar-escribir sobre una tarjeta existente
+        with board.transaction():
+            board.move(card["id"], "progress")
+        log.task_started(card["id"], task)
+        log.task_completed(card_id=card["id"])
+
+def _reader(board_path: str, stop, counts):
+    reads = errors = 0
+    while not stop.is_set():
+        try:
+            with open(board_path, 'r') as f:
+                json.load(f)
+            reads += 1
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError:
+            errors += 1
+    counts.put((reads, errors))
+
+def run(writers: int = 8, ops: int = 50, readers: int = 2) -> bool:
+    base = tempfile.mkdtemp(prefix="kanban-stress-")
+    board_path = os.path.join(base, "kanban.json")
+    events_dir = os.path.join(base, "events")
+    try:
+        KanbanBoard(board_path).save()
+        stop, counts = multiprocessing.Event(), multiprocessing.Queue()
+        reader_procs = [multiprocessing.Process(target=_reader, args=(board_path, stop, counts))
+                        for _ in range(readers)]
+        writer_procs = [multiprocessing.Process(target=_writer, args=(board_path, events_dir, w, ops))
+                        for w in range(writers)]
+
+        for p in reader_procs:
+            p.start()
+        start = time.perf_counter()
+        for p in writer_procs:
+            p.start()
+        for p in writer_procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        read_results = [counts.get() for _ in reader_procs]
+        for p in reader_procs:
+            p.join()
+
+        expected = writers * ops
+        board = KanbanBoard(board_path, auto_archive=False)
+        in_progress = board.cards("progress")
+        ids = [c["id"] for c in in_progress]
+        log = EventLog(events_dir)
+        completed = sum(d["completed"] for d in log.rollups.data["days"].values())
+        events = sum(d["events"] for d in log.load_index().values())
+
+        checks = {
+            "tarjetas en 'progress'": (len(in_progress), expected),
+            "IDs únicos": (len(set(ids)), expected),
+            "tarjetas en 'backlog'": (len(board.cards("backlog")), 0),
+            "completadas (rollups)": (completed, expected),
+            "eventos en el índice": (events, expected * 2),
+            "tareas activas": (len(log.load_active()), 0),
+            "lecturas corruptas": (sum(e for _, e in read_results), 0),
+        }
+
+        transactions = expected * 2 + expected * 2
+        print(f"\n🧨 STRESS: {writers} escritores × {ops} ops, {readers} lectores")
+        print(f"  ⏱️  {elapsed:.2f} s  →  {transactions / elapsed:.0f} escrituras/s "
+              f"(kanban {expected * 2 / elapsed:.0f}/s)")
+        print(f"  📖 {sum(r for r, _ in read_results)} lecturas sin lock")
+        ok = True
+        for name, (got, want) in checks.items():
+            mark = "✅" if got == want else "❌"
+            ok &= got == want
+            print(f"  {mark} {name}: {got} (esperado {want})")
+        return ok
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Stress de escritores concurrentes")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=2)
+    args = parser.parse_args(argv)
+    return 0 if run(args.writers, args.ops, args.readers) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+📈 Telemetría opcional para tracker y memoria
+Reexporta agents/telemetry.py si está junto a este directorio; si no (tracker
+instalado suelto, sin agents/), expone las mismas funciones como no-op.
+
+Uso:
+    from telemetry_shim import count, observe, timed, timer
+"""
+
+import os
+import sys
+from contextlib import nullcontext
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agents"))
+
+try:
+    from telemetry import count, flush, observe, timed, timer
+except ImportError:
+    _NULL = nullcontext()
+
+    def timer(stage: str):
+        return _NULL
+
+    def timed(stage: str):
+        return lambda fn: fn
+
+    def observe(stage: str, seconds: float):
+        pass
+
+    def count(name: str, n: float = 1):
+        pass
+
+    def flush():
+        pass
+
+__all__ = ["count", "flush", "observe", "timed", "timer"]